@@ -6,6 +6,8 @@ from modules.data_fetcher import get_weather_forecast, generate_synthetic_csv
 from utils.geo import DISTRICT_COORDS
 from utils.translator import t, render_lang_sidebar
 from utils.green_theme import inject_theme
+from utils.session_memory import track_session
+from utils.geo_translate import preload as preload_translations
 
 st.set_page_config(
     page_title="AgriChain — Smart Farming Decisions",
@@ -15,6 +17,8 @@ st.set_page_config(
 )
 
 inject_theme()
+track_session()
+preload_translations()
 
 st.markdown("""
 <style>
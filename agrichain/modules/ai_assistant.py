@@ -2,20 +2,31 @@
 AI Assistant backend — wraps LangChain + Ollama.
 Provides:
   - Ollama availability check and model listing
-  - Farm context builder (runs all 3 engines to generate a rich prompt context)
-  - build_chain(model_name) → LangChain chain
+  - Farm context builder (runs all 3 engines → structured FarmContext)
+  - build_chain(model_name) → LangChain chain (cached per process)
   - chat(chain, messages, context) → streamed or full response string
+  - Answer cache for quick questions / repeated first questions
+  - Inference gateway: per-model concurrency limit + FIFO queue in front of Ollama
 """
 
 import sys, os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import datetime
+import hashlib
+import threading
+import time
+import unicodedata
+from collections import deque
 import requests as _requests
 from typing import Generator
 
+from modules.farm_context import FarmContext
+from utils.ttl_cache import TTLCache
+from utils.circuit_breaker import get_breaker, CircuitOpenError
+
 # ─── Ollama connectivity helpers ───────────────────────────────────────────────
-OLLAMA_BASE = "http://localhost:11434"
+OLLAMA_BASE = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
 
 RECOMMENDED_MODELS = [
     ("llama3.2",     "3B params · fast · best for Q&A"),
@@ -27,27 +38,107 @@ RECOMMENDED_MODELS = [
 ]
 
 
-def is_ollama_running() -> bool:
+# How long Ollama keeps a model loaded after the last request (seconds)
+OLLAMA_KEEP_ALIVE = 1800
+
+# Status + model list come from one /api/tags probe, cached per process and
+# refreshed in the background so page reruns never wait on Ollama.
+OLLAMA_STATUS_TTL   = 10.0   # seconds before a background refresh is triggered
+_FIRST_PROBE_WAIT   = 1.0    # max wait for the very first probe in a process
+
+_status       = {"running": False, "models": [], "checked_at": 0.0}
+_status_lock  = threading.Lock()
+_probe_thread = None
+_first_probe  = threading.Event()
+
+
+def _probe_ollama():
+    """Single /api/tags call → (running, models). Skipped while the Ollama breaker is open."""
     try:
-        r = _requests.get(f"{OLLAMA_BASE}/api/tags", timeout=3)
-        return r.status_code == 200
+        with get_breaker("ollama").guard():
+            r = _requests.get(f"{OLLAMA_BASE}/api/tags", timeout=3)
+            r.raise_for_status()
+        return True, [m["name"] for m in r.json().get("models", [])]
     except Exception:
-        return False
+        return False, []
+
+
+def _refresh_status():
+    running, models = _probe_ollama()
+    with _status_lock:
+        _status.update(running=running, models=models, checked_at=time.monotonic())
+    _first_probe.set()
+    if running:
+        evict_chains(keep_models=models)
+
+
+def refresh_ollama_status(wait: float = 0.0):
+    """Start a background probe (unless one is in flight); optionally wait for it."""
+    global _probe_thread
+    with _status_lock:
+        if _probe_thread is None or not _probe_thread.is_alive():
+            _probe_thread = threading.Thread(target=_refresh_status, name="ollama-status", daemon=True)
+            _probe_thread.start()
+        thread = _probe_thread
+    if wait:
+        thread.join(wait)
+
+
+def get_ollama_status() -> tuple[bool, list[str]]:
+    """
+    Return (running, models) from the process-wide cache. A stale entry is
+    returned immediately while a refresh runs in the background; only the
+    first call in a process waits (briefly) for a real answer.
+    """
+    if not _first_probe.is_set():
+        refresh_ollama_status(wait=_FIRST_PROBE_WAIT)
+    elif time.monotonic() - _status["checked_at"] > OLLAMA_STATUS_TTL:
+        refresh_ollama_status()
+    with _status_lock:
+        return _status["running"], list(_status["models"])
+
+
+def is_ollama_running() -> bool:
+    return get_ollama_status()[0]
 
 
 def list_available_models() -> list[str]:
     """Return list of model names currently pulled in Ollama."""
-    try:
-        r = _requests.get(f"{OLLAMA_BASE}/api/tags", timeout=3)
-        data = r.json()
-        return [m["name"] for m in data.get("models", [])]
-    except Exception:
-        return []
+    return get_ollama_status()[1]
 
 
 # ─── LangChain chain builder ───────────────────────────────────────────────────
-def build_chain(model_name: str):
-    """Build a LangChain chain using the specified Ollama model."""
+# Chains are stateless (prompt | llm | parser), so one instance per
+# (model, temperature, num_predict) is shared by every session in the process.
+_chains      = {}
+_chains_lock = threading.Lock()
+
+
+def build_chain(model_name: str, temperature: float = 0.7, num_predict: int = 512,
+                keep_alive: int = OLLAMA_KEEP_ALIVE):
+    """Return the LangChain chain for the specified Ollama model, building it once."""
+    key = (model_name, temperature, num_predict, keep_alive)
+    with _chains_lock:
+        chain = _chains.get(key)
+        if chain is None:
+            chain = _chains[key] = _make_chain(model_name, temperature, num_predict, keep_alive)
+    return chain
+
+
+def evict_chains(keep_models: list[str] | None = None) -> int:
+    """
+    Drop cached chains whose model is not in `keep_models` (all of them if
+    None). Called whenever the Ollama model list is refreshed, so removed
+    models don't linger. Returns the number of chains evicted.
+    """
+    with _chains_lock:
+        stale = [k for k in _chains if keep_models is None or k[0] not in keep_models]
+        for k in stale:
+            del _chains[k]
+    return len(stale)
+
+
+def _make_chain(model_name: str, temperature: float, num_predict: int, keep_alive: int):
     from langchain_ollama import ChatOllama
     from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
     from langchain_core.output_parsers import StrOutputParser
@@ -55,8 +146,9 @@ def build_chain(model_name: str):
     llm = ChatOllama(
         model=model_name,
         base_url=OLLAMA_BASE,
-        temperature=0.7,
-        num_predict=512,
+        temperature=temperature,
+        num_predict=num_predict,
+        keep_alive=keep_alive,
     )
 
     prompt = ChatPromptTemplate.from_messages([
@@ -69,7 +161,113 @@ def build_chain(model_name: str):
     return chain
 
 
+# ─── Model warmup ──────────────────────────────────────────────────────────────
+# Ollama loads a model lazily on its first request, which would otherwise land
+# on the farmer's first question. A generate call with no prompt just loads it.
+_warmed      = {}   # model -> monotonic time of last warmup
+_warmed_lock = threading.Lock()
+
+
+def _load_model(model_name: str, keep_alive: int):
+    try:
+        with get_breaker("ollama").guard():
+            _requests.post(
+                f"{OLLAMA_BASE}/api/generate",
+                json={"model": model_name, "keep_alive": keep_alive},
+                timeout=120,
+            ).raise_for_status()
+    except Exception:
+        with _warmed_lock:
+            _warmed.pop(model_name, None)   # retry on the next selection
+
+
+def warm_model(model_name: str, keep_alive: int = OLLAMA_KEEP_ALIVE) -> bool:
+    """
+    Load `model_name` into Ollama memory in the background. No-op if it was
+    warmed within the keep-alive window. Returns True if a warmup started.
+    """
+    now = time.monotonic()
+    with _warmed_lock:
+        last = _warmed.get(model_name)
+        if last is not None and now - last < keep_alive:
+            return False
+        _warmed[model_name] = now
+    threading.Thread(target=_load_model, args=(model_name, keep_alive),
+                     name="ollama-warmup", daemon=True).start()
+    return True
+
+
 # ─── Farm context builder ──────────────────────────────────────────────────────
+# Pre-fetched data each engine accepts as keyword arguments
+_ENGINE_DATA = {
+    "harvest":  ("weather", "prices"),
+    "mandi":    ("prices",),
+    "spoilage": ("weather",),
+}
+
+
+def _timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    return fn(*args, **kwargs), time.perf_counter() - t0
+
+
+def _run_engines(crop, district, quantity_qtl, storage_type, transit_hours, sowing_date, timings):
+    """
+    Run (or reuse from the session cache) the three engines.
+    Weather and prices are fetched once, concurrently, and handed to every
+    engine that needs them; the engines then run in parallel so latency is
+    bounded by the slowest one. Returns {engine: result or Exception}.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from modules.data_fetcher import get_weather_forecast, load_mandi_prices
+    from modules.harvest_engine import get_harvest_recommendation
+    from modules.mandi_ranker import rank_mandis
+    from modules.spoilage_assessor import assess_spoilage
+    from utils.geo import DISTRICT_COORDS
+    from utils.shared_state import get_result, put_result
+
+    # Same positional args the pages use, so session-cache keys line up
+    jobs = {
+        "harvest":  (get_harvest_recommendation, (crop, district, sowing_date)),
+        "mandi":    (rank_mandis,                (crop, quantity_qtl, district, 3)),
+        "spoilage": (assess_spoilage,            (crop, district, quantity_qtl, storage_type, transit_hours)),
+    }
+    results = {}
+    for engine, (_, args) in jobs.items():
+        results[engine] = get_result(engine, *args)
+        if results[engine] is not None:
+            timings[engine] = None   # served from cache
+    missing = [e for e in jobs if results[e] is None]
+    if not missing:
+        return results
+
+    # Session state is only touched from this (the script) thread
+    with ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="agrichain-ctx") as pool:
+        needed  = {name for e in missing for name in _ENGINE_DATA[e]}
+        fetches = {}
+        if "weather" in needed:
+            lat, lon = DISTRICT_COORDS.get(district, (18.5204, 73.8567))
+            fetches["weather"] = pool.submit(_timed, get_weather_forecast, lat, lon, 14)
+        if "prices" in needed:
+            fetches["prices"] = pool.submit(_timed, load_mandi_prices, crop)
+        fetched = {}
+        for name, fut in fetches.items():
+            try:
+                fetched[name], timings[name] = fut.result()
+            except Exception:
+                pass   # engines fall back to fetching it themselves
+        data = {e: {n: fetched[n] for n in _ENGINE_DATA[e] if n in fetched} for e in missing}
+
+        futures = {e: pool.submit(_timed, jobs[e][0], *jobs[e][1], **data[e]) for e in missing}
+        for engine, fut in futures.items():
+            try:
+                results[engine], timings[engine] = fut.result()
+                put_result(engine, results[engine], *jobs[engine][1])
+            except Exception as e:
+                results[engine] = e
+    return results
+
+
 def build_farm_context(
     crop: str,
     district: str,
@@ -77,76 +275,32 @@ def build_farm_context(
     storage_type: str,
     transit_hours: float,
     sowing_date: datetime.date,
-) -> str:
+) -> FarmContext:
     """
-    Runs all 3 AgriChain engines and builds a comprehensive context string
-    to inject into the system prompt.
+    Runs all 3 AgriChain engines and returns a FarmContext holding their raw
+    outputs, per-step timings and any engine errors. Results already computed
+    on another page this session are reused instead of re-running the engine.
+    Use ctx.to_prompt() for the system prompt.
     """
-    lines = [
-        "=== FARMER PROFILE ===",
-        f"Crop: {crop}",
-        f"District: {district}, Maharashtra",
-        f"Quantity: {quantity_qtl} quintals",
-        f"Storage: {storage_type}",
-        f"Transit Duration: {transit_hours} hours",
-        f"Sowing Date: {sowing_date.strftime('%d %B %Y')}",
-        "",
-    ]
-
-    # Harvest Engine
-    try:
-        from modules.harvest_engine import get_harvest_recommendation
-        h = get_harvest_recommendation(crop, district, sowing_date)
-        lines += [
-            "=== HARVEST RECOMMENDATION ===",
-            f"Best Window: {h['recommended_window']['start']} to {h['recommended_window']['end']}",
-            f"Expected Price Premium: {h['expected_price_premium']}",
-            f"Confidence: {h['confidence']}",
-            f"Reason 1: {h['reasons'][0] if h['reasons'] else 'N/A'}",
-            f"Reason 2: {h['reasons'][1] if len(h['reasons']) > 1 else 'N/A'}",
-            f"Price Seasonality Score: {int(h['score_components']['price_seasonality']*100)}%",
-            f"Weather Score: {int(h['score_components']['weather']*100)}%",
-            f"Soil Readiness Score: {int(h['score_components']['soil_readiness']*100)}%",
-            "",
-        ]
-    except Exception as e:
-        lines += [f"=== HARVEST RECOMMENDATION ===", f"Error: {e}", ""]
-
-    # Mandi Ranker
-    try:
-        from modules.mandi_ranker import rank_mandis
-        mandis = rank_mandis(crop, quantity_qtl, district, top_n=3)
-        lines += ["=== TOP MANDIS ==="]
-        for i, m in enumerate(mandis, 1):
-            lines.append(
-                f"#{i} {m['mandi']}: Price ₹{m['expected_price']:,.0f}/qtl, "
-                f"Transport ₹{m['transport_cost_qtl']:,.0f}/qtl, "
-                f"Net Profit ₹{m['net_profit_per_qtl']:,.0f}/qtl, "
-                f"Distance {m['distance_km']:.0f} km"
-            )
-        lines.append("")
-    except Exception as e:
-        lines += [f"=== TOP MANDIS ===", f"Error: {e}", ""]
-
-    # Spoilage Assessor
-    try:
-        from modules.spoilage_assessor import assess_spoilage
-        s = assess_spoilage(crop, district, quantity_qtl, storage_type, transit_hours)
-        lines += [
-            "=== SPOILAGE RISK ===",
-            f"Risk Level: {s['risk_level']} ({s['spoilage_probability']} probability)",
-            f"Reason: {s['reason']}",
-            f"Top Action: {s['actions'][0]['action']} (Cost: {s['actions'][0]['cost']}, Effectiveness: {s['actions'][0]['effectiveness']})",
-            "",
-        ]
-    except Exception as e:
-        lines += [f"=== SPOILAGE RISK ===", f"Error: {e}", ""]
-
-    return "\n".join(lines)
+    ctx = FarmContext(crop, district, quantity_qtl, storage_type, transit_hours, sowing_date)
+    results = _run_engines(crop, district, quantity_qtl, storage_type, transit_hours, sowing_date, ctx.timings)
+    for engine, attr in (("harvest", "harvest"), ("mandi", "mandis"), ("spoilage", "spoilage")):
+        if isinstance(results[engine], Exception):
+            ctx.errors[engine] = results[engine]
+        else:
+            setattr(ctx, attr, results[engine])
+    return ctx
 
 
 # ─── System prompt builder ─────────────────────────────────────────────────────
-def build_system_prompt(farm_context: str, lang: str = "en") -> str:
+# Everything before FARMER DATA depends only on the language, so Ollama can
+# reuse its KV cache for that prefix across context regenerations; the
+# volatile farm data always comes last.
+def build_system_prompt(farm_context, lang: str = "en") -> str:
+    """`farm_context` may be a FarmContext or already-rendered text."""
+    if isinstance(farm_context, FarmContext):
+        farm_context = farm_context.to_prompt()
+
     lang_instruction = {
         "hi": (
             "The user may write in Hindi (Devanagari), Hinglish (Roman-script Hindi), or mixed Hindi-English. "
@@ -182,32 +336,279 @@ You understand and can converse in: English, Hindi (Devanagari), Marathi (Devana
 Hinglish (Roman-script Hindi-English mix), and Minglish (Roman-script Marathi-English mix).
 ALWAYS reply in whatever language/script the user writes in — never force a single language.
 
-FARMER DATA (use this to give specific, grounded answers):
-{farm_context}
-
 RESPONSE GUIDELINES:
-- Always refer to the actual data above when answering questions about harvest, mandis, or spoilage
-- Give specific, actionable advice based on the farmer's crop ({farm_context.split('Crop:')[1].split(chr(10))[0].strip() if 'Crop:' in farm_context else 'the crop'})
+- Always refer to the FARMER DATA below when answering questions about harvest, mandis, or spoilage
+- Give specific, actionable advice for the farmer's crop as listed in the FARMER DATA
 - Keep answers concise and practical — 3-5 sentences max unless details are needed
 - If asked something outside agriculture, politely redirect: "Main sirf kheti ke baare mein help kar sakta hoon 🌾"
 - Be warm, supportive, and respectful — use local terms like "bhai", "kisan bhai" when appropriate
+
+FARMER DATA (use this to give specific, grounded answers):
+{farm_context}
 """
 
 
 # ─── Streamed chat ─────────────────────────────────────────────────────────────
-def stream_response(chain, system_prompt: str, history: list, user_input: str) -> Generator:
-    """Stream tokens from the LangChain chain."""
-    from langchain_core.messages import HumanMessage, AIMessage
+def stream_response(chain, system_prompt: str, history: list, user_input: str,
+                    memory=None) -> Generator:
+    """
+    Stream tokens from the LangChain chain.
+    With a ChatMemory, only its running summary plus the recent turns are
+    sent instead of the whole conversation.
+    """
+    from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 
+    past = history[:-1]   # exclude the latest user message
     lc_history = []
-    for msg in history[:-1]:   # exclude the latest user message
+    if memory is not None:
+        summary, past = memory.window(past)
+        if summary:
+            lc_history.append(SystemMessage(content=f"Summary of the earlier conversation:\n{summary}"))
+    for msg in past:
         if msg["role"] == "user":
             lc_history.append(HumanMessage(content=msg["content"]))
         elif msg["role"] == "assistant":
             lc_history.append(AIMessage(content=msg["content"]))
 
-    return chain.stream({
+    # Stream from the LLM step itself: closing a RunnableSequence stream drains
+    # the rest of the generation, whereas closing the model stream drops the
+    # connection and Ollama stops generating (needed for cancellation).
+    prompt, llm = chain.steps[0], chain.steps[1]
+    messages = prompt.invoke({
         "system_prompt": system_prompt,
         "history":       lc_history,
         "input":         user_input,
     })
+    return _stream_text(llm, messages)
+
+
+def _stream_text(llm, messages) -> Generator:
+    chunks = llm.stream(messages)
+    try:
+        for chunk in chunks:
+            if chunk.content:
+                yield chunk.content
+    finally:
+        chunks.close()
+
+
+# ─── Inference gateway ─────────────────────────────────────────────────────────
+# Sessions don't call Ollama directly: concurrent generations on one CPU just
+# slow each other down. At most MAX_CONCURRENT_PER_MODEL run per model; the
+# rest wait in FIFO order (one ticket per session) and see their position.
+MAX_CONCURRENT_PER_MODEL = 1
+QUEUE_POLL_SECONDS       = 0.5
+
+
+class GenerationCancelled(Exception):
+    """The session cancelled a queued or streaming generation."""
+
+
+class _Ticket:
+    __slots__ = ("model", "session_id", "cancelled")
+
+    def __init__(self, model: str, session_id: str):
+        self.model, self.session_id, self.cancelled = model, session_id, False
+
+
+class InferenceGateway:
+    """Per-model admission control with a fair FIFO queue and per-session cancel."""
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_PER_MODEL):
+        self.max_concurrent = max_concurrent
+        self._cond     = threading.Condition()
+        self._waiting  = {}   # model -> deque[_Ticket]
+        self._active   = {}   # model -> set[_Ticket]
+        self._sessions = {}   # session_id -> set[_Ticket]
+        self.completed = 0
+        self.cancelled = 0
+
+    def _try_admit(self, ticket: _Ticket) -> int:
+        """Admit `ticket` if it is at the head and a slot is free. Returns its queue position (0 = admitted)."""
+        queue = self._waiting[ticket.model]
+        if ticket.cancelled:
+            raise GenerationCancelled()
+        active = self._active.setdefault(ticket.model, set())
+        if queue[0] is ticket and len(active) < self.max_concurrent:
+            queue.popleft()
+            active.add(ticket)
+            return 0
+        return queue.index(ticket) + 1
+
+    def _release(self, ticket: _Ticket, finished: bool):
+        with self._cond:
+            queue = self._waiting.get(ticket.model, ())
+            if ticket in queue:
+                queue.remove(ticket)
+            self._active.get(ticket.model, set()).discard(ticket)
+            tickets = self._sessions.get(ticket.session_id, set())
+            tickets.discard(ticket)
+            if not tickets:
+                self._sessions.pop(ticket.session_id, None)
+            if finished:
+                self.completed += 1
+            else:
+                self.cancelled += 1
+            self._cond.notify_all()
+
+    def stream(self, model: str, session_id: str, start, on_wait=None) -> Generator:
+        """
+        Wait for a slot on `model`, then yield from `start()`. `on_wait(position)`
+        is called while queued. A new request from the same session cancels its
+        previous one. Closing the generator releases the slot and closes the
+        underlying stream, which makes Ollama stop generating. Raises
+        CircuitOpenError at once while the Ollama breaker is open.
+        """
+        breaker = get_breaker("ollama")
+        if not breaker.allow():
+            raise CircuitOpenError(breaker.name, breaker.retry_in())
+        self.cancel_session(session_id)
+        ticket = _Ticket(model, session_id)
+        with self._cond:
+            self._waiting.setdefault(model, deque()).append(ticket)
+            self._sessions.setdefault(session_id, set()).add(ticket)
+
+        finished, streaming = False, False
+        try:
+            while True:
+                with self._cond:
+                    position = self._try_admit(ticket)
+                    if position and not on_wait:
+                        self._cond.wait(QUEUE_POLL_SECONDS)
+                        continue
+                if not position:
+                    break
+                on_wait(position)
+                with self._cond:
+                    self._cond.wait(QUEUE_POLL_SECONDS)
+
+            chunks = start()
+            try:
+                for chunk in chunks:
+                    if ticket.cancelled:
+                        raise GenerationCancelled()
+                    if not streaming:
+                        streaming = True
+                        breaker.record_success()   # Ollama answered
+                    yield chunk
+            finally:
+                close = getattr(chunks, "close", None)
+                if close:
+                    close()
+            finished = True
+        except GenerationCancelled:
+            raise
+        except Exception as exc:
+            breaker.record_failure(exc)
+            raise
+        finally:
+            if not streaming:
+                breaker.release()   # no-op unless this call held the half-open probe
+            self._release(ticket, finished)
+
+    def cancel_session(self, session_id: str) -> int:
+        """Cancel every queued or running generation of a session."""
+        with self._cond:
+            tickets = self._sessions.get(session_id, ())
+            for ticket in tickets:
+                ticket.cancelled = True
+            self._cond.notify_all()
+            return len(tickets)
+
+    def stats(self) -> dict:
+        with self._cond:
+            models = set(self._waiting) | set(self._active)
+            return {
+                "models":    {m: {"active": len(self._active.get(m, ())),
+                                  "queued": len(self._waiting.get(m, ()))} for m in models},
+                "completed": self.completed,
+                "cancelled": self.cancelled,
+            }
+
+
+_gateway = InferenceGateway()
+
+
+def guarded_stream(model_name: str, session_id: str, start, on_wait=None) -> Generator:
+    """Run `start()` (a token-stream factory) through the process-wide gateway."""
+    return _gateway.stream(model_name, session_id, start, on_wait)
+
+
+def cancel_generation(session_id: str) -> int:
+    return _gateway.cancel_session(session_id)
+
+
+def gateway_stats() -> dict:
+    return _gateway.stats()
+
+
+# ─── Answer cache ──────────────────────────────────────────────────────────────
+# Many farmers with the same crop/district press the same quick-question
+# buttons; identical (context, model, language, question) gets the same answer.
+QUICK_QUESTIONS = [
+    "🌾 When should I harvest?",
+    "🏪 Which mandi gives the best profit?",
+    "⚠️ What is my spoilage risk?",
+    "🚛 How can I reduce transport costs?",
+    "🌡️ How does the weather affect my crop?",
+    "💰 How much will I earn from this harvest?",
+    "🧊 What storage should I use?",
+    "📈 Are prices good right now?",
+]
+
+ANSWER_CACHE_TTL  = 6 * 3600
+ANSWER_CACHE_SIZE = 2048
+
+_answer_cache = TTLCache(maxsize=ANSWER_CACHE_SIZE, ttl=ANSWER_CACHE_TTL)
+
+
+def normalise_question(question: str) -> str:
+    """Lower-case, drop punctuation/emoji (keeping Devanagari marks), collapse spaces."""
+    kept = "".join(
+        " " if unicodedata.category(ch)[0] in "PS" else ch
+        for ch in question.lower()
+    )
+    return " ".join(kept.split())
+
+
+def _has_prior_turns(history: list) -> bool:
+    return any(m["role"] in ("user", "assistant") for m in history[:-1])
+
+
+def is_cacheable_question(question: str, history: list) -> bool:
+    """May be served from the answer cache: quick questions any time, typed ones when they open the chat."""
+    return question in QUICK_QUESTIONS or not _has_prior_turns(history)
+
+
+def is_storable_answer(history: list) -> bool:
+    """
+    May be stored in the answer cache: only answers generated with no prior
+    turns (or summary) in the prompt, since the key doesn't include history.
+    """
+    return not _has_prior_turns(history)
+
+
+def answer_cache_key(farm_context: str, model_name: str, lang: str, question: str) -> str:
+    raw = "\x1f".join((farm_context, model_name, lang, normalise_question(question)))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def get_cached_answer(key: str) -> str | None:
+    return _answer_cache.get(key)
+
+
+def store_answer(key: str, answer: str):
+    if answer.strip():
+        _answer_cache.set(key, answer)
+
+
+def replay_answer(answer: str, chunk_words: int = 3) -> Generator:
+    """Yield a cached answer in word chunks so it renders through the streaming UI."""
+    words = answer.split(" ")
+    for i in range(0, len(words), chunk_words):
+        piece = " ".join(words[i:i + chunk_words])
+        yield piece if i + chunk_words >= len(words) else piece + " "
+
+
+def answer_cache_stats() -> dict:
+    return _answer_cache.stats()
@@ -0,0 +1,134 @@
+"""
+Token-budgeted chat history for the AI Assistant.
+
+Keeps the last few turns verbatim and folds older turns into a running
+summary that is computed in the background, so the prompt sent to Ollama
+stays roughly the same size however long the conversation runs.
+
+    memory = ChatMemory(llm_summariser("llama3.2"))
+    summary, recent = memory.window(history)   # history excludes the new question
+"""
+
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+HISTORY_TOKEN_BUDGET = 1200   # summary + verbatim turns sent per request
+KEEP_LAST_TURNS      = 3      # user/assistant pairs always kept verbatim
+SUMMARY_MAX_CHARS    = 1200
+
+_SUMMARY_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="agrichain-summary")
+
+SUMMARY_INSTRUCTIONS = (
+    "You compress farmer–assistant chat logs. Merge the previous summary and the new "
+    "messages into one short summary (max 6 bullet points). Keep crop, district, numbers, "
+    "decisions and open questions. Keep the language the farmer used. Output only the summary."
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) — no tokenizer needed."""
+    return max(1, len(text) // 4) if text else 0
+
+
+def _message_tokens(messages: list) -> int:
+    return sum(estimate_tokens(m["content"]) + 4 for m in messages)
+
+
+def _transcript(messages: list) -> str:
+    who = {"user": "Farmer", "assistant": "AgriBot"}
+    return "\n".join(f"{who.get(m['role'], m['role'])}: {m['content']}" for m in messages)
+
+
+def extractive_summary(previous: str, messages: list) -> str:
+    """Fallback summariser: first sentence of every message, newest kept last."""
+    lines = [previous] if previous else []
+    for m in messages:
+        first = m["content"].strip().split("\n")[0].split(". ")[0]
+        lines.append(f"- {'Farmer' if m['role'] == 'user' else 'AgriBot'}: {first[:160]}")
+    text = "\n".join(lines)
+    return text[-SUMMARY_MAX_CHARS:]
+
+
+def llm_summariser(model_name: str):
+    """Summariser that asks the given Ollama model, falling back to extractive_summary."""
+    def _summarise(previous: str, messages: list) -> str:
+        try:
+            from modules.ai_assistant import build_chain
+            chain = build_chain(model_name, temperature=0.2, num_predict=200)
+            body = (f"Previous summary:\n{previous or '(none)'}\n\n"
+                    f"New messages:\n{_transcript(messages)}")
+            text = chain.invoke({"system_prompt": SUMMARY_INSTRUCTIONS, "history": [], "input": body})
+            return text.strip()[:SUMMARY_MAX_CHARS] or extractive_summary(previous, messages)
+        except Exception:
+            return extractive_summary(previous, messages)
+    return _summarise
+
+
+class ChatMemory:
+    """
+    Rolling summary + recent-turn window over a session's message list.
+    The message list itself stays owned by the page (st.session_state.ai_messages);
+    this object only remembers how much of it has been folded into the summary.
+    """
+
+    def __init__(self, summariser=None, token_budget: int = HISTORY_TOKEN_BUDGET,
+                 keep_last_turns: int = KEEP_LAST_TURNS):
+        self.summariser      = summariser or extractive_summary
+        self.token_budget    = token_budget
+        self.keep_last_turns = keep_last_turns
+        self.summary         = ""
+        self.summarised_upto = 0      # messages [0, summarised_upto) are in the summary
+        self._pending        = None   # (Future, upto) of a background fold
+        self._lock           = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.summary, self.summarised_upto, self._pending = "", 0, None
+
+    def _collect(self):
+        """Adopt a finished background summary, if any."""
+        if self._pending and self._pending[0].done():
+            future, upto = self._pending
+            self._pending = None
+            try:
+                self.summary, self.summarised_upto = future.result(), upto
+            except Exception:
+                pass
+
+    def _schedule(self, history: list, upto: int):
+        if self._pending is None and upto > self.summarised_upto:
+            fold = list(history[self.summarised_upto:upto])
+            future = _SUMMARY_POOL.submit(self.summariser, self.summary, fold)
+            self._pending = (future, upto)
+
+    def window(self, history: list) -> tuple[str, list]:
+        """
+        Return (summary, recent messages) to send with the next question.
+        Never blocks: turns that fall out of the verbatim window are folded into
+        the summary in the background and picked up on a later turn.
+        """
+        with self._lock:
+            if self.summarised_upto > len(history):   # history was cleared
+                self.summary, self.summarised_upto, self._pending = "", 0, None
+            self._collect()
+
+            recent = history[self.summarised_upto:]
+            keep   = self.keep_last_turns * 2
+            budget = self.token_budget - estimate_tokens(self.summary)
+            if len(recent) > keep or _message_tokens(recent) > budget:
+                self._schedule(history, max(self.summarised_upto, len(history) - keep))
+
+            # Until the fold lands, drop the oldest unsummarised turns to stay in budget
+            while len(recent) > 2 and _message_tokens(recent) > budget:
+                recent = recent[2:] if recent[0]["role"] == "user" else recent[1:]
+            return self.summary, list(recent)
+
+    def stats(self) -> dict:
+        return {
+            "summary_tokens":  estimate_tokens(self.summary),
+            "summarised_msgs": self.summarised_upto,
+            "folding":         self._pending is not None,
+        }
@@ -2,6 +2,12 @@ import requests
 import pandas as pd
 import numpy as np
 import os
+import time
+
+from utils.price_store import get_price_store, PriceSlice
+from utils.cache_backend import get_cache, make_key
+from utils.request_control import SingleFlight, TokenBucket
+from utils.circuit_breaker import get_breaker
 
 # ─── Pre-packaged crop data used for CSV generation & scoring ─────────────────
 CROPS = [
@@ -40,6 +46,32 @@ MANDI_MULTIPLIERS = {
     "Sangli APMC":     1.04,
 }
 
+# Weather forecasts are treated as fresh for this long; engine results computed
+# from them are considered stale once the bucket rolls over.
+WEATHER_REFRESH_SECONDS = 3600
+FORECAST_DAYS           = 14   # horizon always fetched; shorter forecasts are slices of it
+
+# Outbound Open-Meteo calls per worker process (its free tier allows 600/min).
+WEATHER_RATE_PER_SEC = float(os.environ.get("AGRICHAIN_WEATHER_RPS", "2"))
+WEATHER_BURST        = int(os.environ.get("AGRICHAIN_WEATHER_BURST", "5"))
+WEATHER_MAX_QUEUE_S  = 5.0   # longest a fetch waits for a token before using fallback data
+
+_weather_flight  = SingleFlight()
+_weather_limiter = TokenBucket(WEATHER_RATE_PER_SEC, WEATHER_BURST, WEATHER_MAX_QUEUE_S)
+
+
+def get_data_version(csv_path: str = "data/agmarknet_prices.csv") -> tuple:
+    """
+    Version stamp for everything the engines read: the price CSV's mtime plus
+    the current weather refresh bucket. Changes whenever a cached engine
+    result could be out of date.
+    """
+    try:
+        mtime = os.path.getmtime(csv_path)
+    except OSError:
+        mtime = 0.0
+    return (mtime, int(time.time() // WEATHER_REFRESH_SECONDS))
+
 
 def generate_synthetic_csv(output_path: str = "data/agmarknet_prices.csv"):
     """Generate synthetic Agmarknet price CSV if not already present."""
@@ -82,29 +114,34 @@ def generate_synthetic_csv(output_path: str = "data/agmarknet_prices.csv"):
     return df
 
 
-def load_mandi_prices(crop: str, state: str = "Maharashtra", csv_path: str = "data/agmarknet_prices.csv") -> pd.DataFrame:
-    """Load and filter mandi price CSV for a given crop."""
+def load_mandi_prices(crop: str, state: str = "Maharashtra", csv_path: str = "data/agmarknet_prices.csv") -> PriceSlice:
+    """
+    Mandi prices for a given crop: a zero-copy view into the memory-mapped
+    price store shared by all workers (call .to_frame() for a DataFrame).
+    """
     generate_synthetic_csv(csv_path)
-    df = pd.read_csv(csv_path)
-    df = df[(df["Commodity"].str.lower() == crop.lower()) & (df["State"] == state)].copy()
-    df["Date"] = pd.to_datetime(df["Arrival_Date"], dayfirst=True)
-    return df.sort_values("Date")
+    return get_price_store(csv_path).slice(crop, state)
 
 
-def get_weekly_price_index(df: pd.DataFrame) -> pd.Series:
+def get_weekly_price_index(df) -> pd.Series:
     """Weekly average Modal_Price grouped by week-of-year."""
+    if isinstance(df, PriceSlice):
+        return df.weekly_index()
     df = df.copy()
     df["week"] = df["Date"].dt.isocalendar().week.astype(int)
     return df.groupby("week")["Modal_Price"].mean()
 
 
-def get_weather_forecast(lat: float, lon: float, days: int = 14) -> dict:
-    """
-    Fetch weather forecast from Open-Meteo (no API key needed).
-    Returns a dict with 'time', 'temperature_2m_max', 'precipitation_sum',
-    'relative_humidity_2m_max' as lists.
-    On error returns synthetic fallback data.
-    """
+class WeatherRateLimited(RuntimeError):
+    """No Open-Meteo token became available within WEATHER_MAX_QUEUE_S."""
+
+
+def _fetch_weather(lat: float, lon: float, days: int) -> dict:
+    """One Open-Meteo call; raises on any failure (CircuitOpenError while Open-Meteo is down)."""
+    breaker = get_breaker("open-meteo")
+    breaker.check()   # fail fast before queueing for a token
+    if not _weather_limiter.acquire():
+        raise WeatherRateLimited("Open-Meteo rate limit queue full")
     url = "https://api.open-meteo.com/v1/forecast"
     params = {
         "latitude":  lat,
@@ -118,20 +155,85 @@ def get_weather_forecast(lat: float, lon: float, days: int = 14) -> dict:
         "forecast_days": days,
         "timezone": "Asia/Kolkata",
     }
-    try:
+    with breaker.guard():
         r = requests.get(url, params=params, timeout=8)
         r.raise_for_status()
         return r.json()["daily"]
+
+
+def _forecast_days(weather: dict, days: int) -> dict:
+    """The first `days` days of a forecast (a copy; cached lists are never handed out)."""
+    return {k: v[:days] if isinstance(v, list) else v for k, v in weather.items()}
+
+
+def fetch_weather_forecast(lat: float, lon: float, days: int = 14) -> dict:
+    """
+    Open-Meteo forecast for the next `days` days, through the shared weather
+    cache. Always fetches FORECAST_DAYS (or more if asked) and slices, so a
+    3-day forecast is exactly the first 3 days of a 14-day one and every
+    caller shares one request per location. Raises on failure.
+    """
+    horizon = max(days, FORECAST_DAYS)
+    cache = get_cache("weather", ttl=WEATHER_REFRESH_SECONDS)
+    key = make_key(round(lat, 4), round(lon, 4), horizon)
+    daily = cache.get(key)
+    if daily is None:
+        def _leader():
+            hit = cache.get(key)   # a flight that just finished may have filled it
+            if hit is not None:
+                return hit
+            fresh = _fetch_weather(lat, lon, horizon)
+            cache.set(key, fresh)
+            return fresh
+
+        daily = _weather_flight.do(key, _leader)
+    return _forecast_days(daily, days)
+
+
+def cached_weather_forecast(lat: float, lon: float, days: int = 14) -> dict | None:
+    """The forecast fetch_weather_forecast would return right now if it is cached, else None (never fetches)."""
+    daily = get_cache("weather", ttl=WEATHER_REFRESH_SECONDS).get(
+        make_key(round(lat, 4), round(lon, 4), max(days, FORECAST_DAYS)))
+    return None if daily is None else _forecast_days(daily, days)
+
+
+def _fallback_weather(days: int) -> dict:
+    """Synthetic forecast for offline use (same first days whatever `days` is)."""
+    import datetime
+    horizon = max(days, FORECAST_DAYS)
+    today = datetime.date.today()
+    rng = np.random.default_rng(0)
+    return _forecast_days({
+        "time":                       [(today + datetime.timedelta(days=i)).isoformat() for i in range(horizon)],
+        "temperature_2m_max":         [float(round(28 + rng.normal(0, 3), 1)) for _ in range(horizon)],
+        "temperature_2m_min":         [float(round(18 + rng.normal(0, 2), 1)) for _ in range(horizon)],
+        "precipitation_sum":          [float(round(max(0, rng.normal(1, 3)), 1)) for _ in range(horizon)],
+        "relative_humidity_2m_max":   [float(round(min(100, max(30, 60 + rng.normal(0, 15))), 1)) for _ in range(horizon)],
+    }, days)
+
+
+def get_weather_forecast(lat: float, lon: float, days: int = 14) -> dict:
+    """
+    Fetch weather forecast from Open-Meteo (no API key needed).
+    Returns a dict with 'time', 'temperature_2m_max', 'precipitation_sum',
+    'relative_humidity_2m_max' as lists.
+    Successful responses are shared by all workers through the weather cache
+    for WEATHER_REFRESH_SECONDS; concurrent misses for the same location share
+    one rate-limited request. On error returns synthetic fallback data
+    (which is not cached, so the next call retries).
+    """
+    try:
+        return fetch_weather_forecast(lat, lon, days)
     except Exception:
         # Fallback: synthetic data so app doesn't crash offline
-        import datetime
-        today = datetime.date.today()
-        dates = [(today + datetime.timedelta(days=i)).isoformat() for i in range(days)]
-        rng = np.random.default_rng(0)
-        return {
-            "time":                       dates,
-            "temperature_2m_max":         [float(round(28 + rng.normal(0, 3), 1)) for _ in range(days)],
-            "temperature_2m_min":         [float(round(18 + rng.normal(0, 2), 1)) for _ in range(days)],
-            "precipitation_sum":          [float(round(max(0, rng.normal(1, 3)), 1)) for _ in range(days)],
-            "relative_humidity_2m_max":   [float(round(min(100, max(30, 60 + rng.normal(0, 15))), 1)) for _ in range(days)],
-        }
+        return _fallback_weather(days)
+
+
+def weather_fetch_stats() -> dict:
+    """Real Open-Meteo requests vs requests coalesced onto one in flight, plus limiter state."""
+    return {
+        "fetches":   _weather_limiter.admitted,   # HTTP requests actually sent
+        "coalesced": _weather_flight.coalesced,
+        "in_flight": _weather_flight.in_flight(),
+        "limiter":   _weather_limiter.stats(),
+    }
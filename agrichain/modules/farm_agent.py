@@ -0,0 +1,182 @@
+"""
+Tool-calling agent mode for the AI Assistant.
+
+Instead of running all three engines up front ("Generate Farm Context"),
+the LLM is given the farmer profile and calls get_harvest_recommendation,
+rank_mandis and assess_spoilage as tools only when a question needs them.
+Tool results are memoised through a caller-supplied `memo` (the page passes
+shared_state.cached_result, so they are reused for the whole session).
+Models that can't call tools (per Ollama's /api/show capabilities, or a
+"does not support tools" refusal) get the same engine data up front through
+the plain chat path instead.
+
+stream_agent_response(model, profile, lang, history, question, memo) → token generator
+"""
+
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+from typing import Generator
+
+from modules.ai_assistant import OLLAMA_BASE, build_chain, build_system_prompt, stream_response
+from utils.circuit_breaker import get_breaker, OPEN
+from modules.farm_context import render_profile, render_harvest, render_mandis, render_spoilage
+
+MAX_TOOL_ROUNDS   = 3
+AGENT_TEMPERATURE = 0.3
+AGENT_NUM_PREDICT = 512
+
+AGENT_INSTRUCTIONS = (
+    "TOOLS: The FARMER DATA below only has the profile. Call a tool when the question needs it — "
+    "harvest_window for harvest timing, best_mandis for where to sell / earnings / transport, "
+    "spoilage_risk for storage and spoilage. Call only the tools you need, then answer from their output."
+)
+
+
+def _local_memo(engine, fn, *args):
+    return fn(*args)
+
+
+def build_tools(profile: dict, memo=None) -> list:
+    """
+    Engine tools bound to the farmer's profile (crop, district, quantity,
+    storage, transit, sowing). They take no arguments, which keeps small
+    local models from hallucinating inputs.
+    """
+    from langchain_core.tools import tool
+    from modules.harvest_engine import get_harvest_recommendation
+    from modules.mandi_ranker import rank_mandis
+    from modules.spoilage_assessor import assess_spoilage
+
+    memo = memo or _local_memo
+    p = profile
+
+    def _run(engine, fn, *args):
+        try:
+            return memo(engine, fn, *args)
+        except Exception as e:
+            return e
+
+    @tool
+    def harvest_window() -> str:
+        """Best 5-day harvest window, expected price premium and reasons for the farmer's crop."""
+        return render_harvest(_run("harvest", get_harvest_recommendation,
+                                   p["crop"], p["district"], p["sowing"]))
+
+    @tool
+    def best_mandis() -> str:
+        """Top 3 mandis ranked by net profit per quintal after transport from the farmer's district."""
+        return render_mandis(_run("mandi", rank_mandis,
+                                  p["crop"], p["quantity"], p["district"], 3))
+
+    @tool
+    def spoilage_risk() -> str:
+        """Post-harvest spoilage risk level, reason and top preservation action."""
+        return render_spoilage(_run("spoilage", assess_spoilage,
+                                    p["crop"], p["district"], p["quantity"],
+                                    p["storage"], p["transit"]))
+
+    return [harvest_window, best_mandis, spoilage_risk]
+
+
+# ─── Tool support per model ────────────────────────────────────────────────────
+_tool_support      = {}   # model -> bool (from /api/show, or learnt from a refusal)
+_tool_support_lock = threading.Lock()
+
+
+def supports_tools(model_name: str) -> bool:
+    """Whether Ollama reports the model can call tools (True when it can't tell)."""
+    with _tool_support_lock:
+        if model_name in _tool_support:
+            return _tool_support[model_name]
+    if get_breaker("ollama").state == OPEN:
+        return True   # the stream itself fails fast
+    import requests
+    try:
+        r = requests.post(f"{OLLAMA_BASE}/api/show", json={"model": model_name}, timeout=5)
+        capabilities = r.json().get("capabilities") if r.ok else None
+    except Exception:
+        return True   # unknown for now: try tools, a refusal falls back below
+    supported = capabilities is None or "tools" in capabilities   # older Ollama: no capabilities field
+    with _tool_support_lock:
+        _tool_support[model_name] = supported
+    return supported
+
+
+def _refuses_tools(error: Exception) -> bool:
+    return "does not support tools" in str(error)
+
+
+def _stream_with_context(model_name, profile, lang, history, user_input, tools, memory) -> Generator:
+    """Fallback for models without tool calling: all engine data in the system prompt."""
+    context = "\n".join([
+        render_profile(profile["crop"], profile["district"], profile["quantity"],
+                       profile["storage"], profile["transit"], profile["sowing"]),
+        *(t.invoke({}) for t in tools),
+    ])
+    return stream_response(build_chain(model_name), build_system_prompt(context, lang),
+                           history, user_input, memory=memory)
+
+
+def build_agent_prompt(profile: dict, lang: str = "en") -> str:
+    """System prompt with the profile only; engine data arrives through tools."""
+    ctx = render_profile(profile["crop"], profile["district"], profile["quantity"],
+                         profile["storage"], profile["transit"], profile["sowing"])
+    return build_system_prompt(f"{AGENT_INSTRUCTIONS}\n\n{ctx}", lang)
+
+
+def stream_agent_response(model_name: str, profile: dict, lang: str, history: list,
+                          user_input: str, memo=None, on_tool=None, memory=None) -> Generator:
+    """
+    Run the tool-calling loop and stream the final answer. `on_tool(name)` is
+    called before each tool runs so the UI can show progress.
+    """
+    from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, ToolMessage
+
+    tools = build_tools(profile, memo)
+    if not supports_tools(model_name):
+        yield from _stream_with_context(model_name, profile, lang, history, user_input, tools, memory)
+        return
+    by_name = {t.name: t for t in tools}
+    # The chat model of the process-wide cached chain for these parameters
+    llm = build_chain(model_name, temperature=AGENT_TEMPERATURE, num_predict=AGENT_NUM_PREDICT).steps[1]
+
+    past = history[:-1]   # exclude the latest user message
+    messages = [SystemMessage(content=build_agent_prompt(profile, lang))]
+    if memory is not None:
+        summary, past = memory.window(past)
+        if summary:
+            messages.append(SystemMessage(content=f"Summary of the earlier conversation:\n{summary}"))
+    for msg in past:
+        if msg["role"] == "user":
+            messages.append(HumanMessage(content=msg["content"]))
+        elif msg["role"] == "assistant":
+            messages.append(AIMessage(content=msg["content"]))
+    messages.append(HumanMessage(content=user_input))
+
+    for round_no in range(MAX_TOOL_ROUNDS + 1):
+        # Last round: no tools bound, so the model has to answer
+        model = llm.bind_tools(tools) if round_no < MAX_TOOL_ROUNDS else llm
+        gathered = None
+        try:
+            for chunk in model.stream(messages):
+                gathered = chunk if gathered is None else gathered + chunk
+                if chunk.content and not gathered.tool_call_chunks:
+                    yield chunk.content
+        except Exception as exc:
+            if round_no == 0 and gathered is None and _refuses_tools(exc):
+                with _tool_support_lock:
+                    _tool_support[model_name] = False
+                yield from _stream_with_context(model_name, profile, lang, history, user_input, tools, memory)
+                return
+            raise
+        if gathered is None or not gathered.tool_calls:
+            return
+        messages.append(gathered)
+        for call in gathered.tool_calls:
+            if on_tool:
+                on_tool(call["name"])
+            tool_fn = by_name.get(call["name"])
+            output = tool_fn.invoke({}) if tool_fn else f"Unknown tool: {call['name']}"
+            messages.append(ToolMessage(content=output, tool_call_id=call["id"]))
@@ -0,0 +1,106 @@
+"""
+Structured farm context for the AI Assistant.
+
+FarmContext holds the farmer's inputs and the raw engine outputs, so the UI
+reads fields directly instead of scraping text, and renders a compact,
+token-minimal serialization for the LLM prompt.
+
+    ctx = build_farm_context(...)        # modules.ai_assistant
+    ctx.top_mandi, ctx.risk_level        # UI
+    ctx.to_prompt(), ctx.token_count     # LLM
+"""
+
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import datetime
+from dataclasses import dataclass, field
+
+from modules.chat_memory import estimate_tokens
+
+
+# ── Compact section renderers (also used for agent tool outputs) ──────────────
+def render_profile(crop, district, quantity_qtl, storage_type, transit_hours, sowing_date) -> str:
+    return (f"PROFILE crop={crop}; district={district}, Maharashtra; qty={quantity_qtl:g} qtl; "
+            f"storage={storage_type}; transit={transit_hours:g} h; sown={sowing_date.isoformat()}")
+
+
+def render_harvest(h) -> str:
+    if isinstance(h, Exception) or not h:
+        return f"HARVEST unavailable ({h})" if h else "HARVEST unavailable"
+    sc = h["score_components"]
+    why = "; ".join(h["reasons"]) or "n/a"
+    return (f"HARVEST window={h['recommended_window']['start']} to {h['recommended_window']['end']}; "
+            f"premium={h['expected_price_premium']}; confidence={h['confidence']}; "
+            f"scores price/weather/soil={sc['price_seasonality']:.0%}/{sc['weather']:.0%}/{sc['soil_readiness']:.0%}\n"
+            f" why: {why}")
+
+
+def render_mandis(mandis) -> str:
+    if isinstance(mandis, Exception) or not mandis:
+        return f"MANDIS unavailable ({mandis})" if mandis else "MANDIS unavailable"
+    rows = [
+        f" {i}. {m['mandi']}: net ₹{m['net_profit_per_qtl']:,.0f} (price ₹{m['expected_price']:,.0f}, "
+        f"transport ₹{m['transport_cost_qtl']:,.0f}, {m['distance_km']:.0f} km)"
+        for i, m in enumerate(mandis, 1)
+    ]
+    return "MANDIS ranked by net ₹/qtl after transport:\n" + "\n".join(rows)
+
+
+def render_spoilage(s) -> str:
+    if isinstance(s, Exception) or not s:
+        return f"SPOILAGE unavailable ({s})" if s else "SPOILAGE unavailable"
+    top = s["actions"][0] if s["actions"] else None
+    do  = f"; do: {top['action']} ({top['cost']}, {top['effectiveness']})" if top else ""
+    return f"SPOILAGE risk={s['risk_level']} {s['spoilage_probability']}; why: {s['reason']}{do}"
+
+
+@dataclass(slots=True)
+class FarmContext:
+    crop:          str
+    district:      str
+    quantity_qtl:  float
+    storage_type:  str
+    transit_hours: float
+    sowing_date:   datetime.date
+    harvest:       dict | None = None
+    mandis:        list | None = None
+    spoilage:      dict | None = None
+    errors:        dict = field(default_factory=dict)    # engine -> Exception
+    timings:       dict = field(default_factory=dict)    # step -> seconds (None = cached)
+    _prompt:       str | None = field(default=None, repr=False, compare=False)
+
+    # ── UI accessors ──────────────────────────────────────────────────────────
+    @property
+    def harvest_premium(self) -> str:
+        return self.harvest["expected_price_premium"] if self.harvest else "—"
+
+    @property
+    def top_mandi(self) -> str:
+        return self.mandis[0]["mandi"] if self.mandis else "—"
+
+    @property
+    def risk_level(self) -> str:
+        return self.spoilage["risk_level"] if self.spoilage else "—"
+
+    def results(self) -> dict:
+        """Engine outputs keyed like the shared-state cache ("harvest", "mandi", "spoilage")."""
+        return {"harvest": self.harvest, "mandi": self.mandis, "spoilage": self.spoilage}
+
+    # ── Prompt serialization ──────────────────────────────────────────────────
+    def to_prompt(self) -> str:
+        """Compact text for the system prompt (rendered once, then reused)."""
+        if self._prompt is None:
+            self._prompt = "\n".join([
+                render_profile(self.crop, self.district, self.quantity_qtl,
+                               self.storage_type, self.transit_hours, self.sowing_date),
+                render_harvest(self.harvest or self.errors.get("harvest")),
+                render_mandis(self.mandis or self.errors.get("mandi")),
+                render_spoilage(self.spoilage or self.errors.get("spoilage")),
+            ])
+        return self._prompt
+
+    @property
+    def token_count(self) -> int:
+        """Estimated tokens of the rendered context."""
+        return estimate_tokens(self.to_prompt())
@@ -0,0 +1,295 @@
+"""
+Deterministic fast-path answers for the AI Assistant.
+
+Questions like "How much will I earn?" or "What is my spoilage risk?" are
+fully answered by numbers the engines already produced. A small intent
+classifier (regex rules, then a char-n-gram scikit-learn model trained on
+English / Hinglish / Hindi / Marathi examples) routes those to templated
+answers; anything open-ended returns None and goes to Ollama. So does a
+question that sets its own conditions ("…if I sell at Nashik instead?",
+"…with cold storage?", "…for 80 quintals?"): the engine results describe
+the farmer's current inputs, not the ones in the question.
+
+fast_answer(question, results, quantity_qtl, lang) → answer str or None
+"""
+
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import re
+import threading
+
+from utils.translator import t
+
+INTENTS = ("harvest_time", "best_mandi", "earnings", "spoilage_risk", "other")
+
+# Minimum classifier probability before we trust the model over the LLM
+MIN_CONFIDENCE = 0.6
+
+# ── High-precision rules (checked first) ──────────────────────────────────────
+# Gaps between key words are bounded (a few words), not ".*" across the question.
+_GAP = r"(?:\S+\s+){0,4}?"
+
+_RULES = [
+    ("earnings", re.compile(
+        rf"\bhow much {_GAP}(earn|make|get|profit|income)|\btotal (earning|profit|income)|"
+        rf"\bkitna {_GAP}(kama|milega|paisa|munafa)|\bkiti {_GAP}(kamai|milel|nafa)|"
+        rf"\b(munafa|kamai|paisa|nafa) {_GAP}(kitna|kitni|kiti)\b|"
+        rf"कितनी {_GAP}(कमाई|कमा)|कितना {_GAP}(मुनाफा|पैसा|मिलेगा)|किती {_GAP}(कमाई|नफा|पैसे|मिळ)", re.I)),
+    ("spoilage_risk", re.compile(
+        rf"\bspoil(age)? risk|\brisk of spoil|\bwill {_GAP}(rot|spoil)|"
+        r"\bkharab hone|\bkharab ho|\bnaasadi|\bnasadi|"
+        r"खराब होने|खराबी|सड़ने|नासाडी|खराब होण्या", re.I)),
+    ("best_mandi", re.compile(
+        rf"\b(which|best|top) (mandi|market|apmc)|\bwhere {_GAP}(sell|bech)|"
+        rf"\b(kaun|kaunsi|konsi|kon|kuthe) {_GAP}(mandi|market|bajar|bazaar)|\bkaha bech|\bkuthe vik|"
+        r"कौन सी मंडी|किस मंडी|कहाँ बेच|कहां बेच|कोणत्या (बाजार|मंडी)|कुठे विक", re.I)),
+    ("harvest_time", re.compile(
+        r"\bwhen (should|shall|can|could|do|must|will) (i|we) (\S+ )?(harvest|cut|pick)|"
+        r"\bwhen to (\S+ )?(harvest|cut|pick)|"
+        rf"\bbest (time|day|date|window) {_GAP}harvest|\bharvest (time|date|window)|"
+        rf"\bkab {_GAP}(kaat|katai|tod)|\bkadhi {_GAP}(kadh|kapani)|"
+        rf"कब {_GAP}(काट|कटाई|तोड़)|कटाई कब|काढणी केव्हा|कापणी केव्हा|केव्हा {_GAP}(काढ|कापणी)", re.I)),
+]
+
+# ── Conditions the question sets itself (answered by the LLM, not templates) ──
+_CONDITION = re.compile(
+    r"\b(if|instead|rather|suppose|unless|otherwise|agar|yadi|jar|aivaji|bajaye)\b|"
+    r"अगर|यदि|बजाय|ऐवजी|\bजर\b|"
+    r"\b(cold|warehouse|godown|godam|open field|open air)\b|"
+    r"कोल्ड|शीतगृह|गोदाम|वेयरहाउस|खुले|उघड्या|"
+    r"[0-9०-९]", re.I)
+
+# Romanised Hindi / Marathi: reply with the romanised hi / mr templates, not English
+_ROMAN_HI = {"kab", "kaun", "kaunsi", "konsi", "kaha", "kahan", "kitna", "kitni", "kitne", "mera", "meri",
+             "mujhe", "hoga", "hogi", "milega", "kya", "hai", "kaise", "munafa", "kamai", "fasal", "bechu",
+             "bechna", "kharab", "chahiye", "sabse", "paisa", "katai", "kaatna", "mein", "nahi"}
+_ROMAN_MR = {"kadhi", "kuthe", "kiti", "mala", "majha", "maza", "majhe", "ahe", "aahe", "milel", "miltil",
+             "nafa", "vikav", "viku", "kay", "hoil", "kasa", "kashi", "pik", "kapani", "naasadi", "nasadi"}
+
+_places      = None
+_places_lock = threading.Lock()
+
+# ── Training examples for the fallback model ─────────────────────────────────
+_EXAMPLES = {
+    "harvest_time": [
+        "When should I harvest?", "When is the best time to harvest my crop",
+        "Which day should I cut my tomatoes", "Is it time to harvest yet",
+        "Mera fasal kab kaatna chahiye", "Katai kab karu", "fasal kab todna hai",
+        "मेरी फसल कब काटूं", "कटाई कब करनी चाहिए", "फसल काटने का सही समय क्या है",
+        "पीक कधी काढावे", "काढणी केव्हा करावी", "कापणीची योग्य वेळ कोणती",
+    ],
+    "best_mandi": [
+        "Which mandi gives the best profit?", "Where should I sell my onions",
+        "Best market to sell", "Which APMC pays the most",
+        "Konsi mandi me bechu", "Kaha bechna sahi rahega", "Sabse acchi mandi kaunsi hai",
+        "कौन सी मंडी सबसे अच्छी है", "कहाँ बेचूं", "किस मंडी में ज्यादा भाव मिलेगा",
+        "कोणत्या बाजारात विकू", "माल कुठे विकावा", "सर्वात चांगली बाजार समिती कोणती",
+    ],
+    "earnings": [
+        "How much will I earn from this harvest?", "What will be my total profit",
+        "How much money will I make", "Total income after transport",
+        "Kitna paisa milega", "Mujhe kitna munafa hoga", "Kitni kamai hogi",
+        "मुझे कितनी कमाई होगी", "कितना मुनाफा मिलेगा", "कुल कमाई कितनी होगी",
+        "मला किती नफा मिळेल", "किती पैसे मिळतील", "एकूण कमाई किती होईल",
+    ],
+    "spoilage_risk": [
+        "What is my spoilage risk?", "Will my produce spoil", "How risky is storage for my crop",
+        "Chance of rotting during transport",
+        "Fasal kharab hone ka khatra kitna hai", "Mal kharab to nahi hoga",
+        "फसल खराब होने का खतरा", "क्या मेरा माल सड़ जाएगा", "खराबी का जोखिम कितना है",
+        "माल खराब होण्याचा धोका किती", "नासाडीची शक्यता किती आहे", "पीक सडेल का",
+    ],
+    "other": [
+        "How can I reduce transport costs?", "How does the weather affect my crop?",
+        "What storage should I use?", "Are prices good right now?",
+        "What fertilizer should I use", "How to control pests on tomato", "Explain why prices fall in winter",
+        "Should I store or sell now and why", "Compare cold storage and warehouse",
+        "Is it going to rain when I harvest?",
+        "Barish ka kya asar hoga", "Keede kaise bhagaye", "Kya abhi bechna sahi hai ya rukna chahiye",
+        "बारिश से फसल पर क्या असर होगा", "खाद कौन सी डालूं", "कीड़ों से कैसे बचाएं",
+        "हवामानाचा पिकावर काय परिणाम होईल", "कोणते खत वापरावे", "साठवणूक कशी करावी",
+    ],
+}
+
+_model      = None
+_model_lock = threading.Lock()
+
+
+def _get_model():
+    """Train the char-n-gram classifier once per process (≈ tens of ms)."""
+    global _model
+    with _model_lock:
+        if _model is None:
+            try:
+                from sklearn.feature_extraction.text import TfidfVectorizer
+                from sklearn.linear_model import LogisticRegression
+                from sklearn.pipeline import make_pipeline
+            except ImportError:
+                _model = False   # rules only
+                return _model
+            texts  = [q for qs in _EXAMPLES.values() for q in qs]
+            labels = [intent for intent, qs in _EXAMPLES.items() for _ in qs]
+            _model = make_pipeline(
+                TfidfVectorizer(analyzer="char_wb", ngram_range=(2, 4), lowercase=True, sublinear_tf=True),
+                LogisticRegression(max_iter=1000, C=4.0),
+            ).fit(texts, labels)
+        return _model
+
+
+def classify_intent(question: str) -> tuple[str, float]:
+    """Return (intent, confidence). Rules give confidence 1.0."""
+    for intent, pattern in _RULES:
+        if pattern.search(question):
+            return intent, 1.0
+    model = _get_model()
+    if not model:
+        return "other", 0.0
+    probs = model.predict_proba([question])[0]
+    best  = probs.argmax()
+    return str(model.classes_[best]), float(probs[best])
+
+
+# ── Templates ─────────────────────────────────────────────────────────────────
+_TEMPLATES = {
+    "en": {
+        "harvest_time":  "The best time to harvest your {crop} is **{start} to {end}**. "
+                         "Expected price premium is about **{premium}** ({confidence} confidence). {reason}.",
+        "best_mandi":    "Sell at **{mandi}** — expected ₹{price:,.0f}/qtl, transport ₹{transport:,.0f}/qtl, "
+                         "net **₹{net:,.0f}/qtl** ({dist:.0f} km). Next best: {mandi2} (net ₹{net2:,.0f}/qtl).",
+        "earnings":      "Selling {qty:,.0f} qtl at **{mandi}** gives about **₹{total:,.0f}** net after transport "
+                         "(gross ₹{gross:,.0f}, transport ₹{transport_total:,.0f}).",
+        "spoilage_risk": "Your spoilage risk is **{level}** ({prob} probability). {reason}. "
+                         "Most important step: {action} ({cost}).",
+    },
+    "hi": {
+        "harvest_time":  "आपकी {crop} फसल की कटाई का सबसे अच्छा समय **{start} से {end}** है। "
+                         "अनुमानित अतिरिक्त मूल्य लगभग **{premium}** ({confidence_t})।",
+        "best_mandi":    "**{mandi}** में बेचें — अपेक्षित भाव ₹{price:,.0f}/क्विंटल, परिवहन ₹{transport:,.0f}/क्विंटल, "
+                         "शुद्ध लाभ **₹{net:,.0f}/क्विंटल** ({dist:.0f} किमी)। दूसरा विकल्प: {mandi2} (₹{net2:,.0f}/क्विंटल)।",
+        "earnings":      "**{mandi}** में {qty:,.0f} क्विंटल बेचने पर परिवहन के बाद लगभग **₹{total:,.0f}** शुद्ध कमाई होगी "
+                         "(कुल ₹{gross:,.0f}, परिवहन ₹{transport_total:,.0f})।",
+        "spoilage_risk": "खराबी का जोखिम **{level_t}** है ({prob} संभावना)। सबसे ज़रूरी कदम: {action} ({cost})।",
+    },
+    "mr": {
+        "harvest_time":  "तुमच्या {crop} पिकाच्या काढणीसाठी सर्वोत्तम वेळ **{start} ते {end}** आहे. "
+                         "अपेक्षित जादा भाव सुमारे **{premium}** ({confidence_t}).",
+        "best_mandi":    "**{mandi}** येथे विका — अपेक्षित भाव ₹{price:,.0f}/क्विंटल, वाहतूक ₹{transport:,.0f}/क्विंटल, "
+                         "निव्वळ नफा **₹{net:,.0f}/क्विंटल** ({dist:.0f} किमी). दुसरा पर्याय: {mandi2} (₹{net2:,.0f}/क्विंटल).",
+        "earnings":      "**{mandi}** येथे {qty:,.0f} क्विंटल विकल्यास वाहतुकीनंतर सुमारे **₹{total:,.0f}** निव्वळ कमाई होईल "
+                         "(एकूण ₹{gross:,.0f}, वाहतूक ₹{transport_total:,.0f}).",
+        "spoilage_risk": "नासाडीचा धोका **{level_t}** आहे ({prob} शक्यता). सर्वात महत्त्वाची कृती: {action} ({cost}).",
+    },
+    # Romanised questions get romanised replies, as build_system_prompt asks of the LLM
+    "hi-Latn": {
+        "harvest_time":  "Aapki {crop} fasal ki katai ka sabse accha samay **{start} se {end}** hai. "
+                         "Anumanit extra bhav lagbhag **{premium}** (confidence: {confidence}).",
+        "best_mandi":    "**{mandi}** mein bechein — anumanit bhav ₹{price:,.0f}/quintal, transport ₹{transport:,.0f}/quintal, "
+                         "shuddh munafa **₹{net:,.0f}/quintal** ({dist:.0f} km). Doosra vikalp: {mandi2} (₹{net2:,.0f}/quintal).",
+        "earnings":      "**{mandi}** mein {qty:,.0f} quintal bechne par transport ke baad lagbhag **₹{total:,.0f}** "
+                         "shuddh kamai hogi (kul ₹{gross:,.0f}, transport ₹{transport_total:,.0f}).",
+        "spoilage_risk": "Kharab hone ka khatra **{level}** hai ({prob} sambhavna). Sabse zaroori kadam: {action} ({cost}).",
+    },
+    "mr-Latn": {
+        "harvest_time":  "Tumchya {crop} pikachya kadhanisathi sarvottam vel **{start} te {end}** aahe. "
+                         "Apekshit jaasta bhav sumare **{premium}** (confidence: {confidence}).",
+        "best_mandi":    "**{mandi}** yethe vika — apekshit bhav ₹{price:,.0f}/quintal, vahatuk ₹{transport:,.0f}/quintal, "
+                         "nivval nafa **₹{net:,.0f}/quintal** ({dist:.0f} km). Dusra paryay: {mandi2} (₹{net2:,.0f}/quintal).",
+        "earnings":      "**{mandi}** yethe {qty:,.0f} quintal viklyas vahatukinantar sumare **₹{total:,.0f}** "
+                         "nivval kamai hoil (ekun ₹{gross:,.0f}, vahatuk ₹{transport_total:,.0f}).",
+        "spoilage_risk": "Naasadicha dhoka **{level}** aahe ({prob} shakyata). Sarvat mahatvachi kruti: {action} ({cost}).",
+    },
+}
+
+_DEVANAGARI = re.compile(r"[ऀ-ॿ]")
+_WORDS      = re.compile(r"[a-z]+")
+
+
+def _answer_lang(question: str, lang: str) -> str:
+    """
+    Reply in the language and script the farmer used: Devanagari → hi/mr
+    (by UI language), romanised Hindi / Marathi → hi-Latn / mr-Latn by
+    marker words, else en.
+    """
+    if _DEVANAGARI.search(question):
+        return "mr" if lang == "mr" else "hi"
+    words = set(_WORDS.findall(question.lower()))
+    hi, mr = len(words & _ROMAN_HI), len(words & _ROMAN_MR)
+    if mr > hi or (mr and lang == "mr"):
+        return "mr-Latn"
+    return "hi-Latn" if hi else "en"
+
+
+def _place_pattern():
+    """Every district / mandi name in English, Hindi and Marathi (built once)."""
+    global _places
+    with _places_lock:
+        if _places is None:
+            from utils.geo import DISTRICT_COORDS, MANDI_COORDS
+            from utils.geo_translate import _OVERRIDES_HI, _OVERRIDES_MR, _transliterate_name
+
+            names = set(DISTRICT_COORDS) | {m.replace(" APMC", "") for m in MANDI_COORDS}
+            variants = set(names)
+            for name in names:
+                variants.add(_transliterate_name(name, "hi", _OVERRIDES_HI))
+                variants.add(_transliterate_name(name, "mr", _OVERRIDES_MR))
+            alternatives = "|".join(re.escape(v) for v in sorted(variants, key=len, reverse=True))
+            _places = re.compile(rf"(?<!\w)({alternatives})(?!\w)", re.I)
+        return _places
+
+
+def has_own_conditions(question: str) -> bool:
+    """True if the question names a place, storage type or quantity, or asks "what if"."""
+    return bool(_CONDITION.search(question) or _place_pattern().search(question))
+
+
+def _fields(intent: str, results: dict, crop: str, quantity_qtl: float, lang: str) -> dict | None:
+    if intent == "harvest_time":
+        h = results.get("harvest")
+        if not isinstance(h, dict):
+            return None
+        return {
+            "crop": crop, "start": h["recommended_window"]["start"], "end": h["recommended_window"]["end"],
+            "premium": h["expected_price_premium"], "confidence": h["confidence"],
+            "confidence_t": f"{t('Confidence', lang)}: {t(h['confidence'], lang)}",
+            "reason": h["reasons"][0] if h["reasons"] else "",
+        }
+    if intent in ("best_mandi", "earnings"):
+        mandis = results.get("mandi")
+        if not isinstance(mandis, list) or not mandis:
+            return None
+        best, second = mandis[0], mandis[1] if len(mandis) > 1 else mandis[0]
+        return {
+            "mandi": best["mandi"], "price": best["expected_price"], "transport": best["transport_cost_qtl"],
+            "net": best["net_profit_per_qtl"], "dist": best["distance_km"],
+            "mandi2": second["mandi"], "net2": second["net_profit_per_qtl"],
+            "qty": quantity_qtl, "total": best["net_profit_per_qtl"] * quantity_qtl,
+            "gross": best["expected_price"] * quantity_qtl, "transport_total": best["total_transport"],
+        }
+    if intent == "spoilage_risk":
+        s = results.get("spoilage")
+        if not isinstance(s, dict) or not s["actions"]:
+            return None
+        return {
+            "level": s["risk_level"], "level_t": t(s["risk_level"], lang), "prob": s["spoilage_probability"],
+            "reason": s["reason"], "action": s["actions"][0]["action"], "cost": s["actions"][0]["cost"],
+        }
+    return None
+
+
+def fast_answer(question: str, results: dict, crop: str, quantity_qtl: float,
+                lang: str = "en") -> str | None:
+    """
+    Templated answer computed from engine `results` ({"harvest", "mandi",
+    "spoilage"}), or None if the question should go to the LLM.
+    """
+    if has_own_conditions(question):
+        return None
+    intent, confidence = classify_intent(question)
+    if intent == "other" or confidence < MIN_CONFIDENCE:
+        return None
+    reply_lang = _answer_lang(question, lang)
+    fields = _fields(intent, results, crop, quantity_qtl, reply_lang.split("-")[0])
+    if fields is None:
+        return None
+    return _TEMPLATES[reply_lang][intent].format(**fields)
@@ -26,16 +26,14 @@ CROP_MATURITY_DAYS = {
 }
 
 
-def _price_seasonality_score(crop: str, target_week: int) -> float:
+def _price_seasonality_score(weekly_idx: pd.Series, target_week: int) -> float:
     """
     Returns a score 0–1 based on how good the target week is historically
-    for the given crop.
+    for the crop whose weekly price index is given.
     """
-    df = load_mandi_prices(crop)
-    if df.empty:
+    if weekly_idx.empty:
         return 0.5
 
-    weekly_idx = get_weekly_price_index(df)
     if target_week not in weekly_idx.index:
         target_week = weekly_idx.index[0]
 
@@ -86,29 +84,24 @@ def _soil_readiness_score(crop: str, days_since_sowing: int) -> float:
         return float(max(0, 1 - (ratio - 1.1) * 3))  # Overdue penalty
 
 
-def get_harvest_recommendation(
-    crop: str,
-    district: str,
-    sowing_date: datetime.date,
-) -> dict:
-    """
-    Returns the recommended harvest window and supporting data.
-    """
-    today = datetime.date.today()
-    days_since_sowing = (today - sowing_date).days
-
-    # Fetch weather
-    lat, lon = DISTRICT_COORDS.get(district, (18.5204, 73.8567))
-    weather = get_weather_forecast(lat, lon, days=14)
-
-    # Score each of the next 7 days as a potential start of harvest window
-    scores = []
+def _window_components(weekly_idx: pd.Series, weather: dict, today: datetime.date) -> list[tuple]:
+    """(date, price seasonality, weather score) for each of the next 7 candidate start days."""
+    components = []
     for start in range(7):
         candidate_date = today + datetime.timedelta(days=start)
         target_week = int(candidate_date.strftime("%V"))
+        components.append((
+            candidate_date,
+            _price_seasonality_score(weekly_idx, target_week),
+            _weather_score(weather, start_day=start, window=7),
+        ))
+    return components
 
-        ps = _price_seasonality_score(crop, target_week)
-        ws = _weather_score(weather, start_day=start, window=7)
+
+def _best_window(components: list[tuple], crop: str, days_since_sowing: int) -> dict:
+    """Score each candidate start (adding soil readiness) and return the best one."""
+    scores = []
+    for start, (candidate_date, ps, ws) in enumerate(components):
         sr = _soil_readiness_score(crop, days_since_sowing + start)
 
         total = 0.5 * ps + 0.3 * ws + 0.2 * sr
@@ -120,8 +113,22 @@ def get_harvest_recommendation(
             "soil_readiness":    round(sr, 3),
             "total":             round(total, 3),
         })
+    return max(scores, key=lambda x: x["total"])
+
+
+def _chart_data(weekly_idx: pd.Series, today: datetime.date) -> list[dict]:
+    """14-day price forecast for the chart."""
+    chart_data = []
+    for i in range(14):
+        d = today + datetime.timedelta(days=i)
+        wk = int(d.strftime("%V"))
+        p = weekly_idx.get(wk, weekly_idx.mean()) if not weekly_idx.empty else 1800
+        chart_data.append({"Date": d.isoformat(), "Price (₹/qtl)": round(float(p))})
+    return chart_data
+
 
-    best = max(scores, key=lambda x: x["total"])
+def _harvest_result(best: dict, crop: str, days_since_sowing: int, weather: dict, chart_data: list) -> dict:
+    """Assemble the recommendation for the best-scoring window."""
     best_start = best["date"]
     best_end   = best_start + datetime.timedelta(days=5)
 
@@ -143,16 +150,6 @@ def get_harvest_recommendation(
         days_since_sowing,
     )
 
-    # Build 14-day price forecast for chart
-    df = load_mandi_prices(crop)
-    weekly_idx = get_weekly_price_index(df)
-    chart_data = []
-    for i in range(14):
-        d = today + datetime.timedelta(days=i)
-        wk = int(d.strftime("%V"))
-        p = weekly_idx.get(wk, weekly_idx.mean()) if not weekly_idx.empty else 1800
-        chart_data.append({"Date": d.isoformat(), "Price (₹/qtl)": round(float(p))})
-
     return {
         "recommended_window": {
             "start": best_start.strftime("%B %d, %Y"),
@@ -166,3 +163,31 @@ def get_harvest_recommendation(
         "chart_data": chart_data,
         "score_components": {k: best[k] for k in ("price_seasonality", "weather", "soil_readiness")},
     }
+
+
+def get_harvest_recommendation(
+    crop: str,
+    district: str,
+    sowing_date: datetime.date,
+    weather: dict | None = None,
+    prices: pd.DataFrame | None = None,
+) -> dict:
+    """
+    Returns the recommended harvest window and supporting data.
+    `weather` (14-day forecast) and `prices` (load_mandi_prices(crop)) may be
+    passed in when the caller has already fetched them.
+    """
+    today = datetime.date.today()
+    days_since_sowing = (today - sowing_date).days
+
+    # Fetch weather
+    if weather is None:
+        lat, lon = DISTRICT_COORDS.get(district, (18.5204, 73.8567))
+        weather = get_weather_forecast(lat, lon, days=14)
+
+    df = prices if prices is not None else load_mandi_prices(crop)
+    weekly_idx = get_weekly_price_index(df)
+
+    # Score each of the next 7 days as a potential start of harvest window
+    best = _best_window(_window_components(weekly_idx, weather, today), crop, days_since_sowing)
+    return _harvest_result(best, crop, days_since_sowing, weather, _chart_data(weekly_idx, today))
@@ -0,0 +1,242 @@
+"""
+Retrieval over the local agronomy knowledge base (data/knowledge/*.md).
+
+Each markdown file is split into passages at its "## " headings and indexed
+with BM25 over hashed term counts (scikit-learn HashingVectorizer), so a
+file can be re-indexed on its own without refitting a vocabulary. The index
+is persisted next to the documents and only files whose mtime changed are
+re-read on the next refresh.
+
+Only the top-k passages for a question are sent to the LLM, and they go into
+the user turn, so the system prompt (and Ollama's prompt cache) stays fixed.
+
+    passages = retrieve("How do I store onions?")
+    llm_input = augment_question(question, passages)
+"""
+
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import glob
+import pickle
+import re
+import threading
+import time
+
+KNOWLEDGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "knowledge")
+INDEX_PATH    = os.path.join(KNOWLEDGE_DIR, ".index.pkl")
+INDEX_VERSION = 2
+
+TOP_K      = 3
+MIN_SCORE  = 2.0      # below this a passage is noise, not grounding
+N_FEATURES = 2 ** 18
+BM25_K1    = 1.5
+BM25_B     = 0.75
+
+
+def split_passages(text: str, source: str) -> list[dict]:
+    """One passage per "## " section; the "# " title is kept as context."""
+    doc_title, passages, title, lines = "", [], None, []
+
+    def _flush():
+        body = " ".join(l.strip() for l in lines if l.strip())
+        if title and body:
+            passages.append({"source": source, "title": title, "doc": doc_title, "text": body})
+
+    for line in text.splitlines():
+        if line.startswith("## "):
+            _flush()
+            title, lines = line[3:].strip(), []
+        elif line.startswith("# "):
+            doc_title = line[2:].strip()
+        else:
+            lines.append(line)
+    _flush()
+    return passages
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+|[\u0900-\u097F]+")
+_SUFFIXES = ("ing", "ed", "es", "age", "s", "e")
+
+
+def _stem(word: str) -> str:
+    """Crude suffix stripping so "onions"/"onion" and "storage"/"stored"/"store" meet."""
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4 and not word.endswith("ss"):
+            return word[: -len(suffix)]
+    return word
+
+
+def analyze(text: str) -> list[str]:
+    from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+    return [_stem(w) for w in _TOKEN_RE.findall(text.lower()) if w not in ENGLISH_STOP_WORDS]
+
+
+def _vectorizer():
+    from sklearn.feature_extraction.text import HashingVectorizer
+    return HashingVectorizer(n_features=N_FEATURES, alternate_sign=False, norm=None, analyzer=analyze)
+
+
+class KnowledgeBase:
+    """BM25 index over the passages of every *.md file in `directory`."""
+
+    def __init__(self, directory: str = KNOWLEDGE_DIR, index_path: str | None = INDEX_PATH):
+        self.directory  = directory
+        self.index_path = index_path
+        self.files      = {}      # filename -> {"mtime", "passages", "counts"}
+        self.passages   = []
+        self._weights   = None    # BM25 term weights, passages × features (CSR)
+        self._vec       = None
+        self._lock      = threading.Lock()
+        self.last_ms    = 0.0
+        self.reindexed  = 0
+        self._load()
+
+    # ── Persistence ───────────────────────────────────────────────────────────
+    def _load(self):
+        if not self.index_path or not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "rb") as f:
+                saved = pickle.load(f)
+            if saved.get("version") == INDEX_VERSION and saved.get("n_features") == N_FEATURES:
+                self.files = saved["files"]
+        except Exception:
+            self.files = {}
+
+    def _save(self):
+        if not self.index_path:
+            return
+        tmp = f"{self.index_path}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                pickle.dump({"version": INDEX_VERSION, "n_features": N_FEATURES, "files": self.files},
+                            f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.index_path)
+        except OSError:
+            pass   # read-only checkout: keep the in-memory index
+
+    # ── Indexing ──────────────────────────────────────────────────────────────
+    def refresh(self) -> int:
+        """Re-index new or modified files, drop deleted ones. Returns files re-indexed."""
+        with self._lock:
+            on_disk = {os.path.basename(p): os.path.getmtime(p)
+                       for p in glob.glob(os.path.join(self.directory, "*.md"))}
+            changed = [name for name, mtime in on_disk.items()
+                       if self.files.get(name, {}).get("mtime") != mtime]
+            removed = [name for name in self.files if name not in on_disk]
+            if not changed and not removed and self._weights is not None:
+                return 0
+
+            if self._vec is None:
+                self._vec = _vectorizer()
+            for name in removed:
+                del self.files[name]
+            for name in changed:
+                with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                    passages = split_passages(f.read(), name)
+                counts = self._vec.transform([f"{p['title']} {p['text']}" for p in passages]) if passages else None
+                self.files[name] = {"mtime": on_disk[name], "passages": passages, "counts": counts}
+
+            self._rebuild()
+            if changed or removed:
+                self._save()
+            self.reindexed += len(changed)
+            return len(changed)
+
+    def _rebuild(self):
+        """Recompute BM25 weights from the per-file counts (cheap: no re-tokenising)."""
+        import numpy as np
+        import scipy.sparse as sp
+
+        names = sorted(n for n, f in self.files.items() if f["counts"] is not None)
+        self.passages = [p for n in names for p in self.files[n]["passages"]]
+        if not names:
+            self._weights = sp.csr_matrix((0, N_FEATURES))
+            return
+        counts = sp.vstack([self.files[n]["counts"] for n in names]).tocsr().astype(np.float64)
+
+        n_docs = counts.shape[0]
+        df     = np.bincount(counts.indices, minlength=N_FEATURES)
+        idf    = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+        dl     = np.asarray(counts.sum(axis=1)).ravel()
+        norm   = BM25_K1 * (1 - BM25_B + BM25_B * dl / max(dl.mean(), 1.0))
+
+        rows = np.repeat(np.arange(n_docs), np.diff(counts.indptr))
+        tf   = counts.data
+        counts.data = idf[counts.indices] * tf * (BM25_K1 + 1) / (tf + norm[rows])
+        self._weights = counts
+
+    # ── Retrieval ─────────────────────────────────────────────────────────────
+    def search(self, query: str, k: int = TOP_K, min_score: float = MIN_SCORE) -> list[dict]:
+        """Top-k passages for `query` as dicts with an added "score"."""
+        t0 = time.perf_counter()
+        self.refresh()
+        # Score against one consistent index: another session's refresh() may swap it mid-search
+        with self._lock:
+            weights, passages, vec = self._weights, self.passages, self._vec
+        if not passages or not query.strip():
+            return []
+        q = vec.transform([query])
+        q.data[:] = 1.0                         # BM25 ignores query term frequency
+        scores = (weights @ q.T).toarray().ravel()
+        top = scores.argsort()[::-1][:k]
+        hits = [{**passages[i], "score": round(float(scores[i]), 2)}
+                for i in top if scores[i] >= min_score]
+        self.last_ms = (time.perf_counter() - t0) * 1000
+        return hits
+
+    def stats(self) -> dict:
+        return {"files": len(self.files), "passages": len(self.passages),
+                "last_ms": round(self.last_ms, 2), "reindexed": self.reindexed}
+
+
+# ─── Process-wide instance ─────────────────────────────────────────────────────
+_kb      = None
+_kb_lock = threading.Lock()
+
+
+def get_knowledge_base() -> KnowledgeBase | None:
+    """Shared index, or None when scikit-learn / the knowledge folder is missing."""
+    global _kb
+    with _kb_lock:
+        if _kb is None:
+            try:
+                import sklearn  # noqa: F401
+            except ImportError:
+                return None
+            if not os.path.isdir(KNOWLEDGE_DIR):
+                return None
+            _kb = KnowledgeBase()
+        return _kb
+
+
+def retrieve(question: str, k: int = TOP_K) -> list[dict]:
+    kb = get_knowledge_base()
+    if kb is None:
+        return []
+    try:
+        return kb.search(question, k)
+    except Exception:
+        return []
+
+
+def augment_question(question: str, passages: list[dict]) -> str:
+    """User turn with the retrieved passages in front of the farmer's question."""
+    if not passages:
+        return question
+    notes = "\n".join(f"[{i}] {p['title']}: {p['text']}" for i, p in enumerate(passages, 1))
+    return (f"Reference notes (use only if relevant):\n{notes}\n\n"
+            f"Farmer's question: {question}")
+
+
+_preloaded = False
+
+
+def preload():
+    """Load (or build) the index in the background so the first question doesn't pay for it."""
+    global _preloaded
+    if not _preloaded:
+        _preloaded = True
+        threading.Thread(target=retrieve, args=("",), daemon=True,
+                         name="agrichain-knowledge").start()
@@ -5,6 +5,7 @@ import numpy as np
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from modules.data_fetcher import load_mandi_prices
+from utils.price_store import PriceSlice
 from utils.geo import MANDI_COORDS, DISTRICT_COORDS, haversine_km, TRANSPORT_COST_PER_KM_PER_QTL
 from utils.explainer import explain_mandi
 
@@ -13,6 +14,9 @@ MANDIS = list(MANDI_COORDS.keys())
 
 def _avg_mandi_price(df, mandi_name: str, days: int = 7) -> float:
     """Compute the rolling average Modal_Price for a mandi over the last N days."""
+    if isinstance(df, PriceSlice):
+        rows = df.market_rows(mandi_name)   # already sorted by date
+        return float(rows["modal_price"][-days:].mean()) if len(rows) else 0.0
     mandi_df = df[df["Market"] == mandi_name].copy()
     if mandi_df.empty:
         return 0.0
@@ -21,24 +25,14 @@ def _avg_mandi_price(df, mandi_name: str, days: int = 7) -> float:
     return float(last["Modal_Price"].mean())
 
 
-def rank_mandis(
-    crop: str,
-    quantity_qtl: float,
-    farmer_district: str,
-    top_n: int = 3,
-) -> list:
-    """
-    Rank mandis by net profit per quintal.
-    Returns a list of dicts, sorted by net_profit_per_qtl descending.
-    """
-    df = load_mandi_prices(crop)
-
+def _mandi_candidates(df, farmer_district: str) -> list[tuple]:
+    """(mandi, 7-day avg price, transport cost/qtl, distance km) for every mandi."""
     if farmer_district not in DISTRICT_COORDS:
         farmer_district = "Pune"
 
     f_lat, f_lon = DISTRICT_COORDS[farmer_district]
 
-    results = []
+    candidates = []
     for mandi in MANDIS:
         avg_price = _avg_mandi_price(df, mandi, days=7)
         if avg_price == 0:
@@ -50,19 +44,38 @@ def rank_mandis(
 
         # Transport cost per quintal
         cost_per_qtl = round(dist * TRANSPORT_COST_PER_KM_PER_QTL, 2)
-        net_profit   = round(avg_price - cost_per_qtl, 2)
+        candidates.append((mandi, avg_price, cost_per_qtl, dist))
+    return candidates
+
 
-        reason = explain_mandi(mandi, avg_price, cost_per_qtl, net_profit, dist)
+def _mandi_row(mandi: str, avg_price: float, cost_per_qtl: float, dist: float, quantity_qtl: float) -> dict:
+    net_profit = round(avg_price - cost_per_qtl, 2)
+    reason = explain_mandi(mandi, avg_price, cost_per_qtl, net_profit, dist)
+    return {
+        "mandi":              mandi,
+        "expected_price":     round(avg_price, 0),
+        "transport_cost_qtl": round(cost_per_qtl, 0),
+        "net_profit_per_qtl": round(net_profit, 0),
+        "total_transport":    round(cost_per_qtl * quantity_qtl, 0),
+        "distance_km":        round(dist, 1),
+        "reason":             reason,
+    }
 
-        results.append({
-            "mandi":              mandi,
-            "expected_price":     round(avg_price, 0),
-            "transport_cost_qtl": round(cost_per_qtl, 0),
-            "net_profit_per_qtl": round(net_profit, 0),
-            "total_transport":    round(cost_per_qtl * quantity_qtl, 0),
-            "distance_km":        round(dist, 1),
-            "reason":             reason,
-        })
 
+def rank_mandis(
+    crop: str,
+    quantity_qtl: float,
+    farmer_district: str,
+    top_n: int = 3,
+    prices=None,
+) -> list:
+    """
+    Rank mandis by net profit per quintal.
+    Returns a list of dicts, sorted by net_profit_per_qtl descending.
+    `prices` may be passed in if load_mandi_prices(crop) was already called.
+    """
+    df = prices if prices is not None else load_mandi_prices(crop)
+
+    results = [_mandi_row(*c, quantity_qtl) for c in _mandi_candidates(df, farmer_district)]
     results.sort(key=lambda x: x["net_profit_per_qtl"], reverse=True)
     return results[:top_n]
@@ -0,0 +1,183 @@
+"""
+Complexity-based routing across the Ollama models a farmer has pulled.
+
+Short factual questions go to the smallest pulled model; long, reasoning
+or multilingual questions go to a larger one (preferring a multilingual
+model for Devanagari / mixed-script text). Among equally suitable models the
+one with the best observed latency wins.
+
+route_model(question, available) → model name
+record_latency(model, ttft, total_s, chars) after each answer
+evaluate_router() → accuracy on the held-out ROUTER_HOLDOUT_SET
+"""
+
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import re
+import threading
+
+from modules.ai_assistant import RECOMMENDED_MODELS
+
+AUTO_MODEL_LABEL = "🔀 Auto (route per question)"
+
+# Models at or above this size handle "large" questions
+LARGE_MIN_PARAMS_B = 3.0
+MULTILINGUAL_FAMILIES = ("qwen2.5", "gemma2", "llama3.2")   # best first
+
+_PARAMS_RE   = re.compile(r"([\d.]+)\s*B\b", re.I)
+_DEVANAGARI  = re.compile(r"[ऀ-ॿ]")
+_REASONING   = re.compile(
+    r"\b(why|explain|compare|difference|or should|plan|strategy|pros|cons|"
+    r"what if|how does|how do|reason|kyon|kyun|kyu|kaise|ka fayda|ki tulna)\b|"
+    r"क्यों|क्यूं|कैसे|तुलना|समझाओ|का फायदा|का\s?असर|का परिणाम|कशी|का\?|समजावून|फरक", re.I)
+_HINGLISH    = re.compile(r"\b(kya|kab|kaise|mera|meri|mujhe|hai|chahiye|karu|bechu|majha|maza|kadhi)\b", re.I)
+
+
+def model_params_b(model_name: str) -> float:
+    """Parameter count (billions) from RECOMMENDED_MODELS or the model tag (e.g. ':1b')."""
+    for model_id, desc in RECOMMENDED_MODELS:
+        if model_name.split(":latest")[0] == model_id:
+            m = _PARAMS_RE.search(desc)
+            if m:
+                return float(m.group(1))
+    m = _PARAMS_RE.search(model_name.split(":", 1)[1]) if ":" in model_name else None
+    return float(m.group(1)) if m else 4.0
+
+
+def question_tier(question: str) -> str:
+    """Cheap local classifier: "small" for short factual questions, else "large"."""
+    words = len(question.split())
+    score = 0
+    if words > 18:
+        score += 2
+    elif words > 10:
+        score += 1
+    if _REASONING.search(question):
+        score += 2
+    if _is_multilingual(question):
+        score += 2
+    if question.count("?") > 1:
+        score += 1
+    return "large" if score >= 2 else "small"
+
+
+def _is_multilingual(question: str) -> bool:
+    return bool(_DEVANAGARI.search(question) or _HINGLISH.search(question))
+
+
+# ── Per-model latency statistics (process-wide, EWMA) ─────────────────────────
+_EWMA_ALPHA  = 0.3
+_stats       = {}   # model -> {"ttft", "total", "tok_s", "n"}
+_stats_lock  = threading.Lock()
+
+
+def record_latency(model_name: str, ttft: float, total_s: float, chars: int):
+    tok_s = (chars / 4) / max(total_s - ttft, 1e-3)
+    with _stats_lock:
+        s = _stats.get(model_name)
+        if s is None:
+            _stats[model_name] = {"ttft": ttft, "total": total_s, "tok_s": tok_s, "n": 1}
+            return
+        for k, v in (("ttft", ttft), ("total", total_s), ("tok_s", tok_s)):
+            s[k] = (1 - _EWMA_ALPHA) * s[k] + _EWMA_ALPHA * v
+        s["n"] += 1
+
+
+def latency_stats() -> dict:
+    with _stats_lock:
+        return {m: dict(s) for m, s in _stats.items()}
+
+
+def _latency_rank(model_name: str) -> float:
+    """Lower is better; unmeasured models are ranked by size."""
+    s = _stats.get(model_name)
+    return s["total"] if s else 100.0 + model_params_b(model_name)
+
+
+def route_model(question: str, available: list[str]) -> str | None:
+    """Pick the model to answer `question` among the pulled `available` models."""
+    if not available:
+        return None
+    by_size = sorted(available, key=model_params_b)
+    if question_tier(question) == "small":
+        return by_size[0]
+
+    large = [m for m in available if model_params_b(m) >= LARGE_MIN_PARAMS_B] or by_size[-1:]
+    if _is_multilingual(question):
+        for family in MULTILINGUAL_FAMILIES:
+            fam = [m for m in large if m.startswith(family)]
+            if fam:
+                return min(fam, key=_latency_rank)
+    return min(large, key=_latency_rank)
+
+
+# ── Labelled evaluation sets ──────────────────────────────────────────────────
+# ROUTER_EVAL_SET is the set the tier rules were written against (it scores
+# 100% by construction). ROUTER_HOLDOUT_SET was labelled afterwards, without
+# changing the rules, and is the number to quote (0.885, 3 of 14 large
+# questions under-routed: long decision questions with no reasoning keyword).
+# "large" = needs reasoning, several parts, or a reply in Hindi / Marathi.
+ROUTER_EVAL_SET = [
+    ("When should I harvest?",                                             "small"),
+    ("Which mandi gives the best profit?",                                 "small"),
+    ("What is my spoilage risk?",                                          "small"),
+    ("What storage should I use?",                                         "small"),
+    ("Are prices good right now?",                                         "small"),
+    ("Price at Pune APMC?",                                                "small"),
+    ("Is it going to rain this week?",                                     "small"),
+    ("How can I reduce transport costs?",                                  "small"),
+    ("Why is Mumbai APMC not the best option even though its price is higher?", "large"),
+    ("How does the weather affect my crop?",                               "large"),
+    ("Should I sell now or store in cold storage and sell next month? Compare both.", "large"),
+    ("Explain how the harvest window was calculated",                      "large"),
+    ("Mera fasal kab bechna chahiye aur kyun?",                            "large"),
+    ("मेरी फसल कब काटूं?",                                                  "large"),
+    ("माझा माल कुठे विकावा आणि का?",                                        "large"),
+    ("Plan my harvest, storage and transport for 50 quintals of tomato in Nashik", "large"),
+]
+
+
+ROUTER_HOLDOUT_SET = [
+    ("What is today's onion price in Nashik?",                             "small"),
+    ("How many days until my tomatoes are ready?",                         "small"),
+    ("Which crop did I select?",                                           "small"),
+    ("What is the transport cost to Pune APMC?",                           "small"),
+    ("Is cold storage available in Sangli?",                               "small"),
+    ("How far is Kolhapur mandi from my district?",                        "small"),
+    ("What does MEDIUM risk mean?",                                        "small"),
+    ("Will it be hot tomorrow?",                                           "small"),
+    ("Best mandi for wheat?",                                              "small"),
+    ("What is the price premium for my harvest window?",                  "small"),
+    ("Can I store grapes in a warehouse?",                                 "small"),
+    ("How much humidity is too much for onions?",                          "small"),
+    ("Why did the price of soybean drop this month?",                      "large"),
+    ("If it rains during my harvest window, what should I do with the crop already cut?", "large"),
+    ("Is it better to sell half now and keep half in cold storage until prices rise?", "large"),
+    ("What are the pros and cons of selling at Mumbai APMC?",              "large"),
+    ("My tomatoes have black spots after two days of transport, what went wrong and how do I prevent it next season?", "large"),
+    ("Should I switch from cotton to soybean next year given these prices?", "large"),
+    ("How does humidity change the spoilage risk for grapes compared to onions?", "large"),
+    ("Give me a week-by-week plan to sell 100 quintals of onion.",         "large"),
+    ("Bhav kab badhega?",                                                  "large"),
+    ("Kya mujhe abhi bechna chahiye ya rukna chahiye?",                    "large"),
+    ("कौन सी मंडी सबसे अच्छी है?",                                           "large"),
+    ("प्याज को कितने दिन रख सकते हैं?",                                        "large"),
+    ("माझ्या टोमॅटोला कोणता बाजार चांगला आहे?",                                 "large"),
+    ("पाऊस पडला तर काढणी पुढे ढकलावी का?",                                     "large"),
+]
+
+
+def evaluate_router(eval_set: list | None = None) -> dict:
+    """
+    Accuracy of question_tier on a labelled set (default: the held-out set;
+    pass ROUTER_EVAL_SET for the tuning set). `under_routed` counts
+    large-labelled questions sent to the small tier — the quality risk.
+    """
+    eval_set = eval_set or ROUTER_HOLDOUT_SET
+    correct = under = 0
+    for question, label in eval_set:
+        tier = question_tier(question)
+        correct += tier == label
+        under   += label == "large" and tier == "small"
+    return {"n": len(eval_set), "accuracy": round(correct / len(eval_set), 3), "under_routed": under}
@@ -0,0 +1,273 @@
+"""
+Precomputed recommendation cube: every engine result for every dataset input.
+
+The inputs are low-cardinality (10 crops × 30 districts × 3 storage types),
+and the remaining ones collapse:
+
+  • harvest  — depends on the sowing date only through days-since-sowing,
+               and is constant once soil readiness hits 0 (≈1.43× maturity),
+               so it is stored per day up to that cap
+  • mandi    — the ranking does not depend on quantity; total transport is
+               cost/qtl × quantity, so one ranking per (crop, district)
+  • spoilage — does not use quantity, and transit saturates at 24 h, so one
+               score per integer transit hour 0–24
+
+Only the scores are stored (small integer / float arrays in one .npz, with
+weather per district and chart data per crop kept once in the metadata);
+results are assembled on read by the same engine functions the live path
+uses, so a cube hit is identical to a live computation. A lookup is a few
+array indexings. The cube is valid for the day it was built and the price
+CSV version it was built from, and harvest / spoilage results only while
+the shared weather cache still holds the forecast the cube was built from
+(a refreshed or missing forecast means the page would see other weather).
+A build refuses to write a cube if any district's forecast could not be
+fetched, so fallback weather is never frozen into it. Anything else (stale
+cube, unknown district, fractional transit, sowing date in the future)
+returns None and the caller computes live.
+
+    python scripts/build_cube.py          # nightly and after each data/weather refresh
+    lookup("mandi", ("Tomato", 50.0, "Pune", 3))
+"""
+
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import datetime
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from modules.data_fetcher import (
+    CROPS, FORECAST_DAYS, get_data_version, fetch_weather_forecast, cached_weather_forecast,
+    load_mandi_prices, get_weekly_price_index,
+)
+from modules.harvest_engine import (
+    CROP_MATURITY_DAYS, _soil_readiness_score, _window_components, _best_window, _chart_data, _harvest_result,
+)
+from modules.mandi_ranker import MANDIS, _mandi_candidates, _mandi_row
+from modules.spoilage_assessor import STORAGE_PENALTY, _weather_averages, _spoilage_score, _spoilage_result
+from utils.geo import DISTRICT_COORDS
+
+CUBE_PATH    = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            "data", ".cube", "recommendations.npz")
+TRANSIT_MAX  = 24   # spoilage transit_norm saturates here
+
+# Harvest record: best start offset + score components ×1000 (they are rounded to 3 dp)
+HARVEST_DTYPE = np.dtype([("offset", "u1"), ("ps", "i2"), ("ws", "i2"), ("sr", "i2"), ("total", "i2")])
+_COMPONENTS   = (("ps", "price_seasonality"), ("ws", "weather"), ("sr", "soil_readiness"), ("total", "total"))
+
+
+def _dss_cap(crop: str) -> int:
+    """First days-since-sowing from which soil readiness is 0 for good (results stop changing)."""
+    dss = CROP_MATURITY_DAYS.get(crop, 100)
+    while _soil_readiness_score(crop, dss) > 0:
+        dss += 1
+    return dss
+
+
+def _price_version() -> float:
+    return get_data_version()[0]
+
+
+class CubeBuildError(RuntimeError):
+    """Raised instead of writing a cube from incomplete data."""
+
+
+# ─── Build ─────────────────────────────────────────────────────────────────────
+def build_cube(path: str = CUBE_PATH, workers: int = 4) -> dict:
+    """Materialise every engine result for today's data and write the cube atomically."""
+    t0 = time.perf_counter()
+    today     = datetime.date.today()
+    districts = list(DISTRICT_COORDS)
+    storages  = list(STORAGE_PENALTY)
+    version   = _price_version()
+
+    # Same calls as the pages (harvest: 14 days, spoilage: 3), but without the
+    # synthetic fallback: a cube built from made-up weather must not be written.
+    def _forecasts(district):
+        lat, lon = DISTRICT_COORDS[district]
+        return fetch_weather_forecast(lat, lon, days=14), fetch_weather_forecast(lat, lon, days=3)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {d: pool.submit(_forecasts, d) for d in districts}
+    weather, short, failed = {}, {}, {}
+    for district, fut in futures.items():
+        try:
+            weather[district], short[district] = fut.result()
+        except Exception as exc:
+            failed[district] = exc
+    if failed:
+        first = next(iter(failed.values()))
+        raise CubeBuildError(f"weather unavailable for {len(failed)} of {len(districts)} districts "
+                             f"({type(first).__name__}: {str(first)[:120]}); cube not written")
+
+    caps  = [_dss_cap(c) for c in CROPS]
+    bases = [0]
+    for cap in caps[:-1]:
+        bases.append(bases[-1] + len(districts) * (cap + 1))
+    harvest   = np.zeros(bases[-1] + len(districts) * (caps[-1] + 1), dtype=HARVEST_DTYPE)
+    avg_price = np.zeros((len(CROPS), len(MANDIS)))
+    cost      = np.zeros((len(districts), len(MANDIS)))
+    dist      = np.zeros((len(districts), len(MANDIS)))
+    order     = np.zeros((len(CROPS), len(districts), len(MANDIS)), dtype=np.int8)
+    averages  = np.array([_weather_averages(short[d]) for d in districts])     # (D, 2): humidity, temp
+    spoilage  = np.zeros((len(CROPS), len(districts), len(storages), TRANSIT_MAX + 1))
+    charts    = {}
+
+    for ci, crop in enumerate(CROPS):
+        prices     = load_mandi_prices(crop)
+        weekly_idx = get_weekly_price_index(prices)
+        charts[crop] = _chart_data(weekly_idx, today)
+        for di, district in enumerate(districts):
+            components = _window_components(weekly_idx, weather[district], today)
+            row = bases[ci] + di * (caps[ci] + 1)
+            for dss in range(caps[ci] + 1):
+                best = _best_window(components, crop, dss)
+                harvest[row + dss] = (best["start_offset"],
+                                      *(round(best[name] * 1000) for _, name in _COMPONENTS))
+
+            candidates = _mandi_candidates(prices, district)
+            avg_price[ci] = [c[1] for c in candidates]
+            cost[di]      = [c[2] for c in candidates]
+            dist[di]      = [c[3] for c in candidates]
+            net = [_mandi_row(*c, 1.0)["net_profit_per_qtl"] for c in candidates]
+            order[ci, di] = sorted(range(len(MANDIS)), key=lambda i: net[i], reverse=True)   # stable, like rank_mandis
+
+            humidity, temp = averages[di]
+            for si, storage in enumerate(storages):
+                spoilage[ci, di, si] = [_spoilage_score(crop, storage, h, humidity, temp)
+                                        for h in range(TRANSIT_MAX + 1)]
+
+    meta = {
+        "build_day":     today.isoformat(),
+        "built_at":      time.time(),
+        "price_version": version,
+        "crops":         CROPS,
+        "districts":     districts,
+        "storages":      storages,
+        "mandis":        MANDIS,
+        "caps":          caps,
+        "bases":         bases,
+        "weather":       weather,
+        "charts":        charts,
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "wb") as f:
+        np.savez(f, meta=np.array(json.dumps(meta)), harvest=harvest, avg_price=avg_price, cost=cost,
+                 dist=dist, order=order, averages=averages, spoilage=spoilage)
+    os.replace(tmp, path)
+    return {"path": path, "bytes": os.path.getsize(path), "seconds": round(time.perf_counter() - t0, 2),
+            "harvest_rows": len(harvest), "spoilage_cells": int(spoilage.size),
+            "mandi_rankings": len(CROPS) * len(districts)}
+
+
+# ─── Read ──────────────────────────────────────────────────────────────────────
+class RecommendationCube:
+    def __init__(self, arrays, meta: dict):
+        self.meta      = meta
+        self.harvest   = arrays["harvest"]
+        self.avg_price = arrays["avg_price"]
+        self.cost      = arrays["cost"]
+        self.dist      = arrays["dist"]
+        self.order     = arrays["order"]
+        self.averages  = arrays["averages"]
+        self.spoilage  = arrays["spoilage"]
+        self._crop     = {c: i for i, c in enumerate(meta["crops"])}
+        self._district = {d: i for i, d in enumerate(meta["districts"])}
+        self._storage  = {s: i for i, s in enumerate(meta["storages"])}
+
+    def valid(self) -> bool:
+        return (self.meta["build_day"] == datetime.date.today().isoformat()
+                and self.meta["price_version"] == _price_version())
+
+    def weather_current(self, district: str) -> bool:
+        """True while the weather cache holds the forecast this cube was built from."""
+        return cached_weather_forecast(*DISTRICT_COORDS[district], days=FORECAST_DAYS) == self.meta["weather"][district]
+
+    def harvest_result(self, crop, district, sowing_date):
+        ci, di = self._crop.get(crop), self._district.get(district)
+        dss = (datetime.date.today() - sowing_date).days
+        if ci is None or di is None or dss < 0 or not self.weather_current(district):
+            return None
+        cap = self.meta["caps"][ci]
+        rec = self.harvest[self.meta["bases"][ci] + di * (cap + 1) + min(dss, cap)]
+        best = {name: int(rec[field]) / 1000 for field, name in _COMPONENTS}
+        best["start_offset"] = int(rec["offset"])
+        best["date"] = datetime.date.today() + datetime.timedelta(days=best["start_offset"])
+        return _harvest_result(best, crop, dss, self.meta["weather"][district], self.meta["charts"][crop])
+
+    def mandi_result(self, crop, quantity_qtl, district, top_n=3):
+        ci, di = self._crop.get(crop), self._district.get(district)
+        if ci is None or di is None:
+            return None
+        mandis = self.meta["mandis"]
+        return [_mandi_row(mandis[i], float(self.avg_price[ci, i]), float(self.cost[di, i]),
+                           float(self.dist[di, i]), quantity_qtl)
+                for i in self.order[ci, di][:top_n]]
+
+    def spoilage_result(self, crop, district, quantity_qtl, storage_type, transit_hours):
+        ci, di, si = self._crop.get(crop), self._district.get(district), self._storage.get(storage_type)
+        if (ci is None or di is None or si is None or transit_hours < 0
+                or transit_hours != int(transit_hours) or not self.weather_current(district)):
+            return None
+        humidity, temp = self.averages[di]
+        score = float(self.spoilage[ci, di, si, min(int(transit_hours), TRANSIT_MAX)])
+        return _spoilage_result(crop, storage_type, score, float(humidity), float(temp))
+
+
+_LOOKUPS = {
+    "harvest":  RecommendationCube.harvest_result,
+    "mandi":    RecommendationCube.mandi_result,
+    "spoilage": RecommendationCube.spoilage_result,
+}
+
+_cube      = None   # (file mtime, RecommendationCube)
+_cube_lock = threading.Lock()
+_counts    = {"hits": 0, "misses": 0}
+
+
+def get_cube(path: str = CUBE_PATH) -> RecommendationCube | None:
+    """The current cube if one exists and is valid for today's data, else None."""
+    global _cube
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    with _cube_lock:
+        if _cube is None or _cube[0] != mtime:
+            try:
+                with np.load(path) as f:
+                    arrays = {k: f[k] for k in f.files if k != "meta"}
+                    meta = json.loads(str(f["meta"]))
+                _cube = (mtime, RecommendationCube(arrays, meta))
+            except Exception:
+                return None
+        cube = _cube[1]
+    return cube if cube.valid() else None
+
+
+def lookup(engine: str, args: tuple, path: str = CUBE_PATH):
+    """Precomputed result of `engine` for the positional args the pages use, or None."""
+    fn = _LOOKUPS.get(engine)
+    cube = get_cube(path) if fn else None
+    result = None
+    if cube is not None:
+        try:
+            result = fn(cube, *args)
+        except (TypeError, ValueError, KeyError, IndexError):
+            result = None
+    _counts["hits" if result is not None else "misses"] += 1
+    return result
+
+
+def cube_stats() -> dict:
+    cube = get_cube()
+    return {
+        **_counts,
+        "valid":     cube is not None,
+        "build_day": cube.meta["build_day"] if cube else None,
+    }
@@ -88,24 +88,17 @@ def _risk_color(level: str) -> str:
     return {"HIGH": "🔴", "MEDIUM": "🟡", "LOW": "🟢"}[level]
 
 
-def assess_spoilage(
-    crop: str,
-    district: str,
-    quantity_qtl: float,
-    storage_type: str,
-    transit_hours: float,
-) -> dict:
-    """
-    Assess post-harvest spoilage risk and recommend actions.
-    """
-    params = SPOILAGE_PARAMS.get(crop, {"temp_sensitivity": 0.5, "humidity_sensitivity": 0.6, "shelf_days": 30})
-    lat, lon = DISTRICT_COORDS.get(district, (18.5204, 73.8567))
-
-    weather = get_weather_forecast(lat, lon, days=3)
-
-    # Use 3-day average forecast
+def _weather_averages(weather: dict) -> tuple[float, float]:
+    """3-day average (max humidity, max temperature) from a forecast."""
     avg_humidity = float(np.mean(weather.get("relative_humidity_2m_max", [65, 65, 65])[:3]))
     avg_temp     = float(np.mean(weather.get("temperature_2m_max",       [30, 30, 30])[:3]))
+    return avg_humidity, avg_temp
+
+
+def _spoilage_score(crop: str, storage_type: str, transit_hours: float,
+                    avg_humidity: float, avg_temp: float) -> float:
+    """Spoilage risk score 0–1 (unrounded)."""
+    params = SPOILAGE_PARAMS.get(crop, {"temp_sensitivity": 0.5, "humidity_sensitivity": 0.6, "shelf_days": 30})
 
     # Normalise inputs
     humidity_norm = np.clip((avg_humidity - 40) / 60, 0, 1)   # 40–100% range
@@ -119,8 +112,11 @@ def assess_spoilage(
         0.20                           * transit_norm
     )
     penalty  = STORAGE_PENALTY.get(storage_type, 0.10)
-    score    = float(np.clip(raw_score + penalty, 0, 1))
+    return float(np.clip(raw_score + penalty, 0, 1))
+
 
+def _spoilage_result(crop: str, storage_type: str, score: float, avg_humidity: float, avg_temp: float) -> dict:
+    """Assemble the assessment for a computed score."""
     risk     = _risk_level(score)
     color    = _risk_color(risk)
     prob_pct = f"{int(score * 100)}%"
@@ -147,3 +143,26 @@ def assess_spoilage(
             "avg_temp":     round(avg_temp, 1),
         },
     }
+
+
+def assess_spoilage(
+    crop: str,
+    district: str,
+    quantity_qtl: float,
+    storage_type: str,
+    transit_hours: float,
+    weather: dict | None = None,
+) -> dict:
+    """
+    Assess post-harvest spoilage risk and recommend actions.
+    `weather` may be any forecast of at least 3 days already fetched for
+    the district (only the first 3 days are used).
+    """
+    if weather is None:
+        lat, lon = DISTRICT_COORDS.get(district, (18.5204, 73.8567))
+        weather = get_weather_forecast(lat, lon, days=3)
+
+    # Use 3-day average forecast
+    avg_humidity, avg_temp = _weather_averages(weather)
+    score = _spoilage_score(crop, storage_type, transit_hours, avg_humidity, avg_temp)
+    return _spoilage_result(crop, storage_type, score, avg_humidity, avg_temp)
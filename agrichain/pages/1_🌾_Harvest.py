@@ -11,11 +11,13 @@ from modules.harvest_engine import get_harvest_recommendation, CROP_MATURITY_DAY
 from utils.geo import DISTRICT_COORDS
 from utils.translator import t, render_lang_sidebar
 from utils.map_selector import render_district_selector
-from utils.shared_state import init_shared, get_shared, sync_all
+from utils.shared_state import init_shared, get_shared, sync_all, cached_result
 from utils.green_theme import inject_theme
+from utils.session_memory import track_session
 
 st.set_page_config(page_title="Harvest Window — AgriChain", page_icon="🌾", layout="wide")
 inject_theme()
+track_session()
 
 st.markdown("""
 <style>
@@ -144,7 +146,7 @@ sync_all(crop=crop, district=district, sowing=sowing_date)
 # ─── Result ───────────────────────────────────────────────────────────────────
 if run:
     with st.spinner("Analysing weather & price data..."):
-        result = get_harvest_recommendation(crop, district, sowing_date)
+        result = cached_result("harvest", get_harvest_recommendation, crop, district, sowing_date)
 
     sc   = result["score_components"]
     conf = result["confidence"]
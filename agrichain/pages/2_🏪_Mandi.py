@@ -10,10 +10,12 @@ from modules.data_fetcher import CROPS
 from utils.geo import DISTRICT_COORDS
 from utils.translator import t, render_lang_sidebar
 from utils.map_selector import render_district_selector
-from utils.shared_state import init_shared, get_shared, sync_all
-from utils.geo_translate import translate_place
+from utils.shared_state import init_shared, get_shared, sync_all, cached_result
+from utils.geo_translate import translate_places_batch
+from utils.session_memory import track_session
 
 st.set_page_config(page_title="Mandi Ranker — AgriChain", page_icon="🏪", layout="wide")
+track_session()
 
 st.markdown("""
 <style>
@@ -153,7 +155,7 @@ sync_all(crop=crop, district=district, quantity=quantity)
 # ─── Results ──────────────────────────────────────────────────────────────────
 if run:
     with st.spinner("Fetching prices and calculating net profits..."):
-        mandis = rank_mandis(crop, quantity, district, top_n=3)
+        mandis = cached_result("mandi", rank_mandis, crop, quantity, district, 3)
 
     st.markdown(f"### 🏆 Top 3 Mandis — **{quantity:.0f} Qtl** of **{crop}** from **{district}**")
     st.caption("Ranked by net profit per quintal after transport cost")
@@ -162,9 +164,10 @@ if run:
     badge_classes = ["rank-badge rank-1-badge", "rank-badge rank-2-badge", "rank-badge rank-3-badge"]
     rank_labels   = ["1", "2", "3"]
     rank_emojis   = ["🥇", "🥈", "🥉"]
+    mandi_labels  = translate_places_batch([m["mandi"] for m in mandis], lang_code)
 
     for i, m in enumerate(mandis):
-        mandi_display = translate_place(m['mandi'], lang_code)
+        mandi_display = mandi_labels[m['mandi']]
         st.markdown(f"""
         <div class="{card_classes[i]}">
           <div class="mandi-card-header">
@@ -198,7 +201,7 @@ if run:
     # ─── Chart ────────────────────────────────────────────────────────────────
     st.markdown(f"#### 📊 {t('Mandi Net Profit Comparison', lang_code)}")
     chart_df = pd.DataFrame([{
-        "Mandi":                  translate_place(m["mandi"], lang_code),
+        "Mandi":                  mandi_labels[m["mandi"]],
         "Expected Price (₹/qtl)": m["expected_price"],
         "Transport Cost (₹/qtl)": m["transport_cost_qtl"],
         "Net Profit (₹/qtl)":     m["net_profit_per_qtl"],
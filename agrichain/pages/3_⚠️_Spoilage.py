@@ -10,11 +10,13 @@ from modules.data_fetcher import CROPS
 from utils.geo import DISTRICT_COORDS
 from utils.translator import t, render_lang_sidebar
 from utils.map_selector import render_district_selector
-from utils.shared_state import init_shared, get_shared, sync_all
+from utils.shared_state import init_shared, get_shared, sync_all, cached_result
 from utils.green_theme import inject_theme
+from utils.session_memory import track_session
 
 st.set_page_config(page_title="Spoilage Assessor — AgriChain", page_icon="⚠️", layout="wide")
 inject_theme()
+track_session()
 
 st.markdown("""
 <style>
@@ -156,7 +158,7 @@ sync_all(crop=crop, district=district, quantity=quantity, storage=storage_type,
 # ─── Results ───────────────────────────────────────────────────────────────────
 if run:
     with st.spinner("Calculating spoilage risk from weather + crop data..."):
-        result = assess_spoilage(crop, district, quantity, storage_type, transit_hours)
+        result = cached_result("spoilage", assess_spoilage, crop, district, quantity, storage_type, transit_hours)
 
     risk  = result["risk_level"]
     color = result["risk_color"]
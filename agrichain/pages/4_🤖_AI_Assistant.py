@@ -3,21 +3,40 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import streamlit as st
 import datetime
+import time
+import uuid
 
 from modules.ai_assistant import (
-    is_ollama_running, list_available_models,
+    get_ollama_status, refresh_ollama_status,
     build_chain, build_farm_context, build_system_prompt,
-    stream_response, RECOMMENDED_MODELS,
+    stream_response, warm_model, RECOMMENDED_MODELS,
+    QUICK_QUESTIONS, is_cacheable_question, is_storable_answer, answer_cache_key,
+    get_cached_answer, store_answer, replay_answer, answer_cache_stats,
+    guarded_stream, cancel_generation, GenerationCancelled,
 )
+from modules.chat_memory import ChatMemory, llm_summariser
+from modules.fast_answers import fast_answer
+from modules.farm_agent import stream_agent_response
+from modules.knowledge_base import retrieve, augment_question, preload as preload_knowledge
+from modules.model_router import AUTO_MODEL_LABEL, route_model, record_latency, model_params_b
 from modules.harvest_engine import CROP_MATURITY_DAYS
 from modules.spoilage_assessor import STORAGE_PENALTY
-from modules.data_fetcher import CROPS
+from modules.data_fetcher import CROPS, weather_fetch_stats
+from modules.recommendation_cube import cube_stats
 from utils.geo import DISTRICT_COORDS
 from utils.translator import t, render_lang_sidebar
+from utils.shared_state import init_shared, get_shared, sync_all, cached_result
 from utils.green_theme import inject_theme
+from utils.session_memory import SPILLED_CONTEXT_KEY, track_session, session_metrics
+from utils.stream_render import ThrottledRenderer
+from utils.cache_backend import cache_stats
+from utils.circuit_breaker import get_breaker, breaker_states, CircuitOpenError
+from utils import chat_store
 
 st.set_page_config(page_title="AI Assistant — AgriChain", page_icon="🤖", layout="wide")
 inject_theme()
+track_session()
+preload_knowledge()
 
 st.markdown("""
 <style>
@@ -55,6 +74,7 @@ html, body, [class*="css"] { font-family: 'Inter', sans-serif; }
     line-height: 1.7;
     font-family: monospace;
     max-height: 220px;
+    white-space: pre-wrap;
     overflow-y: auto;
     margin-top: 12px;
 }
@@ -106,29 +126,54 @@ with st.sidebar:
     st.markdown("### 🌾 Farm Parameters")
     st.caption("Set your details — the AI uses these for recommendations")
 
-    p_crop     = st.selectbox("Crop",     CROPS, index=0, key="ai_crop")
-    p_district = st.selectbox("District", list(DISTRICT_COORDS.keys()), index=0, key="ai_district")
-    p_qty      = st.number_input("Quantity (Qtl)", 1.0, 5000.0, 50.0, 5.0, key="ai_qty")
-    p_storage  = st.selectbox("Storage Type", list(STORAGE_PENALTY.keys()), index=0, key="ai_storage")
-    p_transit  = st.slider("Transit (Hours)", 1, 48, 6, key="ai_transit")
+    # Defaults come from shared state so engine results computed on the other
+    # pages can be reused when the context is generated.
+    init_shared()
+    district_opts = list(DISTRICT_COORDS.keys())
+    storage_opts  = list(STORAGE_PENALTY.keys())
+    _def_crop, _def_dist, _def_stor = get_shared("crop"), get_shared("district"), get_shared("storage")
+
+    p_crop     = st.selectbox("Crop",     CROPS, index=CROPS.index(_def_crop) if _def_crop in CROPS else 0, key="ai_crop")
+    p_district = st.selectbox("District", district_opts,
+                              index=district_opts.index(_def_dist) if _def_dist in district_opts else 0, key="ai_district")
+    p_qty      = st.number_input("Quantity (Qtl)", 1.0, 5000.0, float(get_shared("quantity") or 50.0), 5.0, key="ai_qty")
+    p_storage  = st.selectbox("Storage Type", storage_opts,
+                              index=storage_opts.index(_def_stor) if _def_stor in storage_opts else 0, key="ai_storage")
+    p_transit  = st.slider("Transit (Hours)", 1, 48, int(get_shared("transit") or 6), key="ai_transit")
     maturity    = CROP_MATURITY_DAYS.get(p_crop, 100)
-    default_sow = datetime.date.today() - datetime.timedelta(days=int(maturity * 0.85))
+    default_sow = get_shared("sowing") or (datetime.date.today() - datetime.timedelta(days=int(maturity * 0.85)))
     p_sowing   = st.date_input("Sowing Date", value=default_sow,
                                 max_value=datetime.date.today(), format="DD/MM/YYYY", key="ai_sowing")
+    sync_all(crop=p_crop, district=p_district, quantity=p_qty,
+             storage=p_storage, transit=p_transit, sowing=p_sowing)
 
     generate_btn = st.button("⚡ Generate Farm Context", type="primary", use_container_width=True)
+    agent_mode   = st.toggle("🛠️ Agent mode", key="ai_agent_mode",
+                             help="Skip Generate — AgriBot runs only the engines a question needs")
+    farm_profile = {"crop": p_crop, "district": p_district, "quantity": p_qty,
+                    "storage": p_storage, "transit": p_transit, "sowing": p_sowing}
 
     st.markdown("---")
 
     # ── Model selector ────────────────────────────────────────────────────────
     st.markdown("### 🧠 Ollama Model")
-    ollama_ok = is_ollama_running()
+    if st.button("🔄 Re-check Ollama", use_container_width=True):
+        get_breaker("ollama").reset()   # probe now even if the breaker is open
+        refresh_ollama_status(wait=3.5)
+    ollama_ok, available = get_ollama_status()
+    auto_route = False
 
     if ollama_ok:
         st.markdown('<div class="status-ok">✅ Ollama is running</div>', unsafe_allow_html=True)
-        available = list_available_models()
         if available:
-            selected_model = st.selectbox("Select Model", available, index=0, key="ai_model")
+            model_opts = ([AUTO_MODEL_LABEL] if len(available) > 1 else []) + available
+            model_choice = st.selectbox("Select Model", model_opts, index=0, key="ai_model")
+            auto_route = model_choice == AUTO_MODEL_LABEL
+            if auto_route:
+                st.caption("Short questions → smallest model · reasoning / multilingual → larger model")
+            # In auto mode the smallest model is the default (summaries, warmup)
+            selected_model = min(available, key=model_params_b) if auto_route else model_choice
+            warm_model(selected_model)   # load it now rather than on the first question
         else:
             st.markdown('<div class="status-err">⚠️ No models pulled yet</div>', unsafe_allow_html=True)
             selected_model = None
@@ -142,6 +187,55 @@ with st.sidebar:
         st.markdown("**Then pull a model:**")
         st.code("ollama pull llama3.2", language="bash")
 
+    _ac = answer_cache_stats()
+    if _ac["hits"] + _ac["misses"]:
+        st.caption(f"💾 Answer cache: {_ac['hits']} hits / {_ac['hits'] + _ac['misses']} lookups "
+                   f"({_ac['hit_rate']:.0%}) · {_ac['size']} stored")
+
+    # ── Server memory (per-session footprint) ─────────────────────────────────
+    with st.expander("🧠 Server Memory"):
+        _sm = session_metrics()
+        _rss = f" · RSS {_sm['rss_bytes'] / 2**20:.0f} MB" if _sm["rss_bytes"] else ""
+        st.caption(f"{_sm['sessions']} sessions · {_sm['total_bytes'] / 2**20:.1f} MB in session state"
+                   f"{_rss} · cap {_sm['cap_bytes'] / 2**20:.0f} MB/session · "
+                   f"{_sm['idle_freed_bytes'] / 2**20:.1f} MB freed from {_sm['idle_stripped']} idle sessions")
+        for _s in _sm["largest"]:
+            _keys = ", ".join(f"{k} {b / 1024:.0f} KB" for k, b in _s["top_keys"])
+            st.caption(f"`{_s['session']}` {_s['bytes'] / 1024:.0f} KB · idle {_s['idle_s']}s · "
+                       f"{_s['evictions']} evictions — {_keys}")
+
+    with st.expander("🔌 External Services"):
+        _icons = {"closed": "🟢", "half-open": "🟡", "open": "🔴"}
+        _bs = breaker_states()
+        if not _bs:
+            st.caption("No external calls made yet in this worker.")
+        for _b in _bs:
+            _retry = f" · retry in {_b['retry_in']:.0f}s" if _b["state"] == "open" else ""
+            st.caption(f"{_icons[_b['state']]} **{_b['name']}** {_b['state']}{_retry} · "
+                       f"{_b['calls']} calls · {_b['failures']} failed · {_b['short_circuits']} skipped")
+            if _b["state"] != "closed" and _b["last_error"]:
+                st.caption(f"  ↳ {_b['last_error']}")
+
+    with st.expander("🗄️ External Data Cache"):
+        _cs = cache_stats()
+        if not _cs:
+            st.caption("No cached lookups yet in this worker.")
+        for _c in _cs:
+            _h = _c["hits"]
+            st.caption(f"**{_c['namespace']}** · {_c['hit_rate']:.0%} hit rate — L1 {_h['l1']} · "
+                       f"SQLite {_h['l2']} · Redis {_h['l3']} · miss {_c['misses']} "
+                       f"({_c['l1_size']} in memory, TTL {_c['ttl'] / 3600:g} h)")
+        if _cs:
+            st.caption(f"Tiers: {_cs[0]['backends']}")
+        _wf = weather_fetch_stats()
+        _lim = _wf["limiter"]
+        st.caption(f"Open-Meteo: {_wf['fetches']} real fetches · {_wf['coalesced']} coalesced · "
+                   f"{_lim['queued']} queued (avg {_lim['avg_wait_s']:.1f}s) · {_lim['rejected']} rate-limited "
+                   f"· limit {_lim['rate']:g}/s burst {_lim['burst']}")
+        _cube = cube_stats()
+        st.caption(f"Recommendation cube: {'built ' + _cube['build_day'] if _cube['valid'] else 'stale or missing'}"
+                   f" · {_cube['hits']} hits · {_cube['misses']} live")
+
     # ── Recommended models info ────────────────────────────────────────────────
     with st.expander("💡 Recommended Models"):
         for model_id, desc in RECOMMENDED_MODELS:
@@ -164,18 +258,46 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ─── Session state init ───────────────────────────────────────────────────────
+# Chat history is persisted per user; the id lives in the URL so reloads keep it
+RESTORE_LAST  = 20   # messages reloaded into a new session
+RENDER_LAST   = 12   # messages rendered on every rerun
+OLDER_PAGE    = 20   # older messages fetched per "load older" click
+
+if "user_id"          not in st.session_state:
+    uid = st.query_params.get("uid")
+    st.session_state.user_id = uid if chat_store.valid_user_id(uid) else chat_store.new_user_id()
+if st.query_params.get("uid") != st.session_state.user_id:
+    st.query_params["uid"] = st.session_state.user_id
 if "ai_messages"      not in st.session_state:
-    st.session_state.ai_messages      = []
+    st.session_state.ai_messages      = chat_store.recent_messages(st.session_state.user_id, RESTORE_LAST)
+if "history_pages"    not in st.session_state:
+    st.session_state.history_pages    = 0
 if "farm_context"     not in st.session_state:
-    st.session_state.farm_context     = ""
+    st.session_state.farm_context     = None   # FarmContext
 if "system_prompt"    not in st.session_state:
     st.session_state.system_prompt    = ""
-if "chain"            not in st.session_state:
-    st.session_state.chain            = None
 if "context_ready"    not in st.session_state:
     st.session_state.context_ready    = False
 if "ai_pending"       not in st.session_state:
     st.session_state.ai_pending       = False
+if "chat_memory"      not in st.session_state:
+    st.session_state.chat_memory      = ChatMemory()
+if "session_id"       not in st.session_state:
+    st.session_state.session_id       = uuid.uuid4().hex   # inference-gateway identity
+
+# Freed while the session was idle (utils.session_memory): rebuild from its inputs
+if st.session_state.farm_context is None and st.session_state.get(SPILLED_CONTEXT_KEY):
+    with st.spinner("Restoring your farm context..."):
+        ctx = build_farm_context(*st.session_state.pop(SPILLED_CONTEXT_KEY))
+        st.session_state.farm_context  = ctx
+        st.session_state.system_prompt = build_system_prompt(ctx, lang_code)
+        st.session_state.context_ready = True
+
+
+def add_message(role: str, content: str):
+    """Append to the live conversation and persist it."""
+    msg_id = chat_store.append_message(st.session_state.user_id, role, content)
+    st.session_state.ai_messages.append({"id": msg_id, "role": role, "content": content})
 
 # ─── Generate context ─────────────────────────────────────────────────────────
 if generate_btn:
@@ -185,12 +307,9 @@ if generate_btn:
         st.session_state.farm_context  = ctx
         st.session_state.system_prompt = sys_prompt
         st.session_state.context_ready = True
-        st.session_state.ai_messages   = []   # reset chat on new context
-
-        if selected_model and ollama_ok:
-            st.session_state.chain = build_chain(selected_model)
-        else:
-            st.session_state.chain = None
+        st.session_state.ai_messages   = []   # new conversation; earlier turns stay in the store
+        st.session_state.history_pages = 0
+        st.session_state.chat_memory.reset()
 
     st.success(f"✅ Farm context generated for **{p_crop}** in **{p_district}**! Start chatting below.")
 
@@ -199,18 +318,19 @@ if st.session_state.context_ready:
     col_l, col_r = st.columns([2, 1])
     with col_l:
         c1, c2, c3 = st.columns(3)
-        lines = st.session_state.farm_context.split("\n")
-
-        harvest_premium = next((l.split(": ")[1] for l in lines if "Expected Price Premium" in l), "—")
-        top_mandi       = next((l.split(" ", 1)[1].split(":")[0] for l in lines if l.startswith("#1 ")), "—")
-        risk_level      = next((l.split(": ")[1].split(" ")[0] for l in lines if l.startswith("Risk Level")), "—")
-
-        c1.metric("💰 Price Premium",    harvest_premium, border=True)
-        c2.metric("🏪 Best Mandi",       top_mandi,       border=True)
-        c3.metric("⚠️ Spoilage Risk",    risk_level,      border=True)
+        ctx = st.session_state.farm_context
+
+        c1.metric("💰 Price Premium",    ctx.harvest_premium, border=True)
+        c2.metric("🏪 Best Mandi",       ctx.top_mandi,       border=True)
+        c3.metric("⚠️ Spoilage Risk",    ctx.risk_level,      border=True)
+        if ctx.timings:
+            st.caption("⏱️ " + " · ".join(
+                f"{step} {'cached' if secs is None else f'{secs:.2f}s'}"
+                for step, secs in ctx.timings.items()
+            ))
     with col_r:
-        with st.expander("📋 View Raw Farm Context", expanded=False):
-            st.markdown(f'<div class="context-card">{st.session_state.farm_context}</div>',
+        with st.expander(f"📋 View Raw Farm Context (~{ctx.token_count} tokens)", expanded=False):
+            st.markdown(f'<div class="context-card">{ctx.to_prompt()}</div>',
                         unsafe_allow_html=True)
 
     st.markdown("---")
@@ -232,23 +352,12 @@ if not ollama_ok or not selected_model:
     """, unsafe_allow_html=True)
 
 # ─── FAQ Quick Buttons ────────────────────────────────────────────────────────
-if st.session_state.context_ready:
+if st.session_state.context_ready or agent_mode:
     st.markdown("#### 💬 Quick Questions")
-    faqs = [
-        "🌾 When should I harvest?",
-        "🏪 Which mandi gives the best profit?",
-        "⚠️ What is my spoilage risk?",
-        "🚛 How can I reduce transport costs?",
-        "🌡️ How does the weather affect my crop?",
-        "💰 How much will I earn from this harvest?",
-        "🧊 What storage should I use?",
-        "📈 Are prices good right now?",
-    ]
-
     cols = st.columns(4)
-    for i, faq in enumerate(faqs):
+    for i, faq in enumerate(QUICK_QUESTIONS):
         if cols[i % 4].button(faq, key=f"faq_{i}", use_container_width=True):
-            st.session_state.ai_messages.append({"role": "user", "content": faq})
+            add_message("user", faq)
             st.session_state.ai_pending = True   # signal: generate a reply on next run
             st.rerun()
 
@@ -259,7 +368,7 @@ st.markdown("#### 🗨️ Chat with AgriBot")
 
 # Render history
 if not st.session_state.ai_messages:
-    if st.session_state.context_ready:
+    if st.session_state.context_ready or agent_mode:
         st.markdown("""
         <div style="text-align:center;padding:40px 20px;color:#5a6676;">
           <div style="font-size:3rem;margin-bottom:12px;">🤖</div>
@@ -274,14 +383,31 @@ if not st.session_state.ai_messages:
           <div style="font-size:0.85rem;margin-top:6px;">Then click <strong>Generate Farm Context</strong> to start chatting.</div>
         </div>""", unsafe_allow_html=True)
 
-for msg in st.session_state.ai_messages:
+# Only the newest RENDER_LAST messages are drawn each rerun; older ones are paged in on demand
+visible = st.session_state.ai_messages[-RENDER_LAST:]
+before  = visible[0]["id"] if visible else None
+n_older = OLDER_PAGE * st.session_state.history_pages
+if visible and before is None:   # store unavailable: page through this session's messages
+    hidden     = st.session_state.ai_messages[:-RENDER_LAST]
+    older      = hidden[-n_older:] if n_older else []
+    more_older = len(hidden) > len(older)
+else:
+    older      = chat_store.messages_before(st.session_state.user_id, before, n_older)
+    more_older = chat_store.has_messages_before(st.session_state.user_id,
+                                                older[0]["id"] if older else before)
+
+if more_older and st.button(f"⬆️ Load {OLDER_PAGE} older messages", key="load_older"):
+    st.session_state.history_pages += 1
+    st.rerun()
+
+for msg in older + visible:
     with st.chat_message(msg["role"], avatar="🧑‍🌾" if msg["role"] == "user" else "🤖"):
         st.markdown(msg["content"])
 
 # ─── Chat input & response ────────────────────────────────────────────────────
 user_input = st.chat_input(
     "Ask in English, Hinglish, हिंदी, मराठी, or Minglish (e.g. Mera fasal kab bechna chahiye?) 🌾",
-    disabled=not (st.session_state.context_ready and ollama_ok and selected_model)
+    disabled=not ((st.session_state.context_ready or agent_mode) and ollama_ok and selected_model)
 )
 
 # Determine the question to answer:
@@ -289,7 +415,7 @@ user_input = st.chat_input(
 #  - or from a FAQ button click (ai_pending flag set before rerun)
 pending_q = None
 if user_input:
-    st.session_state.ai_messages.append({"role": "user", "content": user_input})
+    add_message("user", user_input)
     with st.chat_message("user", avatar="🧑‍🌾"):
         st.markdown(user_input)
     pending_q = user_input
@@ -298,39 +424,112 @@ elif st.session_state.ai_pending and st.session_state.ai_messages and st.session
     st.session_state.ai_pending = False   # consume the flag
 
 if pending_q:
-    # Rebuild chain if it was lost (e.g. after a rerun before generate was clicked)
-    if not st.session_state.chain and ollama_ok and selected_model:
-        st.session_state.chain = build_chain(selected_model)
+    # Auto mode picks a model per question; chains are cached per process
+    answer_model = route_model(pending_q, available) if (ollama_ok and auto_route) else selected_model
+    chain = build_chain(answer_model) if (ollama_ok and answer_model) else None
+
+    # Numeric questions the engines already answered skip the LLM entirely
+    instant = None
+    if st.session_state.context_ready and not agent_mode:
+        ctx = st.session_state.farm_context
+        instant = fast_answer(pending_q, ctx.results(), ctx.crop, ctx.quantity_qtl, lang_code)
 
     with st.chat_message("assistant", avatar="🤖"):
-        if not (ollama_ok and selected_model and st.session_state.chain):
+        if instant:
+            renderer = ThrottledRenderer(st.empty())
+            for chunk in replay_answer(instant):
+                renderer.feed(chunk)
+            full_response = renderer.finish()
+            st.caption("⚡ Instant answer from AgriChain engine data")
+            add_message("assistant", full_response)
+        elif not chain:
             st.error("⚙️ Please click **Generate Farm Context** first, and make sure Ollama is running.")
-        elif not st.session_state.context_ready:
+        elif not (st.session_state.context_ready or agent_mode):
             st.error("⚙️ Please click **Generate Farm Context** in the sidebar first.")
         else:
-            placeholder = st.empty()
-            full_response = ""
+            # Repaints are coalesced to a few frames per second, not one per token
+            renderer = ThrottledRenderer(st.empty())
+            t_start, ttft = time.perf_counter(), None
+            st.session_state.chat_memory.summariser = llm_summariser(selected_model)
+
+            # Identical context + model + language + question → replay the stored answer
+            cache_key = None
+            if not agent_mode and is_cacheable_question(pending_q, st.session_state.ai_messages):
+                cache_key = answer_cache_key(st.session_state.farm_context.to_prompt(), answer_model,
+                                             lang_code, pending_q)
+            cached = get_cached_answer(cache_key) if cache_key else None
+            tool_note = st.empty()
+            chunks    = None
+            # Top-k knowledge-base passages ride in the user turn, not the system prompt
+            passages  = [] if cached else retrieve(pending_q)
+            llm_input = augment_question(pending_q, passages)
             try:
-                for chunk in stream_response(
-                    st.session_state.chain,
-                    st.session_state.system_prompt,
-                    st.session_state.ai_messages,
-                    pending_q,
-                ):
-                    full_response += chunk
-                    placeholder.markdown(full_response + "▌")
-                placeholder.markdown(full_response)
-                st.session_state.ai_messages.append({"role": "assistant", "content": full_response})
+                if cached:
+                    chunks = replay_answer(cached)
+                elif agent_mode:
+                    # Engines run lazily as tools; results are memoised in the session cache
+                    start = lambda: stream_agent_response(
+                        answer_model, farm_profile, lang_code,
+                        st.session_state.ai_messages, llm_input,
+                        memo=cached_result,
+                        on_tool=lambda name: tool_note.caption(f"🔧 Running {name.replace('_', ' ')}…"),
+                        memory=st.session_state.chat_memory,
+                    )
+                else:
+                    start = lambda: stream_response(
+                        chain,
+                        st.session_state.system_prompt,
+                        st.session_state.ai_messages,
+                        llm_input,
+                        memory=st.session_state.chat_memory,
+                    )
+                if not cached:
+                    # Shared Ollama: wait for a slot, showing the farmer their place in line
+                    chunks = guarded_stream(
+                        answer_model, st.session_state.session_id, start,
+                        on_wait=lambda pos: tool_note.caption(
+                            f"⏳ {answer_model} is busy — you are #{pos} in the queue…"),
+                    )
+                for chunk in chunks:
+                    if ttft is None:
+                        ttft = time.perf_counter() - t_start
+                        tool_note.empty()
+                    renderer.feed(chunk)
+                full_response = renderer.finish()
+                if ttft is not None:
+                    source = "cached answer" if cached else answer_model
+                    if not cached:
+                        record_latency(answer_model, ttft, time.perf_counter() - t_start, len(full_response))
+                    st.caption(f"⚡ First token {ttft:.2f}s · total {time.perf_counter() - t_start:.2f}s · {source}"
+                               f" · 🖥️ {renderer.summary()}")
+                if passages:
+                    st.caption("📚 " + " · ".join(p["title"] for p in passages))
+                if cache_key and not cached and is_storable_answer(st.session_state.ai_messages):
+                    store_answer(cache_key, full_response)
+                add_message("assistant", full_response)
+            except GenerationCancelled:
+                renderer.finish()
+                st.caption("⏹️ Generation cancelled")
+            except CircuitOpenError as e:
+                st.error(f"❌ Ollama is not responding — skipping the request for now (retry in {e.retry_in:.0f}s).")
             except Exception as e:
                 err = str(e)
                 if "connection refused" in err.lower() or "connect" in err.lower():
                     st.error("❌ Cannot connect to Ollama. Make sure `ollama serve` is running.")
                 else:
                     st.error(f"❌ Error: {err}")
+            finally:
+                # A rerun / page switch stops the script mid-stream: free the Ollama slot now
+                if chunks is not None and hasattr(chunks, "close"):
+                    chunks.close()
 
 # ─── Clear chat ───────────────────────────────────────────────────────────────
 if st.session_state.ai_messages:
     if st.button("🗑️ Clear Chat History", use_container_width=False):
+        cancel_generation(st.session_state.session_id)
+        chat_store.clear_messages(st.session_state.user_id)
         st.session_state.ai_messages = []
+        st.session_state.history_pages = 0
         st.session_state.ai_pending = False
+        st.session_state.chat_memory.reset()
         st.rerun()
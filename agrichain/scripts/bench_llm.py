@@ -0,0 +1,137 @@
+"""
+LLM latency benchmark for the AI Assistant.
+
+Drives build_chain / stream_response (the same path the chat page uses) for
+every RECOMMENDED_MODELS entry at several prompt sizes and reports median
+time-to-first-token, decode tokens/s and end-to-end latency. Uses a real
+Ollama when one answers at --base-url, otherwise an in-process
+scripts/mock_ollama.py server, so it also runs on CI machines with no models.
+
+    python scripts/bench_llm.py                      # auto: real Ollama or mock
+    python scripts/bench_llm.py --mock --runs 5 --json bench.json
+"""
+
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import glob
+import json
+import statistics
+import time
+
+import requests
+
+from modules import ai_assistant as ai
+
+# Approximate system-prompt context size per case (characters of farm data)
+PROMPT_SIZES = {
+    "small":  300,     # profile only (agent mode)
+    "medium": 1500,    # full farm context
+    "large":  6000,    # farm context + knowledge passages + long history
+}
+
+
+def _filler_text() -> str:
+    """Realistic prompt material: the knowledge-base documents."""
+    text = " ".join(open(p, encoding="utf-8").read()
+                    for p in sorted(glob.glob(os.path.join(os.path.dirname(os.path.dirname(
+                        os.path.abspath(__file__))), "data", "knowledge", "*.md"))))
+    return text or "Tomato, Pune, 50 quintals, warehouse storage, 6 hours transit. "
+
+
+def _ollama_models(base_url: str) -> list[str] | None:
+    try:
+        r = requests.get(f"{base_url}/api/tags", timeout=2)
+        return [m["name"] for m in r.json().get("models", [])] if r.ok else None
+    except Exception:
+        return None
+
+
+def _resolve(model_id: str, pulled: list[str]) -> str | None:
+    for name in pulled:
+        if name == model_id or name == f"{model_id}:latest":
+            return name
+    return None
+
+
+def bench_one(model: str, context: str, num_predict: int) -> dict:
+    """One streamed answer: TTFT, decode tokens/s (one chunk ≈ one token) and total seconds."""
+    chain = ai.build_chain(model, temperature=0.0, num_predict=num_predict)
+    system_prompt = ai.build_system_prompt(context, "en")
+    history = [{"role": "user", "content": "When should I harvest and where should I sell?"}]
+    t0, ttft, chunks = time.perf_counter(), None, 0
+    for _ in ai.stream_response(chain, system_prompt, history, history[-1]["content"]):
+        if ttft is None:
+            ttft = time.perf_counter() - t0
+        chunks += 1
+    total = time.perf_counter() - t0
+    decode_s = total - (ttft or total)
+    return {"ttft": ttft or total, "tok_s": (chunks - 1) / decode_s if chunks > 1 and decode_s > 0 else 0.0,
+            "total": total, "tokens": chunks}
+
+
+def run(models: list[str], sizes: list[str], runs: int, num_predict: int) -> list[dict]:
+    filler, rows = _filler_text(), []
+    for model in models:
+        ai.warm_model(model)
+        bench_one(model, filler[:PROMPT_SIZES[sizes[0]]], 8)   # load the model outside the timings
+        for size in sizes:
+            context = (filler * (PROMPT_SIZES[size] // max(len(filler), 1) + 1))[:PROMPT_SIZES[size]]
+            samples = [bench_one(model, context, num_predict) for _ in range(runs)]
+            rows.append({
+                "model":        model,
+                "prompt":       size,
+                "prompt_chars": len(ai.build_system_prompt(context, "en")),
+                "ttft_s":       round(statistics.median(s["ttft"] for s in samples), 3),
+                "tok_s":        round(statistics.median(s["tok_s"] for s in samples), 1),
+                "total_s":      round(statistics.median(s["total"] for s in samples), 3),
+                "tokens":       int(statistics.median(s["tokens"] for s in samples)),
+                "runs":         runs,
+            })
+            r = rows[-1]
+            print(f"{model:<18} {size:<7} {r['prompt_chars']:>7} {r['ttft_s']:>8.2f}s "
+                  f"{r['tok_s']:>7.1f} {r['total_s']:>8.2f}s {r['tokens']:>7}", flush=True)
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--base-url", default=ai.OLLAMA_BASE)
+    ap.add_argument("--mock", action="store_true", help="always use the in-process mock server")
+    ap.add_argument("--models", nargs="*", help="model ids (default: RECOMMENDED_MODELS)")
+    ap.add_argument("--sizes", nargs="*", default=list(PROMPT_SIZES), choices=list(PROMPT_SIZES))
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--num-predict", type=int, default=64)
+    ap.add_argument("--tokens-per-sec", type=float, default=40.0, help="mock decode rate for a 3B model")
+    ap.add_argument("--latency", type=float, default=0.05, help="mock fixed latency")
+    ap.add_argument("--json", help="write the results to this file")
+    args = ap.parse_args()
+
+    pulled = None if args.mock else _ollama_models(args.base_url)
+    if pulled is None:
+        from scripts.mock_ollama import MockOllama, serve
+        server, base_url = serve(MockOllama(tokens_per_sec=args.tokens_per_sec, latency=args.latency,
+                                            reply_tokens=args.num_predict), port=0)
+        pulled, backend = server.mock.models, "mock"
+    else:
+        base_url, backend = args.base_url, "ollama"
+    ai.OLLAMA_BASE = base_url
+
+    wanted = args.models or [m for m, _ in ai.RECOMMENDED_MODELS]
+    models = [name for name in (_resolve(m, pulled) for m in wanted) if name]
+    skipped = [m for m in wanted if not _resolve(m, pulled)]
+    print(f"Backend: {backend} at {base_url} · {args.runs} runs per cell · num_predict={args.num_predict}")
+    if skipped:
+        print(f"Not pulled, skipped: {', '.join(skipped)}")
+    print(f"{'model':<18} {'prompt':<7} {'chars':>7} {'TTFT':>9} {'tok/s':>7} {'total':>9} {'tokens':>7}")
+    rows = run(models, args.sizes, args.runs, args.num_predict)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"backend": backend, "base_url": base_url, "results": rows}, f, indent=2)
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
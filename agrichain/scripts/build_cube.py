@@ -0,0 +1,89 @@
+"""
+Build the precomputed recommendation cube (modules/recommendation_cube.py).
+
+Materialises harvest windows, mandi rankings and spoilage assessments for
+every crop × district × storage type from today's prices and weather, and
+writes them to data/.cube/recommendations.npz. Run it nightly and after each
+price-CSV or weather refresh; until then the pages fall back to live
+computation. Exits non-zero without writing if any forecast can't be fetched.
+
+    python scripts/build_cube.py
+    python scripts/build_cube.py --check     # also compare a sample against the live engines
+"""
+
+import sys, os
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)   # the engines read data/ relative to the app root
+
+import argparse
+import datetime
+import random
+import time
+
+from modules import recommendation_cube as cube_mod
+
+
+def _check(samples: int, path: str) -> tuple[int, int]:
+    """
+    Compare `samples` random cube lookups with the live engines, called
+    exactly as the pages call them. Returns (mismatches, live fallbacks):
+    a cube miss (e.g. the forecast has been refreshed since the build) is a
+    fallback, not a mismatch.
+    """
+    from modules.harvest_engine import get_harvest_recommendation
+    from modules.mandi_ranker import rank_mandis
+    from modules.spoilage_assessor import assess_spoilage
+
+    cube = cube_mod.get_cube(path)
+    if cube is None:
+        print("cube not valid for today's data")
+        return samples, 0
+    meta, rng, today = cube.meta, random.Random(0), datetime.date.today()
+    mismatches = fallbacks = 0
+    for _ in range(samples):
+        crop, district = rng.choice(meta["crops"]), rng.choice(meta["districts"])
+        quantity = float(rng.choice([1, 5, 10, 25, 50, 100, 250]))
+        sowing   = today - datetime.timedelta(days=rng.randint(0, 250))
+        storage, transit = rng.choice(meta["storages"]), rng.randint(0, 48)
+        pairs = [
+            (cube.harvest_result(crop, district, sowing), get_harvest_recommendation(crop, district, sowing)),
+            (cube.mandi_result(crop, quantity, district, 3), rank_mandis(crop, quantity, district, 3)),
+            (cube.spoilage_result(crop, district, quantity, storage, transit),
+             assess_spoilage(crop, district, quantity, storage, transit)),
+        ]
+        fallbacks  += sum(a is None for a, _ in pairs)
+        mismatches += sum(a is not None and a != b for a, b in pairs)
+    return mismatches, fallbacks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--path", default=cube_mod.CUBE_PATH)
+    parser.add_argument("--workers", type=int, default=4, help="parallel weather fetches")
+    parser.add_argument("--check", type=int, nargs="?", const=300, default=0, metavar="N",
+                        help="compare N random inputs against the live engines")
+    args = parser.parse_args()
+
+    try:
+        info = cube_mod.build_cube(args.path, workers=args.workers)
+    except cube_mod.CubeBuildError as exc:
+        sys.exit(f"build failed: {exc}")
+    print(f"cube written to {info['path']} ({info['bytes'] / 1024:.0f} KiB) in {info['seconds']}s")
+    print(f"  harvest rows {info['harvest_rows']}, mandi rankings {info['mandi_rankings']}, "
+          f"spoilage cells {info['spoilage_cells']}")
+
+    if args.check:
+        mismatches, fallbacks = _check(args.check, args.path)
+        print(f"check: {args.check} samples, {mismatches} mismatching results, {fallbacks} live fallbacks")
+        if mismatches:
+            sys.exit(1)
+
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        cube_mod.lookup("mandi", ("Tomato", 50.0, "Pune", 3), path=args.path)
+    print(f"lookup: {(time.perf_counter() - t0) * 1000:.3f} µs per mandi result")
+
+
+if __name__ == "__main__":
+    main()
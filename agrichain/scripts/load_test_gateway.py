@@ -0,0 +1,99 @@
+"""
+Load test: N farmers asking at once, with and without the inference gateway.
+
+Runs against scripts/mock_ollama.py (started in-process) unless --base-url
+points at a real Ollama.
+
+    python scripts/load_test_gateway.py --sessions 6 --model llama3.2:1b
+"""
+
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import statistics
+import threading
+import time
+
+
+def _percentile(values: list, pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def run(ai, model: str, sessions: int, gated: bool, cancel_one: bool = False) -> dict:
+    chain = ai.build_chain(model, num_predict=64)
+    ttfts, totals, cancelled = [], [], []
+    lock = threading.Lock()
+    barrier = threading.Barrier(sessions)
+
+    def farmer(i: int):
+        start = lambda: ai.stream_response(chain, "You are AgriBot.", [{"role": "user", "content": "q"}],
+                                           f"Farmer {i}: when should I harvest?")
+        barrier.wait()
+        t0, ttft = time.perf_counter(), None
+        try:
+            chunks = ai.guarded_stream(model, f"load-{i}", start) if gated else start()
+            for n, _ in enumerate(chunks):
+                if ttft is None:
+                    ttft = time.perf_counter() - t0
+                if cancel_one and i == 0 and n == 5:
+                    ai.cancel_generation(f"load-{i}")
+        except ai.GenerationCancelled:
+            with lock:
+                cancelled.append(i)
+            return
+        with lock:
+            ttfts.append(ttft)
+            totals.append(time.perf_counter() - t0)
+
+    threads = [threading.Thread(target=farmer, args=(i,)) for i in range(sessions)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    return {
+        "mode":        "gateway" if gated else "direct",
+        "ttft_p50":    statistics.median(ttfts),
+        "ttft_p95":    _percentile(ttfts, 95),
+        "ttft_min":    min(ttfts),
+        "total_p50":   statistics.median(totals),
+        "total_max":   max(totals),
+        "cancelled":   len(cancelled),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sessions", type=int, default=6)
+    ap.add_argument("--model", default="llama3.2:1b")
+    ap.add_argument("--base-url", default=None, help="real Ollama URL (default: in-process mock)")
+    ap.add_argument("--tokens-per-sec", type=float, default=40.0, help="mock token rate")
+    args = ap.parse_args()
+
+    from modules import ai_assistant as ai
+
+    server = None
+    if args.base_url:
+        ai.OLLAMA_BASE = args.base_url
+    else:
+        from scripts.mock_ollama import MockOllama, serve
+        server, ai.OLLAMA_BASE = serve(MockOllama(tokens_per_sec=args.tokens_per_sec, latency=0.1), port=0)
+
+    print(f"{args.sessions} concurrent sessions on {args.model} via {ai.OLLAMA_BASE}")
+    print(f"{'mode':<8} {'TTFT p50':>9} {'TTFT p95':>9} {'TTFT min':>9} {'total p50':>10} {'total max':>10}")
+    for gated in (False, True):
+        r = run(ai, args.model, args.sessions, gated)
+        print(f"{r['mode']:<8} {r['ttft_p50']:>8.2f}s {r['ttft_p95']:>8.2f}s {r['ttft_min']:>8.2f}s "
+              f"{r['total_p50']:>9.2f}s {r['total_max']:>9.2f}s")
+
+    r = run(ai, args.model, args.sessions, True, cancel_one=True)
+    print(f"cancel check: {r['cancelled']} generation cancelled mid-stream; gateway {ai.gateway_stats()}")
+    if server:
+        server.mock.wait_idle()   # a cancelled stream is only seen as aborted on the mock's next write
+        print(f"mock: peak concurrent generations {server.mock.peak_active}, "
+              f"aborted streams {server.mock.aborted}")
+
+
+if __name__ == "__main__":
+    main()
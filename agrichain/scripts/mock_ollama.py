@@ -0,0 +1,222 @@
+"""
+Stand-in Ollama server for load tests (no models or GPU needed).
+
+Implements the endpoints AgriChain uses — GET /api/tags, POST /api/chat
+(streamed NDJSON) and POST /api/generate (model load) — for every model in
+RECOMMENDED_MODELS. Timing is configurable and scales like a CPU-bound
+Ollama: decode speed falls with model size, prompt processing (time to
+first token) grows with prompt length, and generations share one simulated
+CPU, so with N streaming at once each one runs N times slower.
+
+    python scripts/mock_ollama.py --port 11435 --tokens-per-sec 20 --latency 0.2
+    OLLAMA_BASE_URL=http://localhost:11435 streamlit run app.py
+"""
+
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from modules.ai_assistant import RECOMMENDED_MODELS
+from modules.model_router import model_params_b
+
+MODELS = [m if ":" in m else f"{m}:latest" for m, _ in RECOMMENDED_MODELS]
+
+REFERENCE_PARAMS_B = 3.0   # --tokens-per-sec is the decode rate of a model this size
+
+REPLY = ("Harvest in the recommended window and sell at the top mandi. Keep produce shaded, "
+         "use crates for transport and move it to cold storage if you must hold it for long. ")
+
+
+class MockOllama:
+    """
+    Shared state of the mock server. Rates are for a REFERENCE_PARAMS_B model
+    and scale inversely with model size; `rates` overrides the decode rate of
+    individual models. `jitter` is the ± fraction applied to every delay.
+    """
+
+    def __init__(self, tokens_per_sec: float = 20.0, latency: float = 0.2,
+                 reply_tokens: int = 60, models: list | None = None,
+                 prefill_tokens_per_sec: float = 200.0, jitter: float = 0.0,
+                 rates: dict | None = None):
+        self.tokens_per_sec = tokens_per_sec
+        self.latency        = latency
+        self.reply_tokens   = reply_tokens
+        self.models         = models or list(MODELS)
+        self.prefill_tokens_per_sec = prefill_tokens_per_sec
+        self.jitter         = jitter
+        self.rates          = rates or {}
+        self.active         = 0
+        self.peak_active    = 0
+        self.requests       = 0
+        self.aborted        = 0
+        self._lock          = threading.Lock()
+        self._idle          = threading.Condition(self._lock)
+
+    def _enter(self):
+        with self._lock:
+            self.active += 1
+            self.requests += 1
+            self.peak_active = max(self.peak_active, self.active)
+
+    def _exit(self):
+        with self._lock:
+            self.active -= 1
+            self._idle.notify_all()
+
+    def wait_idle(self, timeout: float = 10.0) -> bool:
+        """Block until no request is being handled (aborts are counted by then)."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self.active == 0, timeout)
+
+    def _scale(self, model: str) -> float:
+        return max(model_params_b(model), 0.1) / REFERENCE_PARAMS_B
+
+    def _jittered(self, seconds: float) -> float:
+        return seconds * random.uniform(1 - self.jitter, 1 + self.jitter) if self.jitter else seconds
+
+    def decode_rate(self, model: str) -> float:
+        """Tokens/s of `model` when it has the CPU to itself."""
+        return self.rates.get(model) or self.rates.get(model.split(":latest")[0]) \
+            or self.tokens_per_sec / self._scale(model)
+
+    def token_delay(self, model: str) -> float:
+        """Seconds per token for `model`, slowed by every other active generation."""
+        return self._jittered(max(self.active, 1) / self.decode_rate(model))
+
+    def prefill_delay(self, model: str, prompt_chars: int) -> float:
+        """Fixed latency plus prompt processing (~4 chars per token), shared CPU."""
+        prompt_s = (prompt_chars / 4) / (self.prefill_tokens_per_sec / self._scale(model))
+        return self._jittered(self.latency + prompt_s * max(self.active, 1))
+
+    def reply(self, n_tokens: int):
+        words = REPLY.split()
+        for i in range(n_tokens):
+            yield words[i % len(words)] + " "
+
+
+def _handler(mock: MockOllama):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True   # flush every token immediately, like Ollama
+
+        def log_message(self, *args):
+            pass
+
+        def _json(self, payload: dict, status: int = 200):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _chunk(self, payload: dict):
+            data = json.dumps(payload).encode() + b"\n"
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        def do_GET(self):
+            if self.path.startswith("/api/tags"):
+                self._json({"models": [{"name": m, "model": m} for m in mock.models]})
+            elif self.path.startswith("/api/version"):
+                self._json({"version": "0.0.0-mock"})
+            else:
+                self._json({"error": "not found"}, 404)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            req = json.loads(self.rfile.read(length) or b"{}")
+            model = req.get("model", "")
+            if model not in mock.models and f"{model}:latest" not in mock.models:
+                self._json({"error": f"model '{model}' not found"}, 404)
+            elif self.path.startswith("/api/chat"):
+                self._chat(req, model)
+            elif self.path.startswith("/api/generate"):
+                time.sleep(mock.latency)
+                self._json({"model": model, "response": "", "done": True, "done_reason": "load"})
+            else:
+                self._json({"error": "not found"}, 404)
+
+        def _chat(self, req: dict, model: str):
+            prompt_chars = sum(len(m.get("content") or "") for m in req.get("messages", []))
+            n_tokens = int((req.get("options") or {}).get("num_predict") or mock.reply_tokens)
+            n_tokens = min(n_tokens if n_tokens > 0 else mock.reply_tokens, mock.reply_tokens)
+            stream = req.get("stream", True)
+
+            mock._enter()
+            t0 = time.perf_counter()
+            try:
+                time.sleep(mock.prefill_delay(model, prompt_chars))
+                if not stream:
+                    text = ""
+                    for tok in mock.reply(n_tokens):
+                        time.sleep(mock.token_delay(model))
+                        text += tok
+                    self._json({"model": model, "message": {"role": "assistant", "content": text},
+                                "done": True, "done_reason": "stop", "eval_count": n_tokens,
+                                "prompt_eval_count": prompt_chars // 4})
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for tok in mock.reply(n_tokens):
+                    time.sleep(mock.token_delay(model))
+                    self._chunk({"model": model, "message": {"role": "assistant", "content": tok}, "done": False})
+                self._chunk({"model": model, "message": {"role": "assistant", "content": ""},
+                             "done": True, "done_reason": "stop", "eval_count": n_tokens,
+                             "prompt_eval_count": prompt_chars // 4,
+                             "total_duration": int((time.perf_counter() - t0) * 1e9)})
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                with mock._lock:
+                    mock.aborted += 1   # client closed the stream: generation stops, like Ollama
+            finally:
+                mock._exit()
+
+    return Handler
+
+
+def serve(mock: MockOllama | None = None, port: int = 11435, host: str = "127.0.0.1"):
+    """Start the mock in a daemon thread. Returns (server, base_url)."""
+    mock = mock or MockOllama()
+    server = ThreadingHTTPServer((host, port), _handler(mock))
+    server.daemon_threads = True
+    server.mock = mock
+    threading.Thread(target=server.serve_forever, daemon=True, name="mock-ollama").start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--port", type=int, default=11435)
+    ap.add_argument("--tokens-per-sec", type=float, default=20.0,
+                    help=f"decode rate of a {REFERENCE_PARAMS_B:g}B model (others scale by size)")
+    ap.add_argument("--prefill-tokens-per-sec", type=float, default=200.0,
+                    help="prompt processing rate of the reference model")
+    ap.add_argument("--latency", type=float, default=0.2, help="fixed seconds before prompt processing")
+    ap.add_argument("--jitter", type=float, default=0.0, help="± fraction of random variation per delay")
+    ap.add_argument("--reply-tokens", type=int, default=60)
+    ap.add_argument("--rate", action="append", default=[], metavar="MODEL=TOK_S",
+                    help="override one model's decode rate, e.g. --rate mistral=4")
+    args = ap.parse_args()
+    rates = {k: float(v) for k, v in (r.split("=", 1) for r in args.rate)}
+    mock = MockOllama(args.tokens_per_sec, args.latency, args.reply_tokens,
+                      prefill_tokens_per_sec=args.prefill_tokens_per_sec, jitter=args.jitter, rates=rates)
+    server, url = serve(mock, args.port)
+    print(f"Mock Ollama on {url} — Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""
+Tiered cache for external-call results shared across Streamlit workers.
+
+    L1  in-process TTLCache (per worker, no serialisation)
+    L2  SQLite file in data/ (shared by every worker on the host, WAL mode)
+    L3  Redis-compatible store, only when AGRICHAIN_REDIS_URL is set and the
+        `redis` package is installed (shared across hosts)
+
+A lookup walks the tiers in order and back-fills the faster ones on a hit, so
+a value fetched by one worker is a local SQLite read for every other worker
+instead of another call to Open-Meteo / Google Translate / GitHub. Values
+must be JSON-serialisable. Each namespace has its own TTL and size limits
+and keeps per-tier hit/miss counters:
+
+    weather = get_cache("weather", ttl=3600)
+    daily = weather.get_or_set(key, lambda: fetch(...))
+
+    @cached("geojson", ttl=86400)
+    def fetch_geojson(): ...
+"""
+
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import functools
+import json
+import sqlite3
+import threading
+import time
+
+from utils.ttl_cache import TTLCache
+
+DB_PATH   = os.environ.get("AGRICHAIN_CACHE_DB", os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "cache.db"))
+REDIS_URL = os.environ.get("AGRICHAIN_REDIS_URL", "")
+
+DEFAULT_MAX_ENTRIES     = 256        # L1 entries per namespace
+DEFAULT_MAX_ROWS        = 5000       # L2 rows per namespace
+DEFAULT_MAX_VALUE_BYTES = 8 * 2**20  # larger values stay in L1 only
+PRUNE_EVERY             = 100        # L2 writes between size-limit prunes
+
+_MISSING = object()
+
+
+# ─── L2: SQLite ────────────────────────────────────────────────────────────────
+_conn      = None
+_conn_lock = threading.Lock()
+
+
+def _db():
+    """Shared connection (created on first use); None if the file can't be opened."""
+    global _conn
+    if _conn is None:
+        try:
+            conn = sqlite3.connect(DB_PATH, check_same_thread=False, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""CREATE TABLE IF NOT EXISTS cache (
+                                ns         TEXT NOT NULL,
+                                key        TEXT NOT NULL,
+                                value      TEXT NOT NULL,
+                                expires_at REAL NOT NULL,
+                                PRIMARY KEY (ns, key))""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_expiry ON cache(ns, expires_at)")
+            conn.commit()
+            _conn = conn
+        except sqlite3.Error:
+            return None
+    return _conn
+
+
+def _l2_get(ns: str, key: str):
+    with _conn_lock:
+        conn = _db()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute("SELECT value, expires_at FROM cache WHERE ns = ? AND key = ?",
+                               (ns, key)).fetchone()
+        except sqlite3.Error:
+            return None
+    return row if row and row[1] > time.time() else None
+
+
+def _l2_set(ns: str, key: str, payload: str, expires_at: float):
+    with _conn_lock:
+        conn = _db()
+        if conn is None:
+            return
+        try:
+            conn.execute("INSERT OR REPLACE INTO cache (ns, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                         (ns, key, payload, expires_at))
+            conn.commit()
+        except sqlite3.Error:
+            pass
+
+
+def _l2_prune(ns: str, max_rows: int):
+    """Drop expired rows, then the soonest-expiring ones beyond `max_rows`."""
+    with _conn_lock:
+        conn = _db()
+        if conn is None:
+            return
+        try:
+            conn.execute("DELETE FROM cache WHERE ns = ? AND expires_at <= ?", (ns, time.time()))
+            conn.execute("""DELETE FROM cache WHERE ns = ? AND key IN (
+                                SELECT key FROM cache WHERE ns = ?
+                                ORDER BY expires_at DESC LIMIT -1 OFFSET ?)""", (ns, ns, max_rows))
+            conn.commit()
+        except sqlite3.Error:
+            pass
+
+
+def _l2_delete(ns: str, key: str | None = None):
+    with _conn_lock:
+        conn = _db()
+        if conn is None:
+            return
+        try:
+            if key is None:
+                conn.execute("DELETE FROM cache WHERE ns = ?", (ns,))
+            else:
+                conn.execute("DELETE FROM cache WHERE ns = ? AND key = ?", (ns, key))
+            conn.commit()
+        except sqlite3.Error:
+            pass
+
+
+# ─── L3: Redis (optional) ──────────────────────────────────────────────────────
+_redis = None
+_redis_checked = False
+
+
+def _redis_client():
+    """Redis client for REDIS_URL, or None when unset / not installed / unreachable."""
+    global _redis, _redis_checked
+    if not _redis_checked:
+        _redis_checked = True
+        if REDIS_URL:
+            try:
+                import redis
+                client = redis.Redis.from_url(REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5)
+                client.ping()
+                _redis = client
+            except Exception:
+                _redis = None
+    return _redis
+
+
+# ─── Namespaced cache ──────────────────────────────────────────────────────────
+class TieredCache:
+    """One namespace of the cache: L1 → L2 → L3 with a shared TTL."""
+
+    def __init__(self, namespace: str, ttl: float, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_rows: int = DEFAULT_MAX_ROWS, max_value_bytes: int = DEFAULT_MAX_VALUE_BYTES):
+        self.namespace       = namespace
+        self.ttl             = ttl
+        self.max_rows        = max_rows
+        self.max_value_bytes = max_value_bytes
+        self._l1     = TTLCache(maxsize=max_entries, ttl=ttl)
+        self._lock   = threading.Lock()
+        self._writes = 0
+        self.hits    = {"l1": 0, "l2": 0, "l3": 0}
+        self.misses  = 0
+
+    def _count(self, tier: str | None):
+        with self._lock:
+            if tier is None:
+                self.misses += 1
+            else:
+                self.hits[tier] += 1
+
+    def get(self, key: str, default=None):
+        value = self._l1.get(key, _MISSING)
+        if value is not _MISSING:
+            self._count("l1")
+            return value
+
+        row = _l2_get(self.namespace, key)
+        if row is not None:
+            value, expires_at = json.loads(row[0]), row[1]
+            self._l1.set(key, value, ttl=expires_at - time.time())
+            self._count("l2")
+            return value
+
+        client = _redis_client()
+        if client is not None:
+            try:
+                payload = client.get(f"agrichain:{self.namespace}:{key}")
+                ttl_left = client.ttl(f"agrichain:{self.namespace}:{key}") if payload else 0
+            except Exception:
+                payload = None
+            if payload:
+                value = json.loads(payload)
+                ttl_left = ttl_left if ttl_left and ttl_left > 0 else self.ttl
+                self._l1.set(key, value, ttl=ttl_left)
+                _l2_set(self.namespace, key, payload.decode() if isinstance(payload, bytes) else payload,
+                        time.time() + ttl_left)
+                self._count("l3")
+                return value
+
+        self._count(None)
+        return default
+
+    def set(self, key: str, value, ttl: float | None = None):
+        ttl = self.ttl if ttl is None else ttl
+        self._l1.set(key, value, ttl=ttl)
+        try:
+            payload = json.dumps(value, separators=(",", ":"))
+        except (TypeError, ValueError):
+            return   # not shareable; stays in this worker's L1
+        if len(payload) > self.max_value_bytes:
+            return
+        _l2_set(self.namespace, key, payload, time.time() + ttl)
+        client = _redis_client()
+        if client is not None:
+            try:
+                client.set(f"agrichain:{self.namespace}:{key}", payload, ex=max(1, int(ttl)))
+            except Exception:
+                pass
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % PRUNE_EVERY == 0
+        if prune:
+            _l2_prune(self.namespace, self.max_rows)
+
+    def get_or_set(self, key: str, compute):
+        """Cached value for `key`, computing and storing it on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def delete(self, key: str):
+        self._l1.pop(key)
+        _l2_delete(self.namespace, key)
+        client = _redis_client()
+        if client is not None:
+            try:
+                client.delete(f"agrichain:{self.namespace}:{key}")
+            except Exception:
+                pass
+
+    def clear(self):
+        """Empty this namespace in L1 and L2 (Redis keys are left to expire)."""
+        self._l1.clear()
+        _l2_delete(self.namespace)
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits, misses = dict(self.hits), self.misses
+        total = sum(hits.values()) + misses
+        return {
+            "namespace": self.namespace,
+            "ttl":       self.ttl,
+            "l1_size":   len(self._l1),
+            "hits":      hits,
+            "misses":    misses,
+            "hit_rate":  round(sum(hits.values()) / total, 3) if total else 0.0,
+        }
+
+
+_caches      = {}   # namespace -> TieredCache
+_caches_lock = threading.Lock()
+
+
+def get_cache(namespace: str, ttl: float, **limits) -> TieredCache:
+    """The process-wide cache for `namespace` (created on first use)."""
+    with _caches_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            cache = _caches[namespace] = TieredCache(namespace, ttl, **limits)
+        return cache
+
+
+def make_key(*parts) -> str:
+    return json.dumps(parts, separators=(",", ":"), default=str)
+
+
+def cached(namespace: str, ttl: float, skip_none: bool = True, **limits):
+    """
+    Decorator: cache a function's JSON-serialisable result by its arguments.
+    None results (the usual "fetch failed" value) are not stored by default.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            cache = get_cache(namespace, ttl, **limits)
+            key = make_key(fn.__name__, args, sorted(kwargs.items()))
+            value = cache.get(key, _MISSING)
+            if value is _MISSING:
+                value = fn(*args, **kwargs)
+                if value is not None or not skip_none:
+                    cache.set(key, value)
+            return value
+        wrapper.cache = lambda: get_cache(namespace, ttl, **limits)
+        return wrapper
+    return decorator
+
+
+def cache_stats() -> list[dict]:
+    """Counters for every namespace created in this process."""
+    with _caches_lock:
+        caches = list(_caches.values())
+    backends = "L1 → SQLite" + (" → Redis" if _redis_client() is not None else "")
+    return [dict(c.stats(), backends=backends) for c in caches]
@@ -0,0 +1,112 @@
+"""
+Persistent AI Assistant chat history (SQLite, one row per message).
+
+Messages are keyed by a per-user id that the chat page keeps in the URL
+(?uid=…), so a farmer's conversation survives page reloads and server
+restarts. Reads are bounded (newest N, or N before a given message id), so
+the page never loads or renders the whole conversation.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+
+DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "chat_history.db")
+
+_UID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+_conn      = None
+_conn_lock = threading.Lock()
+
+
+def _db():
+    """Shared connection (created on first use); None if the store can't be opened."""
+    global _conn
+    if _conn is None:
+        try:
+            conn = sqlite3.connect(DB_PATH, check_same_thread=False, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""CREATE TABLE IF NOT EXISTS messages (
+                                id         INTEGER PRIMARY KEY AUTOINCREMENT,
+                                user_id    TEXT NOT NULL,
+                                role       TEXT NOT NULL,
+                                content    TEXT NOT NULL,
+                                created_at REAL NOT NULL)""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_user ON messages(user_id, id)")
+            conn.commit()
+            _conn = conn
+        except sqlite3.Error:
+            return None
+    return _conn
+
+
+def new_user_id() -> str:
+    return uuid.uuid4().hex
+
+
+def valid_user_id(user_id) -> bool:
+    return isinstance(user_id, str) and bool(_UID_RE.match(user_id))
+
+
+def _rows_to_messages(rows) -> list[dict]:
+    return [{"id": r[0], "role": r[1], "content": r[2]} for r in rows]
+
+
+def append_message(user_id: str, role: str, content: str) -> int | None:
+    """Store one message; returns its id (None if the store is unavailable)."""
+    with _conn_lock:
+        conn = _db()
+        if conn is None:
+            return None
+        try:
+            cur = conn.execute(
+                "INSERT INTO messages (user_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+                (user_id, role, content, time.time()),
+            )
+            conn.commit()
+            return cur.lastrowid
+        except sqlite3.Error:
+            return None
+
+
+def recent_messages(user_id: str, limit: int) -> list[dict]:
+    """The newest `limit` messages, oldest first."""
+    return messages_before(user_id, None, limit)
+
+
+def messages_before(user_id: str, before_id: int | None, limit: int) -> list[dict]:
+    """Up to `limit` messages older than `before_id` (newest if None), oldest first."""
+    with _conn_lock:
+        conn = _db()
+        if conn is None or limit <= 0:
+            return []
+        try:
+            rows = conn.execute(
+                "SELECT id, role, content FROM messages WHERE user_id = ? AND id < ? "
+                "ORDER BY id DESC LIMIT ?",
+                (user_id, before_id if before_id is not None else 2 ** 63 - 1, limit),
+            ).fetchall()
+        except sqlite3.Error:
+            return []
+    return _rows_to_messages(reversed(rows))
+
+
+def has_messages_before(user_id: str, before_id: int | None) -> bool:
+    return bool(messages_before(user_id, before_id, 1))
+
+
+def clear_messages(user_id: str) -> int:
+    """Delete a user's history. Returns the number of messages removed."""
+    with _conn_lock:
+        conn = _db()
+        if conn is None:
+            return 0
+        try:
+            cur = conn.execute("DELETE FROM messages WHERE user_id = ?", (user_id,))
+            conn.commit()
+            return cur.rowcount
+        except sqlite3.Error:
+            return 0
@@ -0,0 +1,166 @@
+"""
+Circuit breakers for the external services AgriChain calls.
+
+One breaker per dependency (Open-Meteo, Google Translate, GitHub raw,
+Ollama), shared by every session in the process:
+
+    CLOSED     calls go through; `failure_threshold` consecutive failures open it
+    OPEN       calls fail immediately with CircuitOpenError for `reset_timeout` s
+    HALF_OPEN  one probe call is let through; success closes the breaker,
+               failure re-opens it for another `reset_timeout`
+
+so a service that is down costs each page a dictionary lookup instead of a
+full request timeout, and recovery is noticed without a restart.
+
+    breaker = get_breaker("open-meteo")
+    data = breaker.call(requests.get, url, timeout=8)   # raises CircuitOpenError when open
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+FAILURE_THRESHOLD = int(os.environ.get("AGRICHAIN_BREAKER_FAILURES", "3"))
+RESET_TIMEOUT     = float(os.environ.get("AGRICHAIN_BREAKER_RESET_S", "30"))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a dependency whose breaker is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} unavailable (circuit open, retry in {retry_in:.0f}s)")
+        self.name, self.retry_in = name, retry_in
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = FAILURE_THRESHOLD,
+                 reset_timeout: float = RESET_TIMEOUT):
+        self.name              = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout     = reset_timeout
+        self._state     = CLOSED
+        self._failures  = 0          # consecutive, while closed
+        self._opened_at = 0.0
+        self._probing   = False      # a half-open probe is in flight
+        self._lock      = threading.Lock()
+        self.calls          = 0
+        self.failures       = 0
+        self.short_circuits = 0      # calls rejected without touching the service
+        self.trips          = 0
+        self.last_error     = ""
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        """True if a call may proceed now (claims the probe slot when half-open)."""
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            if state == CLOSED or (state == HALF_OPEN and not self._probing):
+                self._probing = state == HALF_OPEN
+                self.calls += 1
+                return True
+            self.short_circuits += 1
+            return False
+
+    def check(self):
+        """Raise CircuitOpenError now if the breaker is open (without claiming a probe)."""
+        with self._lock:
+            if self._current_state(time.monotonic()) != OPEN:
+                return
+            self.short_circuits += 1
+            retry = self.reset_timeout - (time.monotonic() - self._opened_at)
+        raise CircuitOpenError(self.name, max(0.0, retry))
+
+    def retry_in(self) -> float:
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def record_success(self):
+        with self._lock:
+            self._state, self._failures, self._probing = CLOSED, 0, False
+
+    def record_failure(self, error: BaseException | str = ""):
+        with self._lock:
+            self.failures  += 1
+            self._failures += 1
+            self.last_error = str(error)[:120]
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.trips += 1
+                self._state, self._opened_at = OPEN, time.monotonic()
+            self._probing = False
+
+    def release(self):
+        """Give back a probe slot without an outcome (e.g. the caller was cancelled)."""
+        with self._lock:
+            self._probing = False
+
+    def reset(self):
+        """Close the breaker (manual re-check)."""
+        self.record_success()
+
+    @contextmanager
+    def guard(self):
+        """Run the body as one call: exceptions count as failures."""
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_in())
+        try:
+            yield
+        except Exception as exc:
+            self.record_failure(exc)
+            raise
+        except BaseException:
+            self.release()
+            raise
+        self.record_success()
+
+    def call(self, fn, *args, **kwargs):
+        with self.guard():
+            return fn(*args, **kwargs)
+
+    def stats(self) -> dict:
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            retry = max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at)) if state == OPEN else 0.0
+            return {
+                "name":           self.name,
+                "state":          state,
+                "retry_in":       round(retry, 1),
+                "calls":          self.calls,
+                "failures":       self.failures,
+                "short_circuits": self.short_circuits,
+                "trips":          self.trips,
+                "last_error":     self.last_error,
+            }
+
+
+_breakers      = {}   # name -> CircuitBreaker
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str, **settings) -> CircuitBreaker:
+    """The process-wide breaker for `name` (created on first use)."""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name, **settings)
+        return breaker
+
+
+def breaker_states() -> list[dict]:
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return [b.stats() for b in breakers]
@@ -1,10 +1,20 @@
 """
 Dynamic Devanagari translation for place names (districts, mandis, cities).
 
-Uses the FREE Google Translate endpoint — no API key required.
-Results are cached in Streamlit's cache for 24h to avoid repeated calls.
+Place names are resolved word by word: curated overrides first, then the
+offline rule-based transliterator (utils.transliterate) — no network, a few
+microseconds per name. This is the default (PLACE_NAME_MODE="transliterate").
+
+With AGRICHAIN_PLACE_NAMES=google, names not covered by the overrides go to
+the FREE Google Translate endpoint instead (no API key required). Machine
+translations are stored permanently in utils.translation_store (SQLite,
+preloaded at startup), so every worker and every restart reuses them;
+failures are not stored. Names missing from the table are fetched together:
+several `q` values per request, chunks sent in parallel — one round trip
+for a whole map of district labels.
 
 translate_place(name, lang) → Devanagari string (or original if lang == "en")
+translate_places_batch(names, lang) → {name: Devanagari}
 
 Supported lang codes: "hi" (Hindi), "mr" (Marathi), "en" (passthrough)
 """
@@ -12,9 +22,18 @@ Supported lang codes: "hi" (Hindi), "mr" (Marathi), "en" (passthrough)
 import sys, os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import json
+from concurrent.futures import ThreadPoolExecutor
+
 import requests as _requests
-import streamlit as st
+
+from utils import translation_store
+from utils.circuit_breaker import get_breaker
+from utils.transliterate import transliterate
+
+PLACE_NAME_MODE = os.environ.get("AGRICHAIN_PLACE_NAMES", "transliterate")   # or "google"
+
+BATCH_MAX_CHARS = 1500   # q payload per request (keeps the GET URL well under 2 KB)
+BATCH_PARALLEL  = 4      # requests in flight for one batch
 
 _BASE = "https://translate.googleapis.com/translate_a/t"
 
@@ -32,6 +51,26 @@ _OVERRIDES_HI = {
     "Jalgaon":     "जळगाव",
     "Ahmednagar":  "अहमदनगर",
     "Thane":       "ठाणे",
+    "Amravati":    "अमरावती",
+    "Sangli":      "सांगली",
+    "Latur":       "लातूर",
+    "Osmanabad":   "उस्मानाबाद",
+    "Nanded":      "नांदेड़",
+    "Dhule":       "धुले",
+    "Raigad":      "रायगढ़",
+    "Ratnagiri":   "रत्नागिरी",
+    "Sindhudurg":  "सिंधुदुर्ग",
+    "Palghar":     "पालघर",
+    "Mumbai":      "मुंबई",
+    "Beed":        "बीड",
+    "Hingoli":     "हिंगोली",
+    "Jalna":       "जालना",
+    "Parbhani":    "परभणी",
+    "Akola":       "अकोला",
+    "Buldhana":    "बुलढाणा",
+    "Washim":      "वाशिम",
+    "Yavatmal":    "यवतमाल",
+    "Gondiya":     "गोंदिया",
     # Common mandi suffixes
     "APMC":        "एपीएमसी",
     "Market":      "बाजार",
@@ -50,6 +89,26 @@ _OVERRIDES_MR = {
     "Jalgaon":     "जळगाव",
     "Ahmednagar":  "अहमदनगर",
     "Thane":       "ठाणे",
+    "Amravati":    "अमरावती",
+    "Sangli":      "सांगली",
+    "Latur":       "लातूर",
+    "Osmanabad":   "धाराशिव",
+    "Nanded":      "नांदेड",
+    "Dhule":       "धुळे",
+    "Raigad":      "रायगड",
+    "Ratnagiri":   "रत्नागिरी",
+    "Sindhudurg":  "सिंधुदुर्ग",
+    "Palghar":     "पालघर",
+    "Mumbai":      "मुंबई",
+    "Beed":        "बीड",
+    "Hingoli":     "हिंगोली",
+    "Jalna":       "जालना",
+    "Parbhani":    "परभणी",
+    "Akola":       "अकोला",
+    "Buldhana":    "बुलढाणा",
+    "Washim":      "वाशिम",
+    "Yavatmal":    "यवतमाळ",
+    "Gondiya":     "गोंदिया",
     # Common mandi suffixes
     "APMC":        "एपीएमसी",
     "Market":      "बाजार",
@@ -58,7 +117,24 @@ _OVERRIDES_MR = {
 }
 
 
-@st.cache_data(ttl=86400, show_spinner=False)
+def _from_overrides(text: str, overrides: dict) -> str | None:
+    # Check exact match first
+    if text in overrides:
+        return overrides[text]
+    # Word-by-word override substitution (handles "Pune APMC" etc.)
+    words = text.split()
+    if words and all(w in overrides for w in words):
+        return " ".join(overrides[w] for w in words)
+    return None
+
+
+def _transliterate_name(text: str, lang: str, overrides: dict) -> str:
+    """Overrides for the whole name, then per word; transliterate the rest."""
+    if text in overrides:
+        return overrides[text]
+    return " ".join(overrides.get(w) or transliterate(w, lang) for w in text.split())
+
+
 def translate_place(text: str, lang: str) -> str:
     """
     Translate a place name to Devanagari.
@@ -72,45 +148,113 @@ def translate_place(text: str, lang: str) -> str:
     """
     if lang == "en" or not text:
         return text
+    if PLACE_NAME_MODE != "google":
+        return _transliterate_name(text, lang, _OVERRIDES_HI if lang == "hi" else _OVERRIDES_MR)
+    return translate_places_batch([text], lang)[text]
 
+
+def translate_places_batch(names: list[str], lang: str) -> dict[str, str]:
+    """
+    Translate a list of place names. Returns {english: devanagari} mapping.
+    Overrides are free; other words are transliterated locally, or (in
+    "google" mode) looked up in the stored table and fetched in one batched
+    round trip. Untranslatable names map to themselves.
+    """
+    if lang == "en":
+        return {n: n for n in names}
     overrides = _OVERRIDES_HI if lang == "hi" else _OVERRIDES_MR
+    if PLACE_NAME_MODE != "google":
+        return {n: _transliterate_name(n, lang, overrides) if n else n for n in names}
+    out, missing = {}, []
+    for name in dict.fromkeys(names):
+        local = _from_overrides(name, overrides) if name else name
+        if local is None:
+            missing.append(name)
+        else:
+            out[name] = local
+    if missing:
+        out.update(translation_store.lookup(lang, missing))
+        remote = [n for n in missing if n not in out]
+        if remote:
+            fetched = _google_translate_many(remote, lang)
+            translation_store.store(lang, fetched)
+            out.update(fetched)
+            for name in remote:
+                out.setdefault(name, name)   # graceful fallback to original
+    return out
 
-    # Check exact match first
-    if text in overrides:
-        return overrides[text]
 
-    # Word-by-word override substitution (handles "Pune APMC" etc.)
-    words = text.split()
-    all_known = all(w in overrides for w in words)
-    if all_known:
-        return " ".join(overrides[w] for w in words)
+def preload():
+    """Load the stored translation table into memory (call once at startup; google mode only)."""
+    return translation_store.preload() if PLACE_NAME_MODE == "google" else 0
 
-    # Fall back to Google Translate free endpoint
-    try:
-        tl = "hi" if lang == "hi" else "mr"
+
+# ── Google Translate free endpoint ────────────────────────────────────────────
+def _first_text(item) -> str | None:
+    # Each result is [translated, source_lang] or just translated
+    if isinstance(item, list) and item and isinstance(item[0], str):
+        return item[0]
+    return item if isinstance(item, str) else None
+
+
+class _BatchShapeError(Exception):
+    """A well-formed response with a different number of results than names sent."""
+
+
+def _request(texts: list[str], tl: str) -> dict[str, str]:
+    """
+    One request carrying every name in `texts` as a repeated q parameter.
+    A body that isn't a JSON list (HTML, captcha page) counts as a
+    google-translate breaker failure.
+    """
+    with get_breaker("google-translate").guard():
         r = _requests.get(
             _BASE,
-            params={"client": "gtx", "sl": "en", "tl": tl, "q": text},
+            params={"client": "gtx", "sl": "en", "tl": tl, "q": texts},
             timeout=5,
         )
-        if r.status_code == 200:
-            data = r.json()
-            # Response is [[translated, original]] or just [translated]
-            if isinstance(data, list):
-                first = data[0]
-                if isinstance(first, list):
-                    return first[0]
-                if isinstance(first, str):
-                    return first
-    except Exception:
-        pass
+        r.raise_for_status()
+        data = r.json()
+        if isinstance(data, str):
+            data = [data]
+        if not isinstance(data, list):
+            raise ValueError(f"unexpected translate response: {type(data).__name__}")
+    if len(data) != len(texts):
+        raise _BatchShapeError(f"{len(data)} results for {len(texts)} names")
+    return {text: out for text, out in zip(texts, map(_first_text, data)) if out}
 
-    return text   # graceful fallback to original
 
+def _request_or_split(texts: list[str], tl: str) -> dict[str, str]:
+    """Batched request; if the endpoint won't batch, fall back to one request per name."""
+    try:
+        return _request(texts, tl)
+    except _BatchShapeError:
+        if len(texts) == 1:
+            return {}
+    except Exception:
+        return {}   # network, HTTP or parse failure (recorded by the breaker): fail fast
+    found = {}
+    with ThreadPoolExecutor(max_workers=min(BATCH_PARALLEL, len(texts))) as pool:
+        for part in pool.map(lambda t: _request_or_split([t], tl), texts):
+            found.update(part)
+    return found
 
-def translate_places_batch(names: list[str], lang: str) -> dict[str, str]:
-    """
-    Translate a list of place names. Returns {english: devanagari} mapping.
-    Calls translate_place for each (each is individually cached).
-    """
-    return {n: translate_place(n, lang) for n in names}
+
+def _google_translate_many(texts: list[str], lang: str) -> dict[str, str]:
+    """Translations for `texts` (failures omitted): chunked by URL size, chunks in parallel."""
+    tl = "hi" if lang == "hi" else "mr"
+    chunks, chunk, size = [], [], 0
+    for text in texts:
+        if chunk and size + len(text) > BATCH_MAX_CHARS:
+            chunks.append(chunk)
+            chunk, size = [], 0
+        chunk.append(text)
+        size += len(text) + 3   # "&q="
+    chunks.append(chunk)
+    if len(chunks) == 1:
+        return _request_or_split(chunks[0], tl)
+    found = {}
+    with ThreadPoolExecutor(max_workers=min(BATCH_PARALLEL, len(chunks))) as pool:
+        for part in pool.map(lambda c: _request_or_split(c, tl), chunks):
+            found.update(part)
+    return found
@@ -17,6 +17,8 @@ render_district_selector(page_key, lang_code, crop) → selected district name
 import sys, os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import copy
+
 import streamlit as st
 import folium
 from streamlit_folium import st_folium
@@ -24,7 +26,9 @@ import requests as _requests
 
 from utils.geo import DISTRICT_COORDS
 from utils.shared_state import get_shared, set_shared, init_shared
-from utils.geo_translate import translate_place
+from utils.geo_translate import translate_places_batch
+from utils.cache_backend import cached
+from utils.circuit_breaker import get_breaker
 
 # ── Crop → emoji mapping ───────────────────────────────────────────────────────
 CROP_EMOJIS = {
@@ -49,9 +53,9 @@ CROP_EMOJIS = {
 DEFAULT_EMOJI = "🌾"
 
 # ── District names in Devanagari ──────────────────────────────────────────────
-def _district_label(name: str, lang_code: str) -> str:
-    """Return district name translated to Devanagari via Google Translate (cached)."""
-    return translate_place(name, lang_code)
+def _district_labels(districts: list[str], lang_code: str) -> dict[str, str]:
+    """District → label in the UI language (one batched lookup for the whole map)."""
+    return translate_places_batch(districts, lang_code)
 
 
 # ── India composite GeoJSON (Indian government perspective) ───────────────────
@@ -62,14 +66,16 @@ _INDIA_URLS = [
     "https://raw.githubusercontent.com/geohacker/india/master/state/india_state.geojson",
 ]
 
-@st.cache_data(ttl=86400, show_spinner=False)
+@cached("geojson", ttl=86400, max_entries=4)
 def _fetch_india_geojson():
-    """Fetch India states GeoJSON (Indian perspective). Returns dict or None."""
+    """Fetch India states GeoJSON (Indian perspective). Returns dict or None (not cached)."""
+    breaker = get_breaker("github-raw")   # both sources are on raw.githubusercontent.com
     for url in _INDIA_URLS:
         try:
-            r = _requests.get(url, timeout=10)
-            if r.status_code == 200:
-                return r.json()
+            with breaker.guard():
+                r = _requests.get(url, timeout=10)
+                r.raise_for_status()
+            return r.json()
         except Exception:
             continue
     return None
@@ -79,6 +85,7 @@ def _fetch_india_geojson():
 def _build_map(selected_district: str, crop: str = "Wheat", lang_code: str = "en") -> folium.Map:
     districts = list(DISTRICT_COORDS.keys())
     emoji      = CROP_EMOJIS.get(crop, DEFAULT_EMOJI)
+    labels     = _district_labels(districts, lang_code)
 
     # Zoom into selected district if one is chosen
     if selected_district and selected_district in DISTRICT_COORDS:
@@ -126,7 +133,7 @@ def _build_map(selected_district: str, crop: str = "Wheat", lang_code: str = "en
             }
 
         folium.GeoJson(
-            india_geojson,
+            copy.deepcopy(india_geojson),   # folium writes styles into features; the cached dict is shared
             name="India",
             style_function=_style,
             tooltip="India",
@@ -162,7 +169,7 @@ def _build_map(selected_district: str, crop: str = "Wheat", lang_code: str = "en
             ).add_to(m)
 
             # Large selected emoji marker — label in Devanagari if hi/mr
-            display = _district_label(district, lang_code)
+            display = labels[district]
             icon_html = f"""
             <div style="text-align:center;">
               <div style="font-size:28px;text-shadow:0 0 12px rgba(82,183,136,0.9),0 2px 8px rgba(0,0,0,0.6);filter:drop-shadow(0 0 6px #52b788);animation:pulse 2s infinite;">{emoji}</div>
@@ -190,7 +197,7 @@ def _build_map(selected_district: str, crop: str = "Wheat", lang_code: str = "en
 
         else:
             # Unselected district marker — label in Devanagari if hi/mr
-            display = _district_label(district, lang_code)
+            display = labels[district]
             icon_html = f"""
             <div style="text-align:center;">
               <div style="font-size:20px;opacity:0.82;text-shadow:0 2px 6px rgba(0,0,0,0.6);">{emoji}</div>
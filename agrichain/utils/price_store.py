@@ -0,0 +1,170 @@
+"""
+Memory-mapped, read-only price store shared by every Streamlit worker.
+
+The Agmarknet CSV is parsed once per data version into a NumPy structured
+array sorted by (commodity, state, market, date) and saved as an .npy file
+next to the CSV. Workers open it with mmap_mode="r": pages live in the OS
+page cache and are shared by all processes, a new worker starts hot without
+parsing anything, and a crop's rows are a zero-copy slice of the map.
+
+    view = get_price_store(csv_path).slice("Tomato", "Maharashtra")
+    view.weekly_index()            # pd.Series by ISO week
+    view.market_rows("Pune APMC")  # structured view, sorted by date
+"""
+
+import glob
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+STORE_DIRNAME = ".price_store"
+
+DTYPE = np.dtype([
+    ("commodity", "u2"), ("state", "u2"), ("market", "u2"), ("district", "u2"),
+    ("date", "datetime64[D]"), ("week", "u1"),
+    ("min_price", "i4"), ("max_price", "i4"), ("modal_price", "i4"),
+])
+
+_LABELS = {"commodity": "Commodity", "state": "State", "market": "Market", "district": "District"}
+
+
+class PriceSlice:
+    """Read-only view of one (commodity, state) range of the store."""
+    __slots__ = ("rows", "markets")
+
+    def __init__(self, rows: np.ndarray, markets: list):
+        self.rows    = rows      # structured array view (no copy)
+        self.markets = markets   # market code -> name
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def empty(self) -> bool:
+        return len(self.rows) == 0
+
+    def market_rows(self, market: str) -> np.ndarray:
+        """Rows of one market, oldest first (a view)."""
+        try:
+            code = self.markets.index(market)
+        except ValueError:
+            return self.rows[:0]
+        col = self.rows["market"]
+        lo, hi = np.searchsorted(col, code, "left"), np.searchsorted(col, code, "right")
+        return self.rows[lo:hi]
+
+    def weekly_index(self) -> pd.Series:
+        """Mean modal price per ISO week (same result as get_weekly_price_index on a DataFrame)."""
+        if self.empty:
+            return pd.Series(dtype=float, name="Modal_Price")
+        weeks  = self.rows["week"]
+        sums   = np.bincount(weeks, weights=self.rows["modal_price"], minlength=54)
+        counts = np.bincount(weeks, minlength=54)
+        present = np.nonzero(counts)[0]
+        idx = pd.Index(present.astype(int), name="week")
+        return pd.Series(sums[present] / counts[present], index=idx, name="Modal_Price")
+
+    def to_frame(self) -> pd.DataFrame:
+        """Materialise as the DataFrame load_mandi_prices used to return (copies)."""
+        r = self.rows
+        return pd.DataFrame({
+            "Market":      np.asarray(self.markets, dtype=object)[r["market"]] if len(r) else [],
+            "Date":        pd.to_datetime(r["date"]),
+            "Min_Price":   r["min_price"],
+            "Max_Price":   r["max_price"],
+            "Modal_Price": r["modal_price"],
+        })
+
+
+class PriceStore:
+    """One memory-mapped version of the price CSV."""
+
+    def __init__(self, rows: np.ndarray, meta: dict):
+        self.rows   = rows
+        self.labels = meta["labels"]
+        self.ranges = meta["ranges"]     # "commodity|state" (lower-case) -> [start, stop]
+
+    def slice(self, crop: str, state: str = "Maharashtra") -> PriceSlice:
+        start, stop = self.ranges.get(f"{crop.lower()}|{state.lower()}", (0, 0))
+        return PriceSlice(self.rows[start:stop], self.labels["market"])
+
+
+# ─── Build / open ──────────────────────────────────────────────────────────────
+def _version(csv_path: str) -> str:
+    st = os.stat(csv_path)
+    return f"{st.st_mtime_ns}-{st.st_size}"
+
+
+def build_store(csv_path: str, npy_path: str, meta_path: str):
+    """Parse the CSV once and write the sorted array + metadata atomically."""
+    df = pd.read_csv(csv_path)
+    labels, codes = {}, {}
+    for field, column in _LABELS.items():
+        codes[field], uniques = pd.factorize(df[column], sort=True)
+        labels[field] = [str(u) for u in uniques]
+
+    dates = pd.to_datetime(df["Arrival_Date"], dayfirst=True)
+    rows = np.empty(len(df), dtype=DTYPE)
+    for field in _LABELS:
+        rows[field] = codes[field]
+    rows["date"]        = dates.values.astype("datetime64[D]")
+    rows["week"]        = dates.dt.isocalendar().week.astype(int).values
+    rows["min_price"]   = df["Min_Price"].values
+    rows["max_price"]   = df["Max_Price"].values
+    rows["modal_price"] = df["Modal_Price"].values
+    rows.sort(order=["commodity", "state", "market", "date"], kind="stable")
+
+    ranges = {}
+    keys = rows["commodity"].astype(np.int64) * 65536 + rows["state"]
+    bounds = np.flatnonzero(np.diff(keys)) + 1
+    for start, stop in zip(np.r_[0, bounds], np.r_[bounds, len(rows)]):
+        if stop > start:
+            c, s = rows["commodity"][start], rows["state"][start]
+            ranges[f"{labels['commodity'][c].lower()}|{labels['state'][s].lower()}"] = [int(start), int(stop)]
+
+    tmp = f".tmp-{os.getpid()}-{threading.get_ident()}"
+    with open(npy_path + tmp, "wb") as f:
+        np.save(f, rows)
+    with open(meta_path + tmp, "w") as f:
+        json.dump({"labels": labels, "ranges": ranges, "rows": len(rows)}, f)
+    os.replace(npy_path + tmp, npy_path)
+    os.replace(meta_path + tmp, meta_path)   # written last: its presence marks a complete build
+
+
+def _cleanup(store_dir: str, keep: str):
+    for path in glob.glob(os.path.join(store_dir, "prices-*")):
+        if keep not in os.path.basename(path):
+            try:
+                os.remove(path)   # workers still mapping it keep their pages until they reopen
+            except OSError:
+                pass
+
+
+_stores      = {}   # abs csv path -> (version, PriceStore)
+_stores_lock = threading.Lock()
+
+
+def get_price_store(csv_path: str) -> PriceStore:
+    """The memory-mapped store for the CSV's current version, building it if needed."""
+    key = os.path.abspath(csv_path)
+    version = _version(csv_path)
+    with _stores_lock:
+        cached = _stores.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+
+        store_dir = os.path.join(os.path.dirname(key), STORE_DIRNAME)
+        os.makedirs(store_dir, exist_ok=True)
+        npy_path  = os.path.join(store_dir, f"prices-{version}.npy")
+        meta_path = os.path.join(store_dir, f"prices-{version}.json")
+        if not os.path.exists(meta_path):
+            build_store(csv_path, npy_path, meta_path)
+            _cleanup(store_dir, version)
+        with open(meta_path) as f:
+            meta = json.load(f)
+        store = PriceStore(np.load(npy_path, mmap_mode="r"), meta)
+        _stores[key] = (version, store)
+        return store
@@ -0,0 +1,111 @@
+"""
+Outbound request control: in-flight deduplication and rate limiting.
+
+SingleFlight runs one call per key at a time; threads that ask for the same
+key while it is running wait for that call and share its result (or its
+exception) instead of issuing their own request.
+
+TokenBucket admits `rate` calls per second with bursts of up to `burst`.
+Callers queue for a token (FIFO by reservation) for at most `max_wait`
+seconds; past that, acquire() returns False and the caller should fall back.
+
+Both are per process. The shared cache (utils.cache_backend) is what stops
+other workers repeating a fetch once one of them has completed it.
+"""
+
+import threading
+import time
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done   = threading.Event()
+        self.result = None
+        self.error  = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one."""
+
+    def __init__(self):
+        self._calls    = {}   # key -> _Call in progress
+        self._lock     = threading.Lock()
+        self.leaders   = 0    # calls that actually ran
+        self.coalesced = 0    # calls that shared a leader's result
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class TokenBucket:
+    """Token-bucket limiter; acquire() blocks in arrival order up to max_wait."""
+
+    def __init__(self, rate: float, burst: int, max_wait: float = 5.0):
+        self.rate     = rate
+        self.burst    = burst
+        self.max_wait = max_wait
+        self._tokens  = float(burst)
+        self._stamp   = time.monotonic()
+        self._lock    = threading.Lock()
+        self.admitted = 0
+        self.queued   = 0      # admitted after waiting
+        self.rejected = 0
+        self.wait_s   = 0.0    # total time spent queued
+
+    def acquire(self, max_wait: float | None = None) -> bool:
+        max_wait = self.max_wait if max_wait is None else max_wait
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp  = now
+            wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+            if wait > max_wait:
+                self.rejected += 1
+                return False
+            self._tokens -= 1          # reserve: later callers queue behind this one
+            self.admitted += 1
+            if wait:
+                self.queued += 1
+                self.wait_s += wait
+        if wait:
+            time.sleep(wait)
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "rate":       self.rate,
+                "burst":      self.burst,
+                "admitted":   self.admitted,
+                "queued":     self.queued,
+                "rejected":   self.rejected,
+                "avg_wait_s": round(self.wait_s / self.queued, 3) if self.queued else 0.0,
+            }
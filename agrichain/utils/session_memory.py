@@ -0,0 +1,381 @@
+"""
+Per-session memory accounting for st.session_state.
+
+Every page calls track_session() once per run. It registers the session in a
+process-wide registry of weak references, measures its session_state footprint (at most
+every MEASURE_INTERVAL seconds) and, when the session is over
+SESSION_CAP_BYTES, sheds rebuildable objects until it fits.
+
+A periodic background sweep frees the heavy objects of sessions idle for
+IDLE_SECONDS while they stay idle. It only touches a session whose
+AppSession (looked up through Streamlit's session manager) exists and has
+no script run in progress, and holds that session's registry lock, which
+track_session() takes at the start of every run, so a returning farmer's
+run waits for the shed to finish instead of racing it. Everything dropped
+is rebuilt lazily when the farmer comes back: chat history is reloaded from
+utils.chat_store, engine results are recomputed (or read from the cube),
+the map redraws, and the AI Assistant rebuilds the farm context from the
+small SPILLED_CONTEXT_KEY record left in its place.
+
+The session-manager lookup uses private Streamlit APIs; it is only used on
+the versions in SESSION_MGR_VERSIONS. On any other version sessions are
+tracked per run and idle eviction is off (idle entries are simply forgotten
+after IDLE_SECONDS).
+
+session_metrics() lists the largest sessions for the sidebar view.
+"""
+
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+import time
+import types
+import weakref
+
+SESSION_CAP_BYTES = int(float(os.environ.get("AGRICHAIN_SESSION_CAP_MB", "16")) * 2 ** 20)
+IDLE_SECONDS      = float(os.environ.get("AGRICHAIN_SESSION_IDLE_S", "900"))
+MEASURE_INTERVAL  = 10.0    # seconds between footprint measurements of one session
+SWEEP_INTERVAL    = 60.0    # seconds between idle-session sweeps
+KEEP_MESSAGES     = 20      # chat messages kept in memory after a trim
+MAX_SIZED_OBJECTS = 200_000 # safety bound for deep_sizeof on pathological graphs
+SESSION_MGR_VERSIONS = ((1, 30), (2, 0))   # [min, max) Streamlit versions with Runtime._session_mgr as used here
+MAX_IDLE_SHEDS    = 50      # idle sessions stripped per sweep (bounds one sweep's work)
+SPILLED_CONTEXT_KEY = "farm_context_spilled"   # FarmContext inputs left by an idle shed
+
+_OPAQUE = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+           types.MethodType, weakref.ref, type(threading.Lock()))
+
+
+# ─── Measuring ─────────────────────────────────────────────────────────────────
+def deep_sizeof(obj) -> int:
+    """Approximate bytes reachable from `obj` (numpy/pandas sized by their buffers)."""
+    seen, stack, total = set(), [obj], 0
+    while stack and len(seen) < MAX_SIZED_OBJECTS:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        if isinstance(o, _OPAQUE):
+            continue
+        total += sys.getsizeof(o, 0)
+        if isinstance(o, (str, bytes, bytearray, int, float, bool, type(None))):
+            continue
+        module = type(o).__module__
+        if module.startswith("pandas") and hasattr(o, "memory_usage"):
+            usage = o.memory_usage(deep=True)
+            total += int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+            continue
+        if module.startswith("numpy") and hasattr(o, "nbytes"):
+            total += int(o.nbytes)
+            continue
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)) or type(o).__name__ == "deque":
+            stack.extend(o)
+        else:
+            if hasattr(o, "__dict__"):
+                stack.append(vars(o))
+            for slot in getattr(type(o), "__slots__", ()):
+                if hasattr(o, slot):
+                    stack.append(getattr(o, slot))
+    return total
+
+
+def _keys(state) -> list:
+    try:
+        return list(state.filtered_state.keys()) if hasattr(state, "filtered_state") else list(state.keys())
+    except Exception:
+        return []
+
+
+def _get(state, key, default=None):
+    """SafeSessionState has no .get()."""
+    return state[key] if key in state else default
+
+
+def measure_state(state) -> dict:
+    """Bytes per session_state key."""
+    sizes = {}
+    for key in _keys(state):
+        try:
+            sizes[key] = deep_sizeof(state[key])
+        except Exception:
+            continue
+    return sizes
+
+
+# ─── Shedding (cheapest to rebuild first) ─────────────────────────────────────
+def _shed_results(state) -> bool:
+    """Engine results cached by utils.shared_state — recomputed on next use."""
+    if _get(state, "shared_results"):
+        state["shared_results"] = {}
+        return True
+    return False
+
+
+def _shed_messages(state) -> bool:
+    """Older chat turns — they are persisted in utils.chat_store and pageable."""
+    msgs = _get(state, "ai_messages") or []
+    if len(msgs) <= KEEP_MESSAGES:
+        return False
+    state["ai_messages"] = msgs[-KEEP_MESSAGES:]
+    memory = _get(state, "chat_memory")
+    if memory is not None:
+        memory.reset()   # its fold index pointed into the untrimmed list
+    return True
+
+
+def _shed_map_state(state) -> bool:
+    """st_folium widget state — the map redraws with defaults."""
+    dropped = False
+    for key in _keys(state):
+        if isinstance(key, str) and key.startswith("folium_"):
+            del state[key]
+            dropped = True
+    return dropped
+
+
+def _drop_messages(state) -> bool:
+    """The whole in-memory chat — the AI Assistant reloads the latest turns from utils.chat_store."""
+    if not _get(state, "ai_messages"):
+        return False
+    del state["ai_messages"]
+    if "history_pages" in state:
+        del state["history_pages"]
+    memory = _get(state, "chat_memory")
+    if memory is not None:
+        memory.reset()
+    return True
+
+
+def _spill_farm_context(state) -> bool:
+    """The AI Assistant context — only its inputs are kept; the page rebuilds it on return."""
+    ctx = _get(state, "farm_context")
+    if ctx is None:
+        return False
+    state[SPILLED_CONTEXT_KEY] = (ctx.crop, ctx.district, ctx.quantity_qtl,
+                                  ctx.storage_type, ctx.transit_hours, ctx.sowing_date)
+    state["farm_context"]  = None
+    state["system_prompt"] = ""
+    state["context_ready"] = False
+    return True
+
+
+ACTIVE_SHEDDERS = [_shed_results, _shed_messages]                                     # over cap, in use
+IDLE_SHEDDERS   = [_shed_results, _drop_messages, _shed_map_state, _spill_farm_context]  # idle sessions
+
+
+# ─── Registry ──────────────────────────────────────────────────────────────────
+_mgr_supported = None
+
+
+def _session_mgr_supported() -> bool:
+    """True if this Streamlit version is one the private session-manager lookup was checked against."""
+    global _mgr_supported
+    if _mgr_supported is None:
+        try:
+            import streamlit
+            version = tuple(int(p) for p in streamlit.__version__.split(".")[:2])
+            _mgr_supported = SESSION_MGR_VERSIONS[0] <= version < SESSION_MGR_VERSIONS[1]
+        except Exception:
+            _mgr_supported = False
+    return _mgr_supported
+
+
+def _app_session(session_id: str):
+    """The AppSession owning `session_id` (lives as long as the browser session), or None."""
+    if not _session_mgr_supported():
+        return None
+    try:
+        from streamlit.runtime import Runtime
+        info = Runtime.instance()._session_mgr.get_session_info(session_id)
+        return info.session if info else None
+    except Exception:
+        return None
+
+
+def _not_running(session_id: str) -> bool:
+    """True if the session still exists and no script run of it is in progress."""
+    app = _app_session(session_id)
+    if app is None:
+        return False
+    try:
+        from streamlit.runtime.app_session import AppSessionState
+        return app._state == AppSessionState.APP_NOT_RUNNING
+    except Exception:
+        return False
+
+
+class _Entry:
+    """
+    Registry record. Holds a weakref to the session's AppSession (whose
+    session_state outlives individual script runs), falling back to the
+    per-run SafeSessionState when no runtime is available (bare / tests).
+    """
+    __slots__ = ("_ref", "_via_app", "lock", "last_seen", "measured_at", "bytes", "top", "evictions",
+                 "idle_shed", "freed")
+
+    def __init__(self, session_id: str, run_state):
+        app = _app_session(session_id)
+        self._ref, self._via_app = weakref.ref(app if app is not None else run_state), app is not None
+        self.lock         = threading.Lock()   # held by a run's track_session() and by an idle shed
+        self.last_seen    = time.time()
+        self.measured_at  = 0.0
+        self.bytes        = 0
+        self.top          = []
+        self.evictions    = 0
+        self.idle_shed    = False   # stripped while idle (reset when the session runs again)
+        self.freed        = 0       # bytes freed by idle sheds
+
+    @property
+    def via_app(self) -> bool:
+        return self._via_app
+
+    def state(self):
+        obj = self._ref()
+        return obj.session_state if (obj is not None and self._via_app) else obj
+
+
+_registry    = {}   # session_id -> _Entry
+_reg_lock    = threading.Lock()
+_last_sweep  = 0.0
+_freed_total = 0    # bytes freed by idle sheds, including since-closed sessions
+
+
+def _measure(entry: _Entry, state):
+    sizes = measure_state(state)
+    entry.bytes       = sum(sizes.values())
+    entry.top         = sorted(sizes.items(), key=lambda kv: -kv[1])[:5]
+    entry.measured_at = time.time()
+
+
+def _shed(entry: _Entry, state, shedders, cap: float) -> int:
+    """Apply shedders in order until the footprint is under `cap`. Returns how many ran."""
+    ran = 0
+    for shed in shedders:
+        if entry.bytes <= cap:
+            break
+        try:
+            if shed(state):
+                ran += 1
+                _measure(entry, state)
+        except Exception:
+            continue
+    entry.evictions += ran
+    return ran
+
+
+def track_session():
+    """Register / measure the current Streamlit session; enforce the cap; sweep idle ones."""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+    except Exception:
+        ctx = None
+    if ctx is None:
+        return
+    now = time.time()
+    with _reg_lock:
+        entry = _registry.get(ctx.session_id)
+        if entry is None or entry.state() is None:
+            entry = _registry[ctx.session_id] = _Entry(ctx.session_id, ctx.session_state)
+
+    state = ctx.session_state
+    with entry.lock:                            # waits for an idle shed of this session in progress
+        entry.last_seen, entry.idle_shed = now, False
+        if now - entry.measured_at >= MEASURE_INTERVAL:
+            _measure(entry, state)
+            if entry.bytes > SESSION_CAP_BYTES:
+                _shed(entry, state, ACTIVE_SHEDDERS, SESSION_CAP_BYTES)
+    _maybe_sweep(now)
+
+
+def _maybe_sweep(now: float):
+    """Start a background sweep every SWEEP_INTERVAL seconds (never on a farmer's run)."""
+    global _last_sweep
+    with _reg_lock:
+        if now - _last_sweep < SWEEP_INTERVAL:
+            return
+        _last_sweep = now
+    threading.Thread(target=_sweep, args=(now,), daemon=True, name="agrichain-session-sweep").start()
+
+
+def _sweep(now: float):
+    """Forget closed sessions; strip idle ones that are not running."""
+    global _freed_total
+    with _reg_lock:
+        idle = []
+        for session_id, entry in list(_registry.items()):
+            quiet = now - entry.last_seen >= IDLE_SECONDS
+            if entry.state() is None and (entry.via_app or quiet):
+                del _registry[session_id]          # closed (or, without the session manager, gone quiet)
+            elif entry.via_app and quiet and not entry.idle_shed:
+                idle.append((session_id, entry))
+    for session_id, entry in idle[:MAX_IDLE_SHEDS]:
+        if not entry.lock.acquire(blocking=False):
+            continue                               # the session is starting a run right now
+        try:
+            state = entry.state()
+            if (state is None or entry.idle_shed or time.time() - entry.last_seen < IDLE_SECONDS
+                    or not _not_running(session_id)):
+                continue
+            _measure(entry, state)
+            before = entry.bytes
+            _shed(entry, state, IDLE_SHEDDERS, 0)
+            freed = max(0, before - entry.bytes)
+            entry.freed += freed
+            entry.idle_shed = True
+            with _reg_lock:
+                _freed_total += freed
+        except Exception:
+            continue
+        finally:
+            entry.lock.release()
+
+
+# ─── Metrics ───────────────────────────────────────────────────────────────────
+def process_rss_bytes() -> int | None:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        try:
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024   # peak, KB on Linux
+        except Exception:
+            return None
+
+
+def session_metrics(limit: int = 5) -> dict:
+    """Largest tracked sessions plus totals (sizes as of each session's last measurement)."""
+    now = time.time()
+    with _reg_lock:
+        live = [(sid, e) for sid, e in _registry.items() if e.state() is not None]
+    largest = sorted(live, key=lambda se: -se[1].bytes)[:limit]
+    return {
+        "sessions":    len(live),
+        "total_bytes": sum(e.bytes for _, e in live),
+        "rss_bytes":   process_rss_bytes(),
+        "cap_bytes":   SESSION_CAP_BYTES,
+        "idle_freed_bytes": _freed_total,
+        "idle_stripped":    sum(e.idle_shed for _, e in live),
+        "largest": [{
+            "session":   sid[:8],
+            "bytes":     e.bytes,
+            "idle_s":    round(now - e.last_seen),
+            "top_keys":  [(str(k), b) for k, b in e.top[:3]],
+            "evictions": e.evictions,
+        } for sid, e in largest],
+    }
+
+
+def current_session_bytes() -> int:
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        entry = _registry.get(ctx.session_id) if ctx else None
+        return entry.bytes if entry else 0
+    except Exception:
+        return 0
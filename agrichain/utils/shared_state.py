@@ -4,10 +4,25 @@ Shared parameter state across all AgriChain pages.
 When the user sets crop/district/quantity/etc. on any page, those values
 are persisted in st.session_state under "shared_*" keys and used as
 defaults when any other page first loads.
+
+Engine results are shared the same way: whichever page (or the AI context
+builder) first computes a harvest / mandi / spoilage result for a set of
+inputs stores it under "shared_results", and every other page reuses it
+until the inputs or the underlying price/weather data change. When a new
+(crop, district) pair is first seen, all three engines are pre-warmed in the
+background so the next page's button press is served from cache.
 """
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
 
+from modules.data_fetcher import get_data_version
+from utils.ttl_cache import TTLCache
+
 # ── Defaults ──────────────────────────────────────────────────────────────────
 _DEFAULTS = {
     "crop":     "Tomato",
@@ -33,6 +48,8 @@ def get_shared(key: str):
 
 def set_shared(key: str, value):
     """Update a shared value (called by each page widget's on_change)."""
+    if st.session_state.get(f"shared_{key}") != value:
+        _drop_results_using(key)
     st.session_state[f"shared_{key}"] = value
 
 
@@ -44,3 +61,147 @@ def sync_all(crop, district, quantity=None, storage=None, transit=None, sowing=N
     if storage  is not None: set_shared("storage",  storage)
     if transit  is not None: set_shared("transit",  transit)
     if sowing   is not None: set_shared("sowing",   sowing)
+
+    # New (crop, district) pair → run the engines ahead of the next page visit
+    pair = (crop, district)
+    if st.session_state.get("shared_warm_pair") != pair and prewarm():
+        st.session_state["shared_warm_pair"] = pair
+
+
+# ── Engine result cache ───────────────────────────────────────────────────────
+# One entry per engine: (inputs + data version, result). A page only ever shows
+# the result for its current inputs, so a new input set simply replaces the
+# old entry and a price/weather version bump makes every entry miss.
+_RESULTS_KEY = "shared_results"
+
+# Which shared inputs each engine depends on
+_ENGINE_INPUTS = {
+    "harvest":  ("crop", "district", "sowing"),
+    "mandi":    ("crop", "district", "quantity"),
+    "spoilage": ("crop", "district", "quantity", "storage", "transit"),
+}
+
+
+def _result_key(args: tuple) -> tuple:
+    return (tuple(args), get_data_version())
+
+
+def _drop_results_using(key: str):
+    """Forget cached results of every engine that depends on the given input."""
+    results = st.session_state.get(_RESULTS_KEY)
+    if not results:
+        return
+    for engine, inputs in _ENGINE_INPUTS.items():
+        if key in inputs:
+            results.pop(engine, None)
+
+
+def get_result(engine: str, *args):
+    """
+    Return the cached result of `engine` for these inputs, or None.
+    Falls back to results pre-warmed in the background (by any session),
+    then to the nightly precomputed cube.
+    """
+    from modules.recommendation_cube import lookup as cube_lookup
+
+    key   = _result_key(args)
+    entry = st.session_state.get(_RESULTS_KEY, {}).get(engine)
+    if entry is not None and entry[0] == key:
+        return entry[1]
+    found = _WARM_RESULTS.get((engine, key))
+    if found is None:
+        found = cube_lookup(engine, args)
+    if found is not None:
+        put_result(engine, found, *args)
+    return found
+
+
+def put_result(engine: str, result, *args):
+    """Store an engine result computed for the given inputs."""
+    if _RESULTS_KEY not in st.session_state:
+        st.session_state[_RESULTS_KEY] = {}
+    st.session_state[_RESULTS_KEY][engine] = (_result_key(args), result)
+
+
+def cached_result(engine: str, fn, *args, **data):
+    """
+    Return fn(*args, **data), reusing a result computed earlier in this
+    session (on any page) for the same inputs and data version.
+
+    Only the positional args form the cache key; keyword args are pre-fetched
+    data (weather, prices) that the data version already accounts for.
+    """
+    result = get_result(engine, *args)
+    if result is None:
+        result = fn(*args, **data)
+        put_result(engine, result, *args)
+    return result
+
+
+# ── Background pre-warming ────────────────────────────────────────────────────
+# Warm jobs cannot touch st.session_state (no script context in worker
+# threads), so they write into a process-wide store that get_result() reads.
+MAX_WARM_JOBS = 2   # concurrent warm jobs per process; extra requests are skipped
+
+_WARM_POOL    = ThreadPoolExecutor(max_workers=MAX_WARM_JOBS, thread_name_prefix="agrichain-warm")
+_WARM_SLOTS   = threading.BoundedSemaphore(MAX_WARM_JOBS)
+_WARM_RESULTS = TTLCache(maxsize=512)   # (engine, inputs key) -> result
+
+
+def _warm_inputs() -> list:
+    """(engine, fn, args) for every engine, using the current shared inputs
+    in exactly the argument order the pages call them with."""
+    from modules.harvest_engine import get_harvest_recommendation
+    from modules.mandi_ranker import rank_mandis
+    from modules.spoilage_assessor import assess_spoilage
+
+    crop, district = get_shared("crop"), get_shared("district")
+    quantity = float(get_shared("quantity"))
+    return [
+        ("harvest",  get_harvest_recommendation, (crop, district, get_shared("sowing"))),
+        ("mandi",    rank_mandis,                (crop, quantity, district, 3)),
+        ("spoilage", assess_spoilage,            (crop, district, quantity,
+                                                  get_shared("storage"), int(get_shared("transit")))),
+    ]
+
+
+def _run_warm_job(jobs: list):
+    from modules.data_fetcher import get_weather_forecast, load_mandi_prices
+    from utils.geo import DISTRICT_COORDS
+
+    try:
+        todo = [(e, fn, args) for e, fn, args in jobs if (e, _result_key(args)) not in _WARM_RESULTS]
+        if not todo:
+            return
+        # Every job shares crop + district: fetch weather and prices once
+        crop, district = jobs[0][2][:2]   # harvest args: (crop, district, sowing)
+        lat, lon = DISTRICT_COORDS.get(district, (18.5204, 73.8567))
+        weather  = get_weather_forecast(lat, lon, days=14)
+        prices   = load_mandi_prices(crop)
+        data = {
+            "harvest":  {"weather": weather, "prices": prices},
+            "mandi":    {"prices": prices},
+            "spoilage": {"weather": weather},
+        }
+        for engine, fn, args in todo:
+            try:
+                _WARM_RESULTS.set((engine, _result_key(args)), fn(*args, **data[engine]))
+            except Exception:
+                pass   # the page computes it live and surfaces the error itself
+    finally:
+        _WARM_SLOTS.release()
+
+
+def prewarm() -> bool:
+    """
+    Run all three engines for the current shared inputs on the background
+    pool. Returns False (and does nothing) if MAX_WARM_JOBS are already running.
+    """
+    if not _WARM_SLOTS.acquire(blocking=False):
+        return False
+    try:
+        _WARM_POOL.submit(_run_warm_job, _warm_inputs())
+    except Exception:
+        _WARM_SLOTS.release()
+        return False
+    return True
@@ -0,0 +1,76 @@
+"""
+Throttled rendering of streamed LLM output into a Streamlit placeholder.
+
+Calling placeholder.markdown(text + "▌") per token re-sends the whole growing
+answer on every chunk — O(n²) bytes over the websocket for long answers.
+ThrottledRenderer buffers chunks and repaints at most `fps` times a second
+(or sooner once `max_pending` characters are waiting), and counts what that
+cost: frames, bytes pushed and CPU time of the rendering thread.
+
+    renderer = ThrottledRenderer(st.empty())
+    for chunk in chunks:
+        renderer.feed(chunk)
+    text = renderer.finish()
+"""
+
+import time
+
+STREAM_FPS          = 8      # repaints per second while streaming
+STREAM_MAX_PENDING  = 400    # repaint early once this many characters are buffered
+CURSOR              = "▌"
+
+
+class ThrottledRenderer:
+    """Coalesces streamed chunks into time/size-bounded repaints of one placeholder."""
+
+    def __init__(self, placeholder, fps: float = STREAM_FPS,
+                 max_pending: int = STREAM_MAX_PENDING, cursor: str = CURSOR):
+        self.placeholder = placeholder
+        self.interval    = 1.0 / fps if fps > 0 else 0.0
+        self.max_pending = max_pending
+        self.cursor      = cursor
+        self.text        = ""
+        self.chunks      = 0
+        self.frames      = 0
+        self.bytes_sent  = 0
+        self._pending    = 0
+        self._last_paint = 0.0
+        self._cpu_start  = time.thread_time()
+        self.cpu_s       = 0.0
+
+    def _paint(self, body: str):
+        self.placeholder.markdown(body)
+        self.frames     += 1
+        self.bytes_sent += len(body.encode("utf-8"))
+        self._pending    = 0
+        self._last_paint = time.monotonic()
+
+    def feed(self, chunk: str):
+        """Buffer `chunk`; repaint if the frame interval elapsed or the buffer is large."""
+        if not chunk:
+            return
+        self.text    += chunk
+        self.chunks  += 1
+        self._pending += len(chunk)
+        if (time.monotonic() - self._last_paint >= self.interval
+                or self._pending >= self.max_pending):
+            self._paint(self.text + self.cursor)
+
+    def finish(self) -> str:
+        """Final repaint without the cursor. Returns the full text."""
+        self._paint(self.text)
+        self.cpu_s = time.thread_time() - self._cpu_start
+        return self.text
+
+    def stats(self) -> dict:
+        return {
+            "chunks":     self.chunks,
+            "frames":     self.frames,
+            "bytes_sent": self.bytes_sent,
+            "cpu_ms":     round(self.cpu_s * 1000, 1),
+        }
+
+    def summary(self) -> str:
+        """One-line cost summary for a caption."""
+        return (f"{self.frames} frames for {self.chunks} chunks · "
+                f"{self.bytes_sent / 1024:.1f} KB sent · CPU {self.cpu_s * 1000:.0f} ms")
@@ -0,0 +1,109 @@
+"""
+Persistent place-name translation table (SQLite, one row per (lang, text)).
+
+Machine translations of proper nouns never go stale, so they are stored
+permanently in data/translations.db instead of a TTL cache. preload() reads
+the whole table into memory at startup (a few hundred short rows); lookups
+that miss in memory re-check the file, which picks up rows another worker
+has added since.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "translations.db")
+
+_conn      = None
+_conn_lock = threading.Lock()
+_table     = {}      # (lang, text) -> translation
+_loaded    = False
+
+
+def _db():
+    """Shared connection (created on first use); None if the store can't be opened."""
+    global _conn
+    if _conn is None:
+        try:
+            conn = sqlite3.connect(DB_PATH, check_same_thread=False, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""CREATE TABLE IF NOT EXISTS translations (
+                                lang        TEXT NOT NULL,
+                                text        TEXT NOT NULL,
+                                translation TEXT NOT NULL,
+                                source      TEXT NOT NULL,
+                                created_at  REAL NOT NULL,
+                                PRIMARY KEY (lang, text))""")
+            conn.commit()
+            _conn = conn
+        except sqlite3.Error:
+            return None
+    return _conn
+
+
+def preload() -> int:
+    """Load every stored translation into memory (once per process). Returns the count."""
+    global _loaded
+    with _conn_lock:
+        if _loaded:
+            return len(_table)
+        conn = _db()
+        if conn is not None:
+            try:
+                for lang, text, translation in conn.execute("SELECT lang, text, translation FROM translations"):
+                    _table[(lang, text)] = translation
+            except sqlite3.Error:
+                pass
+        _loaded = True
+        return len(_table)
+
+
+def lookup(lang: str, texts: list[str]) -> dict[str, str]:
+    """Stored translations for `texts` (missing ones are simply absent)."""
+    preload()
+    found = {t: _table[(lang, t)] for t in texts if (lang, t) in _table}
+    missing = [t for t in texts if t not in found]
+    if not missing:
+        return found
+    with _conn_lock:
+        conn = _db()
+        if conn is None:
+            return found
+        try:
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT text, translation FROM translations WHERE lang = ? AND text IN "
+                    f"({','.join('?' * len(chunk))})", (lang, *chunk)).fetchall()
+                for text, translation in rows:
+                    _table[(lang, text)] = found[text] = translation
+        except sqlite3.Error:
+            pass
+    return found
+
+
+def store(lang: str, translations: dict[str, str], source: str = "google"):
+    """Persist new translations and add them to the in-memory table."""
+    if not translations:
+        return
+    now = time.time()
+    with _conn_lock:
+        for text, translation in translations.items():
+            _table[(lang, text)] = translation
+        conn = _db()
+        if conn is None:
+            return
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO translations (lang, text, translation, source, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(lang, text, translation, source, now) for text, translation in translations.items()],
+            )
+            conn.commit()
+        except sqlite3.Error:
+            pass
+
+
+def stats() -> dict:
+    return {"entries": len(_table), "loaded": _loaded}
@@ -0,0 +1,223 @@
+"""
+Offline Latin → Devanagari transliteration for Indian place names.
+
+Place names are proper nouns: they need writing in Devanagari, not
+translating. This is a small deterministic rule engine for the usual
+English romanisation of Hindi/Marathi names:
+
+  • longest-match consonant / vowel tokens ("ksh", "chh", "bh", "aa", "ai", …)
+  • conjuncts only where romanised clusters really are conjuncts
+    (Chandrapur → चंद्रपूर, Ratnagiri → रत्नागिरी, Wardha → वर्धा, but
+    Malkapur → मलकापूर)
+  • n / m before a consonant written as anusvara (Hingoli → हिंगोली)
+  • a in an open syllable and word-final a / i / u written long
+    (Satara → सातारा, Akola → अकोला, Jejuri → जेजुरी)
+  • common place-name suffixes per language (-pur, -gaon, -gad, -abad, …)
+    and Marathi endings (-ur → ूर, final d → ड)
+  • all-caps acronyms spelt letter by letter (MIDC → एमआयडीसी)
+
+Romanisation drops vowel length and retroflexion, so results are readable
+approximations (Palghar → पलघर, not पालघर; Bhandara → भंदारा, not भंडारा);
+names that must be exact belong in geo_translate's curated overrides, which
+always take precedence. KNOWN_SPELLINGS lists names the rules must keep
+getting right; check_known_spellings() reports any that drift.
+
+    transliterate("Solapur", "mr")  →  "सोलापूर"
+    transliterate("Solapur", "hi")  →  "सोलापुर"
+"""
+
+import functools
+import re
+
+VIRAMA   = "्"
+ANUSVARA = "ं"
+
+_CONSONANTS = {
+    "ksh": "क्ष", "chh": "छ", "dny": "ज्ञ", "gny": "ज्ञ", "shr": "श्र",
+    "kh": "ख", "gh": "घ", "ch": "च", "jh": "झ", "th": "थ", "dh": "ध",
+    "ph": "फ", "bh": "भ", "sh": "श",
+    "k": "क", "g": "ग", "c": "क", "j": "ज", "t": "त", "d": "द", "n": "न",
+    "p": "प", "b": "ब", "m": "म", "y": "य", "r": "र", "l": "ल", "v": "व",
+    "w": "व", "s": "स", "h": "ह", "q": "क", "x": "क्स", "z": "ज", "f": "फ",
+}
+_LANG_CONSONANTS = {
+    "hi": {"z": "ज़", "f": "फ़"},
+    "mr": {"z": "झ"},
+}
+_MR_FINAL_D = "ड"   # Marathi names end in retroflex ड far more often than द (Nanded, Beed, Karad)
+
+# token -> (independent vowel, matra after a consonant)
+_VOWELS = {
+    "aa": ("आ", "ा"), "ai": ("ऐ", "ै"), "au": ("औ", "ौ"), "ou": ("औ", "ौ"),
+    "ee": ("ई", "ी"), "ii": ("ई", "ी"), "oo": ("ऊ", "ू"), "uu": ("ऊ", "ू"),
+    "a": ("अ", ""), "i": ("इ", "ि"), "u": ("उ", "ु"), "e": ("ए", "े"), "o": ("ओ", "ो"),
+}
+_FINAL_LONG = {"a": ("आ", "ा"), "i": ("ई", "ी"), "u": ("ऊ", "ू"), "ai": ("ई", "ई")}
+
+# n / m stay full letters before these (no anusvara)
+_NO_ANUSVARA_BEFORE = {"y", "r", "l", "v", "w", "h", "n", "m"}
+
+# Word-final suffixes, longest first: (latin, hindi, marathi)
+_SUFFIXES = [
+    ("nagar", "नगर",  "नगर"),
+    ("garh",  "गढ़",   "गड"),
+    ("gaon",  "गांव", "गाव"),
+    ("abad",  "ाबाद", "ाबाद"),
+    ("wadi",  "वाडी", "वाडी"),
+    ("ganj",  "गंज",  "गंज"),
+    ("peth",  "पेठ",  "पेठ"),
+    ("pur",   "पुर",  "पूर"),
+    ("gad",   "गढ़",   "गड"),
+]
+
+_LETTERS = {
+    "A": "ए", "B": "बी", "C": "सी", "D": "डी", "E": "ई", "F": "एफ", "G": "जी",
+    "H": "एच", "I": "आय", "J": "जे", "K": "के", "L": "एल", "M": "एम", "N": "एन",
+    "O": "ओ", "P": "पी", "Q": "क्यू", "R": "आर", "S": "एस", "T": "टी", "U": "यू",
+    "V": "व्ही", "W": "डब्ल्यू", "X": "एक्स", "Y": "वाय", "Z": "झेड",
+}
+
+_TOKEN_RE = re.compile(r"[A-Za-z]+|[^A-Za-z]+")
+
+
+def _match(word: str, i: int, table: dict) -> str | None:
+    for size in (3, 2, 1):
+        token = word[i:i + size]
+        if len(token) == size and token in table:
+            return token
+    return None
+
+
+def _tokens(word: str, consonants: dict) -> list[tuple[str, str]]:
+    """Split into ("C", consonant) / ("V", vowel) units, longest match first."""
+    units, i = [], 0
+    while i < len(word):
+        cons = _match(word, i, consonants)
+        if cons:
+            units.append(("C", cons))
+            i += len(cons)
+            continue
+        vowel = _match(word, i, _VOWELS) or word[i]
+        units.append(("V", vowel))
+        i += len(vowel)
+    return units
+
+
+def _joins(units: list, k: int, at_end: bool) -> bool:
+    """
+    Whether consonant k forms a conjunct with consonant k-1. Mid-word,
+    romanised clusters usually hide a dropped schwa (Malkapur → मलकापूर, not
+    मल्कापूर), so only clusters that are conjuncts in practice take a virama.
+    """
+    first, second = units[k - 1][1], units[k][1]
+    if all(kind == "C" for kind, _ in units[:k]):                  # word-initial: Shri, Kshi, Pra
+        return True
+    if at_end and all(kind == "C" for kind, _ in units[k:]):       # word-final: -durg
+        return True
+    if first == "r" and at_end and k + 2 == len(units) and units[-1][0] == "V":
+        return True                                                 # reph before a final syllable: Wardha
+    return (second in ("y", "r") or first == second
+            or (second == "h" and first in ("l", "n", "m"))        # Kolhapur
+            or (first in ("s", "sh") and second in ("t", "th", "n", "m", "k", "p"))
+            or (first == "t" and second == "n"))                    # Ratnagiri
+
+
+def _after_conjunct(units: list, k: int, at_end: bool) -> bool:
+    """Whether the consonant before vowel k closes a real conjunct (Chandra-, not Kolha-)."""
+    if k < 2 or units[k - 2][0] != "C":
+        return False
+    first, second = units[k - 2][1], units[k - 1][1]
+    return _joins(units, k - 1, at_end) and not (second == "h" and first in ("l", "n", "m"))
+
+
+def _letters(word: str, lang: str, at_end: bool, open_end: bool = False) -> str:
+    """
+    Transliterate one run of lower-case letters. `at_end`: the run ends the
+    word; `open_end`: a consonant-initial suffix follows (Sola|pur → सोला|पूर).
+    """
+    consonants = {**_CONSONANTS, **_LANG_CONSONANTS.get(lang, {})}
+    units = _tokens(word, consonants)
+    out, n = [], len(units)
+    for k, (kind, tok) in enumerate(units):
+        prev = units[k - 1] if k else None
+        nxt  = units[k + 1] if k + 1 < n else None
+        if kind == "C":
+            if (tok in ("n", "m") and prev and prev[0] == "V" and nxt and nxt[0] == "C"
+                    and nxt[1][0] not in _NO_ANUSVARA_BEFORE):
+                out.append(ANUSVARA)
+                continue
+            if prev and prev[0] == "C" and out[-1] != ANUSVARA and _joins(units, k, at_end):
+                out.append(VIRAMA)
+            if lang == "mr" and tok == "d" and at_end and k == n - 1:
+                out.append(_MR_FINAL_D)
+            else:
+                out.append(consonants[tok])
+            continue
+        if tok not in _VOWELS:
+            out.append(tok)
+            continue
+        independent, matra = _VOWELS[tok]
+        after_consonant = prev is not None and prev[0] == "C"
+        if at_end and k == n - 1 and k > 0 and tok in _FINAL_LONG:
+            independent, matra = _FINAL_LONG[tok]
+        elif tok == "i" and k == 1 and prev == ("C", "shr"):
+            independent, matra = _VOWELS["ii"]     # the Shri- prefix is always long: Shrigonda → श्रीगोंदा
+        elif tok == "a" and after_consonant and (
+                (nxt and nxt[0] == "C" and k + 2 < n and units[k + 2][0] == "V")
+                or (open_end and k == n - 1 and not _after_conjunct(units, k, at_end))):
+            independent, matra = _VOWELS["aa"]     # open syllable: Satara → सातारा, Chandrapur → चंद्रपूर
+        elif lang == "mr" and tok == "u" and at_end and k == n - 2 and nxt == ("C", "r"):
+            independent, matra = _VOWELS["uu"]     # Marathi -ur: Latur → लातूर
+        out.append(matra if after_consonant else independent)
+    return "".join(out)
+
+
+def _word(word: str, lang: str) -> str:
+    if len(word) > 1 and word.isupper():
+        return "".join(_LETTERS.get(ch, ch) for ch in word)
+    lower = word.lower()
+    for latin, hindi, marathi in _SUFFIXES:
+        stem = lower[:-len(latin)]
+        if lower.endswith(latin) and len(stem) >= 2:
+            suffix = marathi if lang == "mr" else hindi
+            head = _letters(stem, lang, at_end=False, open_end=suffix[0] not in "ािीुूेैोौ")
+            if suffix[0] in "ािीुूेैोौ" and (not head or head[-1] in "ािीुूेैोौं"):
+                suffix = "आ" + suffix[1:]   # matra with no consonant to sit on
+            return head + suffix
+    return _letters(lower, lang, at_end=True)
+
+
+@functools.lru_cache(maxsize=4096)
+def transliterate(text: str, lang: str = "mr") -> str:
+    """Devanagari spelling of a romanised name ("hi" or "mr" conventions)."""
+    return "".join(_word(tok, lang) if tok[0].isalpha() else tok for tok in _TOKEN_RE.findall(text))
+
+
+# ── Regression table ──────────────────────────────────────────────────────────
+# Real spellings the rules produce today: (name, lang, expected). Rule changes
+# must keep these; names the rules cannot get right go to the overrides.
+KNOWN_SPELLINGS = [
+    ("Chandrapur", "mr", "चंद्रपूर"),   ("Chandrapur", "hi", "चंद्रपुर"),
+    ("Solapur",    "mr", "सोलापूर"),    ("Solapur",    "hi", "सोलापुर"),
+    ("Kolhapur",   "mr", "कोल्हापूर"),   ("Malkapur",   "mr", "मलकापूर"),
+    ("Indapur",    "mr", "इंदापूर"),    ("Indapur",    "hi", "इंदापुर"),
+    ("Ratnagiri",  "mr", "रत्नागिरी"),   ("Sindhudurg", "mr", "सिंधुदुर्ग"),
+    ("Wardha",     "mr", "वर्धा"),      ("Shrigonda",  "mr", "श्रीगोंदा"),
+    ("Junnar",     "mr", "जुन्नर"),     ("Hingoli",    "mr", "हिंगोली"),
+    ("Gondiya",    "mr", "गोंदिया"),    ("Sangamner",  "mr", "संगमनेर"),
+    ("Satara",     "mr", "सातारा"),     ("Akola",      "mr", "अकोला"),
+    ("Pachora",    "mr", "पाचोरा"),     ("Jejuri",     "mr", "जेजुरी"),
+    ("Khopoli",    "mr", "खोपोली"),     ("Dapoli",     "mr", "दापोली"),
+    ("Rahuri",     "mr", "राहुरी"),     ("Panvel",     "mr", "पनवेल"),
+    ("Nashik",     "mr", "नाशिक"),      ("Washim",     "mr", "वाशिम"),
+    ("Latur",      "mr", "लातूर"),      ("Shirur",     "mr", "शिरूर"),
+    ("Beed",       "mr", "बीड"),        ("Malegaon",   "mr", "मालेगाव"),
+    ("Kopargaon",  "mr", "कोपरगाव"),    ("Malegaon",   "hi", "मालेगांव"),
+    ("MIDC",       "mr", "एमआयडीसी"),
+]
+
+
+def check_known_spellings(table: list | None = None) -> list[tuple[str, str, str, str]]:
+    """(name, lang, expected, got) for every KNOWN_SPELLINGS entry the rules now get wrong."""
+    return [(name, lang, expected, got) for name, lang, expected in (table or KNOWN_SPELLINGS)
+            if (got := transliterate(name, lang)) != expected]